@@ -0,0 +1,96 @@
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime
+from pathlib import Path
+from benchmarks.compare import compare_results
+from benchmarks.corpus_generator import generate_corpus
+from benchmarks.end_to_end import run_end_to_end
+from benchmarks.micro import run_micro_benchmarks
+from src.fused_tokenizer import FusedTokenizer
+
+#!/usr/bin/env python3
+#
+# benchmarks.__main__.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+
+def run(args: argparse.Namespace) -> None:
+    """Run the micro and end-to-end benchmarks on a synthetic corpus and save the JSON report."""
+    lines = list(generate_corpus(args.num_lines, seed=args.seed))
+    text = "\n".join(lines)
+    # The micro benchmarks time the tokens the stemmer actually sees, as tokenized by stem_document
+    tokenizer = FusedTokenizer()
+    tokens = [token for line in lines for token in tokenizer.tokenize(line)]
+    report = {
+        "metadata": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "num_lines": args.num_lines,
+            "seed": args.seed,
+        },
+        "micro": run_micro_benchmarks(tokens, repeat=args.repeat),
+        "end_to_end": run_end_to_end(text, repeat=args.repeat),
+    }
+
+    for name, value in report["micro"].items():
+        print(f"{name:50} {value:10.0f} ns/call")
+    for mode, figures in report["end_to_end"].items():
+        print(f"{mode:10} {figures['tokens_per_second']:12.0f} tokens/sec {figures['peak_memory_mb']:8.1f} MB peak")
+
+    output_file = Path(args.output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with output_file.open("w", encoding="utf-8") as f_report:
+        json.dump(report, f_report, indent=2)
+    print(f"Saved report to {output_file}")
+
+
+def compare(args: argparse.Namespace) -> None:
+    """Compare a report against a baseline and exit with status 1 on regressions."""
+    with Path(args.baseline).open(encoding="utf-8") as f_baseline:
+        baseline = json.load(f_baseline)
+    with Path(args.current).open(encoding="utf-8") as f_current:
+        current = json.load(f_current)
+
+    regressions = compare_results(baseline, current, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        sys.exit(1)
+    print(f"No regression above {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Labadain Stemmer benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmarks and save a JSON report")
+    run_parser.add_argument(
+        "-of",
+        "--output_file",
+        type=str,
+        default="benchmarks/baselines/latest.json",
+        help="Path to save the report (default: benchmarks/baselines/latest.json)"
+    )
+    run_parser.add_argument("-n", "--num_lines", type=int, default=5000, help="Synthetic corpus lines (default: 5000)")
+    run_parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    run_parser.add_argument("--repeat", type=int, default=3, help="Repetitions per measure (default: 3)")
+    run_parser.set_defaults(function=run)
+
+    compare_parser = subparsers.add_parser("compare", help="Compare a report against a baseline")
+    compare_parser.add_argument("baseline", type=str, help="Path to the baseline report")
+    compare_parser.add_argument("current", type=str, help="Path to the current report")
+    compare_parser.add_argument(
+        "-t",
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Relative change flagged as a regression (default: 0.10)"
+    )
+    compare_parser.set_defaults(function=compare)
+
+    args = parser.parse_args()
+    args.function(args)
@@ -0,0 +1,34 @@
+from typing import Dict, List
+
+#!/usr/bin/env python3
+#
+# benchmarks.compare.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+
+def compare_results(baseline: Dict, current: Dict, threshold: float = 0.10) -> List[str]:
+    """
+    Compare two benchmark reports and return a message per regression larger than the
+    threshold (a fraction of the baseline value):
+    - micro benchmarks (ns per call) and peak memory regress when they grow;
+    - tokens per second regresses when it drops.
+    """
+    regressions = []
+    for name, base_value in baseline.get("micro", {}).items():
+        value = current.get("micro", {}).get(name)
+        if value is not None and value > base_value * (1 + threshold):
+            regressions.append(f"micro {name}: {base_value:.0f} -> {value:.0f} ns/call (+{value / base_value - 1:.1%})")
+
+    for mode, base_figures in baseline.get("end_to_end", {}).items():
+        figures = current.get("end_to_end", {}).get(mode)
+        if figures is None:
+            continue
+        base_speed, speed = base_figures["tokens_per_second"], figures["tokens_per_second"]
+        if speed < base_speed * (1 - threshold):
+            regressions.append(f"{mode} tokens/sec: {base_speed:.0f} -> {speed:.0f} ({speed / base_speed - 1:.1%})")
+        base_memory, memory = base_figures["peak_memory_mb"], figures["peak_memory_mb"]
+        if memory > base_memory * (1 + threshold):
+            regressions.append(f"{mode} peak memory: {base_memory:.1f} -> {memory:.1f} MB (+{memory / base_memory - 1:.1%})")
+
+    return regressions
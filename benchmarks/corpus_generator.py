@@ -0,0 +1,68 @@
+import argparse
+import random
+from pathlib import Path
+from typing import Iterator, List
+from src.stemmer_rules import HEAVY_RULES
+
+#!/usr/bin/env python3
+#
+# benchmarks.corpus_generator.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+# Roots used to build words; they mix short native roots and long Portuguese loanword roots,
+# so that the suffixes fall in and out of the R1, R2 and RV regions.
+ROOTS = [
+    "ka", "bo", "ua", "liur", "rai", "hakat", "diak", "moris", "hanorin", "servisu",
+    "nasion", "ofisi", "estud", "komemor", "independ", "profes", "univers", "polítik",
+    "sosi", "tekno", "demokr", "diskus", "edukasaun", "administr", "komunik", "prezid",
+    "abil", "ativ", "relat", "organiz", "responsabil", "kapas", "inform",
+]
+
+# Strings that precede some suffixes in the Portuguese-derived rules.
+PRECEDINGS = ["", "", "iv", "at", "ativ", "oz", "ik", "ad", "ante", "avel", "ivel", "abil", "is"]
+
+# Short words, numbers and punctuation that the tokenizer and the length filter handle.
+FILLERS = ["no", "iha", "ba", "ne'e", "ida-ne'ebé", "2024", "1.000,50", ",", ".", "?", "Timor-Leste"]
+
+
+def rule_words(rng: random.Random, count: int) -> List[str]:
+    """Build words matching every rule of the heavy pipeline (which includes the light and moderate rules)."""
+    words = []
+    for rule in HEAVY_RULES:
+        for _ in range(count):
+            affix = rng.choice(rule.affixes)
+            root = rng.choice(ROOTS)
+            if rule.prefix:
+                words.append(affix + root)
+            else:
+                words.append(root + rng.choice(PRECEDINGS) + affix)
+    # Words matching no rule at all
+    words.extend(rng.choice(ROOTS) + rng.choice(["k", "t", "r", "l"]) for _ in range(count))
+    return words
+
+
+def generate_corpus(num_lines: int = 10000, words_per_line: int = 20, seed: int = 42) -> Iterator[str]:
+    """Yield a reproducible synthetic Tetun corpus with a Zipf-like word distribution."""
+    rng = random.Random(seed)
+    vocabulary = rule_words(rng, 50)
+    rng.shuffle(vocabulary)
+    weights = [1.0 / rank for rank in range(1, len(vocabulary) + 1)]
+    for _ in range(num_lines):
+        words = rng.choices(vocabulary, weights=weights, k=words_per_line)
+        words.insert(rng.randrange(len(words) + 1), rng.choice(FILLERS))
+        if rng.random() < 0.2:
+            words[0] = words[0].capitalize()
+        yield " ".join(words) + "."
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic Tetun corpus")
+    parser.add_argument("-of", "--output_file", type=str, required=True, help="Path to save the corpus")
+    parser.add_argument("-n", "--num_lines", type=int, default=10000, help="Number of lines (default: 10000)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    args = parser.parse_args()
+
+    with Path(args.output_file).open("w", encoding="utf-8") as f_corpus:
+        for line in generate_corpus(args.num_lines, seed=args.seed):
+            f_corpus.write(line + "\n")
@@ -0,0 +1,45 @@
+import time
+import tracemalloc
+from typing import Dict
+from src.stemmer import STEMMER_MODES, LabadainStemmer
+from src.preprocessing import TextPreprocessing
+
+#!/usr/bin/env python3
+#
+# benchmarks.end_to_end.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+
+def stem_like_cli(text: str, mode: str) -> str:
+    """Preprocess and stem a text the way labadain_stemmer.py does."""
+    preprocessed_text = TextPreprocessing(text).preprocess_text()
+    return LabadainStemmer(preprocessed_text, mode=mode).stem()
+
+
+def run_end_to_end(text: str, repeat: int = 3) -> Dict[str, Dict[str, float]]:
+    """
+    Measure tokens per second (best of repeat, without tracing) and the peak traced memory
+    (a separate run under tracemalloc) of every stemming mode.
+    """
+    results = {}
+    for mode in STEMMER_MODES:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            stemmed_text = stem_like_cli(text, mode)
+            best = min(best, time.perf_counter() - start)
+        tokens = len(stemmed_text.split())
+
+        tracemalloc.start()
+        stem_like_cli(text, mode)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results[mode] = {
+            "tokens": tokens,
+            "seconds": best,
+            "tokens_per_second": tokens / best if best else 0.0,
+            "peak_memory_mb": peak / 2 ** 20,
+        }
+    return results
@@ -0,0 +1,58 @@
+import time
+from typing import Callable, Dict, List, Sequence
+from src.labadain_stemmer_core import LabadainStemmerCore
+from src.stemmer_pipeline import HeavyStemmerPipeline
+from src.stemmer_rules import NO_MATCH
+
+#!/usr/bin/env python3
+#
+# benchmarks.micro.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+
+def time_per_call(function: Callable[[str], object], words: Sequence[str], repeat: int = 5) -> float:
+    """Return the best-of-repeat time per call of the function over the words, in nanoseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for word in words:
+            function(word)
+        best = min(best, time.perf_counter() - start)
+    return best / max(len(words), 1) * 1e9
+
+
+def rule_method(core: LabadainStemmerCore, action: str, params: dict) -> Callable[[str], str]:
+    """Bind a core method to the parameters of a pipeline rule."""
+    method = getattr(core, action)
+    return lambda word: method(word, **params)
+
+
+def run_micro_benchmarks(words: List[str], repeat: int = 5) -> Dict[str, float]:
+    """
+    Time every LabadainStemmerCore method on the tokens (preprocessed and tokenized as by
+    LabadainStemmer.stem_document) that reach it in the heavy pipeline
+    (which covers every rule of the light and moderate pipelines), plus region finding and
+    rule dispatch on all words. Results are in nanoseconds per call.
+    """
+    pipeline = HeavyStemmerPipeline()
+    words = [word for word in words if len(word) > 3]
+    results = {
+        "find_regions": time_per_call(pipeline.find_regions, words, repeat),
+        "find_r1_r2_positions": time_per_call(pipeline.find_r1_r2_positions, words, repeat),
+        "find_rv_position": time_per_call(pipeline.find_rv_position, words, repeat),
+        "dispatch": time_per_call(pipeline.rule_set.dispatch, words, repeat),
+    }
+
+    words_by_rule = [[] for _ in pipeline.rule_set.rules]
+    for word in set(words):
+        index = pipeline.rule_set.dispatch(word)
+        if index != NO_MATCH:
+            words_by_rule[index].append(word)
+
+    for rule, rule_words in zip(pipeline.rule_set.rules, words_by_rule):
+        if rule_words:
+            name = f"{rule.action}[{rule.name}]"
+            results[name] = time_per_call(rule_method(pipeline, rule.action, rule.params), rule_words, repeat)
+
+    return results
@@ -1,4 +1,12 @@
+import glob
+import hashlib
+import importlib
+import io
+import json
+import os
+import sys
 from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, TextIO
 
 #!/usr/bin/env python3
 #
@@ -6,6 +14,35 @@ from pathlib import Path
 # Gabriel de Jesus (mestregabrieldejesus@gmail.com)
 # 09-05-2024
 
+# Compressed corpora are decompressed on the fly, by the module registered for their suffix
+COMPRESSION_MODULES = {".gz": "gzip", ".bz2": "bz2", ".xz": "lzma"}
+GLOB_CHARACTERS = frozenset("*?[")
+
+
+class FileRange(io.RawIOBase):
+    """Raw reader of the bytes start to end of a file, to be wrapped in a buffered text reader."""
+
+    def __init__(self, file_path: Path, start: int, end: int) -> None:
+        self.file = file_path.open('rb')
+        self.file.seek(start)
+        self.remaining = end - start
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self.remaining)
+        if size <= 0:
+            return 0
+        read = self.file.readinto(memoryview(buffer)[:size])
+        self.remaining -= read
+        return read
+
+    def close(self) -> None:
+        self.file.close()
+        super().close()
+
+
 class Utils:
     """The utilities class for reading and writing files."""
 
@@ -15,7 +52,7 @@ class Utils:
     def load_corpus(self, file_path: Path) -> str:
         """Load the given text file."""
         try:
-            with file_path.open('r', encoding='utf-8') as f_corpus:
+            with self.open_corpus(file_path) as f_corpus:
                 corpus_contents = f_corpus.read()
         except FileNotFoundError:
             print(f"File not found at: {file_path}")
@@ -23,11 +60,113 @@ class Utils:
 
         return corpus_contents
 
-    def write_corpus(self, file_path: Path, corpus: str) -> None:
-        """Append the input string list to a file."""
+    def write_corpus(self, file_path: Path, corpus: str, append: bool = False) -> None:
+        """Write the input string to a file, replacing its content unless append is set."""
         try:
-            with file_path.open('a', encoding='utf-8') as f_corpus:
+            with file_path.open('a' if append else 'w', encoding='utf-8') as f_corpus:
                 f_corpus.write(corpus + "\n")
         except FileNotFoundError:
             print(f"File not found at: {file_path}")
-            return []
\ No newline at end of file
+            return []
+
+    def open_corpus(self, file_path: Path) -> TextIO:
+        """
+        Open the given text file for reading, or the standard input if the path is "-".
+        Files ending in .gz, .bz2 or .xz are decompressed as they are read.
+        """
+        if str(file_path) == "-":
+            return io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8')
+        compression = COMPRESSION_MODULES.get(file_path.suffix.lower())
+        if compression is not None:
+            return importlib.import_module(compression).open(file_path, 'rt', encoding='utf-8')
+        return file_path.open('r', encoding='utf-8')
+
+    def expand_corpus_paths(self, pattern: str) -> List[Path]:
+        """
+        Return the files of a corpus given as a file, a directory (all the files below it) or a
+        glob pattern (e.g. "shards/*.txt.gz", "corpus/**/*.xz"), in sorted order.
+        """
+        if pattern == "-":
+            return [Path(pattern)]
+        path = Path(pattern)
+        if path.is_dir():
+            return sorted(file_path for file_path in path.rglob("*") if file_path.is_file())
+        if GLOB_CHARACTERS.intersection(pattern):
+            return sorted(Path(match) for match in glob.glob(pattern, recursive=True) if Path(match).is_file())
+        return [path]
+
+    def iter_corpora(self, file_paths: Iterable[Path]) -> Iterator[str]:
+        """Yield the lines of several text files, one file after the other."""
+        for file_path in file_paths:
+            yield from self.iter_corpus(file_path)
+
+    def iter_corpus(self, file_path: Path) -> Iterator[str]:
+        """
+        Yield the given text file line by line, without loading it into memory.
+        Every input line is yielded whole, so the stemmed output stays aligned with the input.
+        """
+        try:
+            f_corpus = self.open_corpus(file_path)
+        except FileNotFoundError:
+            print(f"File not found at: {file_path}")
+            return
+
+        with f_corpus:
+            yield from f_corpus
+
+    def iter_corpus_range(self, file_path: Path, start: int, end: int) -> Iterator[str]:
+        """
+        Yield the lines of the bytes start to end of an uncompressed text file, as iter_corpus does.
+        The range must be aligned to line boundaries (see src/shard_plan.py).
+        """
+        f_range = io.TextIOWrapper(io.BufferedReader(FileRange(file_path, start, end)), encoding='utf-8')
+        with f_range:
+            yield from f_range
+
+    def write_lines(self, file_path: Path, lines: Iterable[str], append: bool = False) -> None:
+        """Write the input strings to a file as they are produced, one per line (after its content if append is set)."""
+        try:
+            with file_path.open('a' if append else 'w', encoding='utf-8') as f_corpus:
+                for line in lines:
+                    f_corpus.write(line + "\n")
+        except FileNotFoundError:
+            print(f"File not found at: {file_path}")
+
+    def write_columns(self, file_paths: Sequence[Path], rows: Iterable[Sequence[str]], append: bool = False) -> None:
+        """
+        Write the fields of every row to the matching files as they are produced, one line per row
+        (after their content if append is set).
+        """
+        try:
+            files = [file_path.open('a' if append else 'w', encoding='utf-8') for file_path in file_paths]
+        except FileNotFoundError as error:
+            print(f"File not found at: {error.filename}")
+            return
+
+        try:
+            for row in rows:
+                for f_corpus, field in zip(files, row):
+                    f_corpus.write(field + "\n")
+        finally:
+            for f_corpus in files:
+                f_corpus.close()
+
+    def file_digest(self, file_path: Path, block_size: int = 1 << 20) -> str:
+        """Return the SHA-256 hex digest of the file content, read in blocks."""
+        digest = hashlib.sha256()
+        with file_path.open('rb') as f_input:
+            for block in iter(lambda: f_input.read(block_size), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def write_json(self, file_path: Path, data: Dict, indent: Optional[int] = 2) -> None:
+        """
+        Write the data as JSON atomically: readers (and a crashed run) see either the previous
+        or the new content, never a partial file.
+        """
+        temp_path = file_path.with_name(f"{file_path.name}.{os.getpid()}.tmp")
+        with temp_path.open('w', encoding='utf-8') as f_json:
+            json.dump(data, f_json, ensure_ascii=False, indent=indent, separators=None if indent else (",", ":"))
+            f_json.flush()
+            os.fsync(f_json.fileno())
+        os.replace(temp_path, file_path)
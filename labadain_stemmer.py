@@ -1,13 +1,15 @@
 import argparse
+import sys
 from config.utils import Utils
 from pathlib import Path
-from typing import List
-from tetuntokenizer.tokenizer import TetunSimpleTokenizer
-from src.preprocessing import TextPreprocessing
-from src.stemmer_pipeline import (
-    LighStemmerPipeline,
-    ModerateStemmerPipeline,
-    HeavyStemmerPipeline
+from src.stem_cache import StemCache
+from src.stemmer import (
+    ALL_MODES,
+    STEMMER_MODES,
+    STEMMER_VERSION,
+    LabadainStemmer,
+    iter_stem,
+    mode_output_paths
 )
 
 #!/usr/bin/env python3
@@ -16,107 +18,319 @@ from src.stemmer_pipeline import (
 # Gabriel de Jesus (mestregabrieldejesus@gmail.com)
 # 09-05-2024
 
+# The stemmer lives in src/stemmer.py; its names are re-exported here for existing imports
+__all__ = ["ALL_MODES", "STEMMER_MODES", "STEMMER_VERSION", "LabadainStemmer", "iter_stem", "mode_output_paths"]
 
-class LabadainStemmer:
-    """An implementation of the Labadain stemmer algorithm."""
-
-    def __init__(self, text: str, mode: str = "light") -> None:
-        self.text = text
-        self.mode = mode
-        self.tokenizer = TetunSimpleTokenizer()
-        self.light_stemmer_pipe = LighStemmerPipeline()
-        self.moderate_stemmer_pipe = ModerateStemmerPipeline()
-        self.heavy_stemmer_pipe = HeavyStemmerPipeline()
-        self.stemmed_words_list = []
-
-    def tokenize_text(self) -> List[str]:
-        """Remove punctuation, special characters, and tokenize into word and number tokens."""
-        return self.tokenizer.tokenize(self.text)
-    
-    def light_stemmer(self) -> str:
-        """Stem words to the root using light stemmer."""
-        stemmed_words_list = []
-        for word in self.tokenize_text():
-            if len(word) > 3:
-                stemmed_word = self.light_stemmer_pipe.light_stemmer(word.strip())
-                stemmed_words_list.append(stemmed_word)
-            else:
-                stemmed_words_list.append(word)
-        return " ".join(stemmed_words_list)
-
-    def moderate_stemmer(self) -> str:
-        """Stem words to the root using moderate stemmer."""
-        for word in self.tokenize_text():
-            if len(word) > 3:
-                stemmed_word = self.moderate_stemmer_pipe.moderate_stemmer(word.strip())
-                self.stemmed_words_list.append(stemmed_word)
-            else:
-                self.stemmed_words_list.append(word)
-        return " ".join(self.stemmed_words_list)
-
-    def heavy_stemmer(self) -> str:
-        """Stem words to the root using heavy stemmer."""
-        for word in self.tokenize_text():
-            if len(word) > 3:
-                stemmed_word = self.heavy_stemmer_pipe.heavy_stemmer(word.strip())
-                self.stemmed_words_list.append(stemmed_word)
-            else:
-                self.stemmed_words_list.append(word)
-        return " ".join(self.stemmed_words_list)
-
-
-    def stem(self) -> str:
-        if self.mode == "light":
-            return self.light_stemmer()
-        elif self.mode == "moderate":
-            return self.moderate_stemmer()
-        elif self.mode == "heavy":
-            return self.heavy_stemmer()
-        else:
-            raise ValueError("Invalid mode! Choose 'light', 'moderate', or 'heavy'.")
-        
 
 if __name__ == "__main__":
+    from src.output_writers import OUTPUT_FORMATS, write_stemmed_documents
+    from src.preprocessing import NORMALIZATIONS
+
     parser = argparse.ArgumentParser(description="Labadain Stemmer")
 
     input_group = parser.add_mutually_exclusive_group(required=True)
-    input_group.add_argument("-if", "--input_file", type=str, help="Path to input text file")
+    input_group.add_argument(
+        "-if",
+        "--input_file",
+        type=str,
+        help="Path to input text file, possibly compressed (.gz, .bz2, .xz), a directory or a glob pattern"
+    )
     input_group.add_argument("-it", "--input_text",  type=str, help="Input string (default)")
 
     output_group = parser.add_mutually_exclusive_group()
     output_group.add_argument("-of", "--output_file", type=str, help="Path to save output text")
+    output_group.add_argument(
+        "-od",
+        "--output_dir",
+        type=str,
+        help="Stem every input file (shard) into its own output under this directory, with a manifest.json"
+    )
     output_group.add_argument(
         "-ot",
         "--output_text",
         action="store_true",
         help="Print output to console (default)")
+    parser.add_argument(
+        "-a",
+        "--append",
+        action="store_true",
+        help="With -of and the text format, append to the output file(s) instead of overwriting them"
+    )
 
     parser.add_argument(
         "-m",
         "--mode",
-        choices=["light", "moderate", "heavy"],
+        choices=STEMMER_MODES + (ALL_MODES,),
         default="light",
-        help="Choose stemming mode (default: light)"
+        help="Choose stemming mode, or 'all' for light, moderate and heavy in one pass (default: light)"
+    )
+    parser.add_argument(
+        "-fmt",
+        "--output_format",
+        choices=tuple(OUTPUT_FORMATS),
+        default="text",
+        help="Output format with -of: text (default), jsonl (one JSON document per line), stem_ids "
+             "(a directory with the uint32 stem ids, document offsets and stem vocabulary) or term_frequencies "
+             "(a directory with the stem counts of every document and the collection statistics)"
+    )
+    parser.add_argument(
+        "-cs",
+        "--cache_size",
+        type=int,
+        default=0,
+        help="Cache up to N stemmed words (default: 0, no cache)"
+    )
+    parser.add_argument(
+        "-lx",
+        "--lexicon",
+        type=str,
+        default=None,
+        help="Path to a precomputed stem lexicon (see src/stem_lexicon.py) consulted before the rules"
+    )
+    parser.add_argument(
+        "-r",
+        "--rules",
+        type=str,
+        default=None,
+        help="Path to a rule set file (see src/rule_sets.py) replacing the built-in rules of its modes"
+    )
+    parser.add_argument(
+        "-nu",
+        "--normalize",
+        choices=NORMALIZATIONS,
+        default=None,
+        help="Normalize the input to Unicode NFC first ('fold' also folds the typographic apostrophe and "
+             "hyphen variants); ASCII text is passed through"
+    )
+    parser.add_argument(
+        "-pr",
+        "--profile_rules",
+        action="store_true",
+        help="Print the hits and time of every stemming rule to stderr (not with --workers); with --cache_size, "
+             "the cache hits skip the rules and are not counted"
+    )
+    parser.add_argument(
+        "-s",
+        "--stream",
+        action="store_true",
+        help="Stem the input line by line and write each stemmed line as it goes (use '-if -' for stdin)"
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="Stem line-aligned chunks in N worker processes; implies --stream (default: 1)"
+    )
+    parser.add_argument(
+        "-t",
+        "--threads",
+        type=int,
+        default=1,
+        help="Stem line-aligned chunks in N threads sharing one stemmer, in parallel on free-threaded "
+             "Python builds only; implies --stream (default: 1)"
+    )
+    parser.add_argument(
+        "--chunk_size",
+        type=int,
+        default=1000,
+        help="Number of lines per chunk sent to a worker or thread (default: 1000)"
+    )
+    parser.add_argument(
+        "--max_pending",
+        type=int,
+        default=None,
+        help="Maximum number of chunks in flight (default: two per worker)"
+    )
+    parser.add_argument(
+        "--checkpoint_lines",
+        type=int,
+        default=10000,
+        help="With --output_dir, commit the progress of a shard every N lines so an interrupted run "
+             "resumes there (default: 10000, 0 to restart interrupted shards)"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="With --output_dir, stem every shard again, even if its input and configuration are unchanged"
+    )
+    parser.add_argument(
+        "--verify_inputs",
+        action="store_true",
+        help="With --output_dir, hash every input to detect changes instead of comparing their size "
+             "and modification time with the manifest"
     )
     args = parser.parse_args()
+    multi_mode = args.mode == ALL_MODES
+    if multi_mode and args.profile_rules:
+        parser.error("--profile_rules is not available with -m all")
+    if args.output_format != "text" and not (args.output_file or args.output_dir):
+        parser.error(f"--output_format {args.output_format} requires --output_file or --output_dir")
+    if args.output_dir and not args.input_file:
+        parser.error("--output_dir requires --input_file")
+    if args.workers > 1 and args.threads > 1:
+        parser.error("--workers and --threads cannot be combined")
+    if args.output_dir and args.profile_rules:
+        parser.error("--profile_rules is not available with --output_dir")
+    if args.workers > 1 and args.profile_rules:
+        parser.error("--profile_rules is not available with --workers")
+    if args.append and (not args.output_file or args.output_format != "text"):
+        parser.error("--append requires --output_file and the text format")
+    if args.output_file:
+        output_paths = mode_output_paths(Path(args.output_file)) if multi_mode else [Path(args.output_file)]
+    # The text format writes the stemmed lines; the other formats take the lists of stems
+    as_tokens = args.output_format != "text"
 
-    # Load the input text
     utils = Utils()
     if args.input_file:
-        text = utils.load_corpus(Path(args.input_file))
+        input_paths = utils.expand_corpus_paths(args.input_file)
+        if not input_paths:
+            parser.error(f"No input files match '{args.input_file}'")
+        missing_paths = [str(input_path) for input_path in input_paths if str(input_path) != "-" and not input_path.is_file()]
+        if missing_paths:
+            parser.error(f"Input file not found: {', '.join(missing_paths)}")
+    cache = StemCache(args.cache_size) if args.cache_size > 0 else None
+    if args.rules:
+        from src.rule_sets import load_rule_sets
+        rule_sets = load_rule_sets(Path(args.rules))
+    else:
+        rule_sets = None
+    if args.lexicon:
+        from src.stem_lexicon import StemLexicon
+        try:
+            lexicon = StemLexicon(Path(args.lexicon))
+            # Checked here too, before the worker processes open it
+            LabadainStemmer(rule_sets=rule_sets).check_lexicon(lexicon)
+        except ValueError as error:
+            parser.error(str(error))
+    else:
+        lexicon = None
+
+    # Shards: stem every input file into its own output, in parallel with --workers
+    if args.output_dir:
+        from src.parallel_stemmer import stem_shards
+        if Path("-") in input_paths:
+            parser.error("--output_dir cannot read the standard input")
+        try:
+            manifest = stem_shards(
+                input_paths,
+                Path(args.output_dir),
+                mode=args.mode,
+                output_format=args.output_format,
+                workers=args.workers,
+                cache_size=args.cache_size,
+                lexicon_path=args.lexicon,
+                rules_path=args.rules,
+                checkpoint_lines=args.checkpoint_lines,
+                force=args.force,
+                normalization=args.normalize,
+                verify_inputs=args.verify_inputs
+            )
+        except ValueError as error:
+            parser.error(str(error))
+        print(
+            f"Stemmed {manifest['stemmed_in_last_run']} of {manifest['num_shards']} shards "
+            f"({manifest['lines']} lines) into {args.output_dir}"
+        )
+        sys.exit(0)
+
+    # With -m all, every line is stemmed with the three modes and written as three aligned
+    # outputs: tab-separated light, moderate and heavy columns, or one output file per mode
+    stemmer = LabadainStemmer(
+        mode="light" if multi_mode else args.mode,
+        cache=cache,
+        lexicon=lexicon,
+        rule_sets=rule_sets
+    )
+    statistics = stemmer.instrument() if args.profile_rules else None
+
+    # Streaming: preprocess, stem and write one line at a time
+    if args.stream or args.workers > 1 or args.threads > 1:
+        if args.input_file:
+            lines = utils.iter_corpora(input_paths)
+        else:
+            # An empty text is one empty line, as without --stream
+            lines = args.input_text.splitlines() or [""]
+        if args.workers > 1:
+            from src.parallel_stemmer import stem_parallel
+            stemmed_lines = stem_parallel(
+                lines,
+                mode=args.mode,
+                workers=args.workers,
+                chunk_size=args.chunk_size,
+                max_pending=args.max_pending,
+                cache_size=args.cache_size,
+                lexicon_path=args.lexicon,
+                rules_path=args.rules,
+                as_tokens=as_tokens,
+                normalization=args.normalize
+            )
+        else:
+            if args.normalize:
+                from src.preprocessing import normalize_lines
+                lines = normalize_lines(lines, fold_punctuation=args.normalize == "fold")
+            if multi_mode:
+                stem_line = stemmer.stem_document_tokens_all if as_tokens else stemmer.stem_document_all
+            else:
+                stem_line = stemmer.stem_document_tokens if as_tokens else stemmer.stem_document
+            if args.threads > 1:
+                from src.threaded_stemmer import iter_stem_threaded
+                stemmed_lines = iter_stem_threaded(lines, stem_line, args.threads, args.chunk_size, args.max_pending)
+            else:
+                stemmed_lines = (stem_line(line) for line in lines)
+        if as_tokens:
+            write_stemmed_documents(
+                args.output_format,
+                output_paths,
+                stemmed_lines if multi_mode else ((stems,) for stems in stemmed_lines)
+            )
+        elif multi_mode and args.output_file:
+            utils.write_columns(output_paths, stemmed_lines, append=args.append)
+        elif multi_mode:
+            for stemmed_line in stemmed_lines:
+                sys.stdout.write("\t".join(stemmed_line) + "\n")
+        elif args.output_file:
+            utils.write_lines(Path(args.output_file), stemmed_lines, append=args.append)
+        else:
+            for stemmed_line in stemmed_lines:
+                sys.stdout.write(stemmed_line + "\n")
+        if statistics is not None:
+            print(statistics.report(cache.stats()["hits"] if cache else 0), file=sys.stderr)
+        sys.exit(0)
+
+    # Load the input text
+    if args.input_file:
+        text = "\n".join(utils.load_corpus(input_path) for input_path in input_paths)
     else:
         text = args.input_text
 
     # Preprocessing
-    text_preprocessor = TextPreprocessing(text)
+    from src.preprocessing import TextPreprocessing
+    text_preprocessor = TextPreprocessing(
+        text,
+        normalize=args.normalize is not None,
+        fold_punctuation=args.normalize == "fold"
+    )
     preprocessed_text = text_preprocessor.preprocess_text()
 
-    # Stemming
-    stemmer = LabadainStemmer(preprocessed_text, mode=args.mode)
-    stemmed_text = stemmer.stem()
-
-    # Output
-    if args.output_file:
-        utils.write_corpus(Path(args.output_file), stemmed_text)
+    # Stemming and output
+    if as_tokens:
+        tokens = stemmer.tokenize_text(preprocessed_text)
+        stems = stemmer.stem_tokens_all(tokens) if multi_mode else (stemmer.stem_tokens(tokens),)
+        write_stemmed_documents(args.output_format, output_paths, [stems])
+    elif multi_mode:
+        stemmed_texts = stemmer.stem_text_all(preprocessed_text)
+        if args.output_file:
+            for output_path, stemmed_text in zip(output_paths, stemmed_texts):
+                utils.write_corpus(output_path, stemmed_text, append=args.append)
+        else:
+            print("\t".join(stemmed_texts))
     else:
-        print(stemmed_text)
\ No newline at end of file
+        stemmed_text = stemmer.stem_text(preprocessed_text)
+        if args.output_file:
+            utils.write_corpus(Path(args.output_file), stemmed_text, append=args.append)
+        else:
+            print(stemmed_text)
+
+    if statistics is not None:
+        print(statistics.report(cache.stats()["hits"] if cache else 0), file=sys.stderr)
@@ -0,0 +1,67 @@
+import numpy as np
+from typing import Iterable, List, Optional, Tuple
+from src.stemmer import LabadainStemmer
+
+#!/usr/bin/env python3
+#
+# src.batch_stemmer.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+
+def factorize(tokens: Iterable[str]) -> Tuple[List[str], np.ndarray]:
+    """
+    Split a token stream into its unique types (in order of first occurrence) and an
+    integer array mapping every token to the index of its type.
+    """
+    type_index = {}
+    codes = np.fromiter(
+        (type_index.setdefault(token, len(type_index)) for token in tokens),
+        dtype=np.int64
+    )
+    return list(type_index), codes
+
+
+class BatchStemmer:
+    """
+    Stem large batches of tokens once per unique type: the token stream is factorized into
+    types and an index array, the types are stemmed, and the per-token output is rebuilt by
+    array take. The cost then depends on the vocabulary size rather than the corpus size.
+    """
+
+    def __init__(self, mode: str = "light", stemmer: Optional[LabadainStemmer] = None) -> None:
+        self.stemmer = stemmer or LabadainStemmer(mode=mode)
+
+    def stem_types(self, tokens: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the stem of every unique type (as an object array) and the token-to-type index array."""
+        types, codes = factorize(tokens)
+        stems = np.empty(len(types), dtype=object)
+        stems[:] = self.stemmer.stem_tokens(types)
+        return stems, codes
+
+    def stem_tokens(self, tokens: Iterable[str]) -> List[str]:
+        """Stem a batch of tokens, returning one stem per token."""
+        stems, codes = self.stem_types(tokens)
+        return stems.take(codes).tolist()
+
+    def stem_token_ids(self, tokens: Iterable[str]) -> Tuple[List[str], np.ndarray]:
+        """
+        Stem a batch of tokens, returning the stem vocabulary and one stem id per token
+        (the index of the token's stem in the vocabulary).
+        """
+        stems, codes = self.stem_types(tokens)
+        stem_vocabulary, stem_codes = factorize(stems)
+        return stem_vocabulary, stem_codes.take(codes)
+
+    def stem_documents(self, documents: Iterable[str]) -> List[str]:
+        """Tokenize and stem a batch of (preprocessed) documents, deduplicating tokens across the batch."""
+        tokens = []
+        offsets = [0]
+        for document in documents:
+            tokens.extend(self.stemmer.tokenize_text(document))
+            offsets.append(len(tokens))
+        stemmed_tokens = self.stem_tokens(tokens)
+        return [
+            " ".join(stemmed_tokens[start:end])
+            for start, end in zip(offsets[:-1], offsets[1:])
+        ]
@@ -0,0 +1,177 @@
+import argparse
+import json
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional
+from src.stemmer import STEMMER_MODES, LabadainStemmer
+
+#!/usr/bin/env python3
+#
+# src.conflation_map.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+# File format (compact JSON):
+#   {"format": "labadain-conflation-map", "version": 1, "mode": "heavy",
+#    "stems": {"komemor": {"komemorasaun": 12, "komemora": 3}, ...}}
+CONFLATION_MAP_FORMAT = "labadain-conflation-map"
+CONFLATION_MAP_VERSION = 1
+
+
+class ConflationMap:
+    """
+    Map from every stem to the surface forms (variants) that conflate to it, with their corpus
+    frequencies, for one stemming mode. Lookups are dictionary lookups, so expanding a query
+    costs one stemming and one lookup per query word. The map is built incrementally: every
+    batch of words only stems the distinct words of the batch, and a saved map can be loaded
+    and updated with new vocabulary.
+    """
+
+    def __init__(self, mode: str = "light", stemmer: Optional[LabadainStemmer] = None) -> None:
+        if mode not in STEMMER_MODES:
+            raise ValueError("Invalid mode! Choose 'light', 'moderate', or 'heavy'.")
+        self.mode = mode
+        self.stemmer = stemmer or LabadainStemmer(mode=mode)
+        self.stems: Dict[str, Dict[str, int]] = {}
+        # Variants of the looked up stems, ranked by frequency; dropped when the map changes
+        self.ranked_variants: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.stems)
+
+    def __contains__(self, stem: str) -> bool:
+        return stem in self.stems
+
+    def add_counts(self, word_counts: Mapping[str, int]) -> None:
+        """Add the frequencies of (preprocessed) words, stemming every distinct word once."""
+        self.ranked_variants.clear()
+        stems = self.stems
+        stem_word = self.stemmer.stem_word
+        for word, count in word_counts.items():
+            stem = stem_word(word)
+            variants = stems.get(stem)
+            if variants is None:
+                variants = stems[stem] = {}
+            variants[word] = variants.get(word, 0) + count
+
+    def add_words(self, words: Iterable[str]) -> None:
+        """Add every occurrence of the (preprocessed) words."""
+        self.add_counts(Counter(words))
+
+    def add_documents(self, documents: Iterable[str], batch_size: int = 10000) -> None:
+        """Preprocess and tokenize raw documents and add their words, in batches of documents."""
+        tokenize = self.stemmer.fused_tokenizer.tokenize
+        word_counts: Counter = Counter()
+        for number, document in enumerate(documents, 1):
+            word_counts.update(tokenize(document))
+            if number % batch_size == 0:
+                self.add_counts(word_counts)
+                word_counts.clear()
+        self.add_counts(word_counts)
+
+    def merge(self, other: "ConflationMap") -> None:
+        """Add the variants and frequencies of another map of the same mode."""
+        if other.mode != self.mode:
+            raise ValueError(f"Cannot merge a {other.mode} conflation map into a {self.mode} one.")
+        self.ranked_variants.clear()
+        for stem, other_variants in other.stems.items():
+            variants = self.stems.setdefault(stem, {})
+            for word, count in other_variants.items():
+                variants[word] = variants.get(word, 0) + count
+
+    def frequencies(self, stem: str) -> Dict[str, int]:
+        """Return a copy of the variants of the stem with their frequencies (empty if the stem is unknown)."""
+        return dict(self.stems.get(stem, {}))
+
+    def variants(self, stem: str) -> List[str]:
+        """Return the variants of the stem, most frequent first."""
+        ranked = self.ranked_variants.get(stem)
+        if ranked is None:
+            variants = self.stems.get(stem)
+            if variants is None:
+                # Unknown stems are not cached, so arbitrary lookups cannot grow the cache
+                return []
+            ranked = self.ranked_variants[stem] = sorted(variants, key=lambda word: (-variants[word], word))
+        return list(ranked)
+
+    def expand(self, word: str) -> List[str]:
+        """Return every known surface form conflating with the (preprocessed) word, most frequent first."""
+        return self.variants(self.stemmer.stem_word(word)) or [word]
+
+    def expand_query(self, query: str) -> Dict[str, List[str]]:
+        """Preprocess and tokenize a raw query and expand every query word."""
+        return {word: self.expand(word) for word in self.stemmer.fused_tokenizer.tokenize(query)}
+
+    def save(self, file_path: Path) -> None:
+        """Write the map atomically in the compact JSON format."""
+        from config.utils import Utils
+
+        Utils().write_json(file_path, {
+            "format": CONFLATION_MAP_FORMAT,
+            "version": CONFLATION_MAP_VERSION,
+            "mode": self.mode,
+            "stems": self.stems,
+        }, indent=None)
+
+    @classmethod
+    def load(cls, file_path: Path, stemmer: Optional[LabadainStemmer] = None) -> "ConflationMap":
+        """Load a saved map, ready for lookups and further updates."""
+        with file_path.open(encoding="utf-8") as f_map:
+            data = json.load(f_map)
+        if data.get("format") != CONFLATION_MAP_FORMAT or data.get("version") != CONFLATION_MAP_VERSION:
+            raise ValueError(f"Not a conflation map file (version {CONFLATION_MAP_VERSION}): {file_path}")
+        conflation_map = cls(data["mode"], stemmer)
+        conflation_map.stems = data["stems"]
+        return conflation_map
+
+
+if __name__ == "__main__":
+    from config.utils import Utils
+
+    parser = argparse.ArgumentParser(description="Build, update or query a stem to variants conflation map")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Add the vocabulary of a corpus to a conflation map")
+    build_parser.add_argument(
+        "-if",
+        "--input_file",
+        type=str,
+        required=True,
+        help="Path to input text file ('-' for stdin), possibly compressed, a directory or a glob pattern"
+    )
+    build_parser.add_argument("-om", "--output_map", type=str, required=True, help="Path of the conflation map")
+    build_parser.add_argument(
+        "-m",
+        "--mode",
+        choices=STEMMER_MODES,
+        default="light",
+        help="Choose stemming mode (default: light)"
+    )
+    build_parser.add_argument(
+        "-u",
+        "--update",
+        action="store_true",
+        help="Add to the existing map at --output_map instead of replacing it"
+    )
+
+    variants_parser = subparsers.add_parser("variants", help="Print the surface forms conflating with query words")
+    variants_parser.add_argument("-im", "--input_map", type=str, required=True, help="Path of the conflation map")
+    variants_parser.add_argument("-q", "--query", type=str, required=True, help="Query text")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        utils = Utils()
+        map_path = Path(args.output_map)
+        if args.update and map_path.exists():
+            conflation_map = ConflationMap.load(map_path)
+            if conflation_map.mode != args.mode:
+                parser.error(f"The map at {map_path} was built with the {conflation_map.mode} mode")
+        else:
+            conflation_map = ConflationMap(args.mode)
+        conflation_map.add_documents(utils.iter_corpora(utils.expand_corpus_paths(args.input_file)))
+        conflation_map.save(map_path)
+        print(f"Saved {len(conflation_map)} {conflation_map.mode} stems to {map_path}")
+    else:
+        conflation_map = ConflationMap.load(Path(args.input_map))
+        for word, variants in conflation_map.expand_query(args.query).items():
+            print(f"{word}\t{' '.join(variants)}")
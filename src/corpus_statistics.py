@@ -0,0 +1,505 @@
+import argparse
+import io
+import json
+import math
+import os
+import numpy as np
+from collections import Counter
+from hashlib import blake2b
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set
+from src.stemmer import STEMMER_MODES, STEMMER_VERSION, LabadainStemmer
+
+#!/usr/bin/env python3
+#
+# src.corpus_statistics.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+# Statistics file format (NumPy .npz):
+#   meta                 UTF-8 JSON: format, version, parameters, document and token counts, changed
+#                        tokens and heavy-hitter counters of every mode
+#   words_hll            HyperLogLog registers of the surface words
+#   <mode>_count_min     count-min table of the stems (depth x width, uint64)
+#   <mode>_hll           HyperLogLog registers of the stems
+#   <mode>_variants      HyperLogLog registers of the variants of every heavy-hitter stem (in meta order)
+STATISTICS_FORMAT = "labadain-corpus-statistics"
+STATISTICS_VERSION = 1
+
+
+def hash_items(items: Iterable[str]) -> List[int]:
+    """
+    Return the 64-bit hash of every item. Unlike hash(), the hash is the same in every process,
+    so sketches built on different machines can be merged.
+    """
+    return [
+        int.from_bytes(blake2b(item.encode("utf-8"), digest_size=8).digest(), "little")
+        for item in items
+    ]
+
+
+class CountMinSketch:
+    """
+    Count-min sketch: depth rows of width counters (width a power of two). The estimate of an
+    item never undercounts, and overcounts by at most e/width of the total count with
+    probability 1 - exp(-depth). Sketches of the same shape merge by adding the tables.
+    """
+
+    def __init__(self, width: int, depth: int) -> None:
+        if width < 1 or width & (width - 1):
+            raise ValueError("The count-min width must be a power of two.")
+        if depth < 1:
+            raise ValueError("The count-min depth must be a positive integer.")
+        self.table = np.zeros((depth, width), dtype=np.uint64)
+
+    def __len__(self) -> int:
+        return self.table.nbytes
+
+    def columns(self, hashes: Sequence[int]) -> np.ndarray:
+        """Column of every hash in every row (double hashing of the two halves of the hash)."""
+        hashes = np.array(hashes, dtype=np.uint64)
+        low = hashes & np.uint64(0xFFFFFFFF)
+        high = (hashes >> np.uint64(32)) | np.uint64(1)
+        rows = np.arange(self.table.shape[0], dtype=np.uint64)[:, None]
+        return ((low + rows * high) & np.uint64(self.table.shape[1] - 1)).astype(np.intp)
+
+    def add(self, hashes: Sequence[int], counts: Sequence[int]) -> None:
+        """Add the counts of the hashed items."""
+        if not hashes:
+            return
+        counts = np.array(counts, dtype=np.uint64)
+        for row, columns in zip(self.table, self.columns(hashes)):
+            np.add.at(row, columns, counts)
+
+    def estimate(self, hashes: Sequence[int]) -> np.ndarray:
+        """Return the estimated count of every hashed item."""
+        if not hashes:
+            return np.zeros(0, dtype=np.uint64)
+        columns = self.columns(hashes)
+        return np.min(self.table[np.arange(self.table.shape[0])[:, None], columns], axis=0)
+
+    def merge(self, other: "CountMinSketch") -> None:
+        if other.table.shape != self.table.shape:
+            raise ValueError("Cannot merge count-min sketches of different shapes.")
+        self.table += other.table
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct counter with 2**precision one-byte registers (relative standard error
+    1.04 / sqrt(2**precision)). Counters of the same precision merge by taking the maximum of
+    the registers.
+    """
+
+    def __init__(self, precision: int, registers: Optional[np.ndarray] = None) -> None:
+        if not 4 <= precision <= 18:
+            raise ValueError("The HyperLogLog precision must be between 4 and 18.")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8) if registers is None else registers
+
+    def add(self, hashes: Sequence[int]) -> None:
+        """Add the hashed items."""
+        if not hashes:
+            return
+        bits = 64 - self.precision
+        mask = (1 << bits) - 1
+        indexes = [value >> bits for value in hashes]
+        ranks = [bits - (value & mask).bit_length() + 1 for value in hashes]
+        np.maximum.at(self.registers, indexes, np.array(ranks, dtype=np.uint8))
+
+    def estimate(self) -> float:
+        """Return the estimated number of distinct items."""
+        registers = self.registers
+        size = len(registers)
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(size, 0.7213 / (1 + 1.079 / size))
+        estimate = alpha * size * size / float(np.sum(np.ldexp(1.0, -registers.astype(np.int32))))
+        zeros = int(np.count_nonzero(registers == 0))
+        if estimate <= 2.5 * size and zeros:
+            # Linear counting is more accurate for small cardinalities
+            return size * math.log(size / zeros)
+        return estimate
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog counters of different precisions.")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+
+class HeavyHitters:
+    """
+    Misra-Gries summary of the most frequent items, with at most capacity counters. Every item
+    more frequent than total / (capacity + 1) is kept, and its counter undercounts by at most
+    that much. Summaries merge by adding the counters and trimming them back to the capacity.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        if capacity < 1:
+            raise ValueError("The heavy-hitter capacity must be a positive integer.")
+        self.capacity = capacity
+        self.counters: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.counters)
+
+    def __contains__(self, item: str) -> bool:
+        return item in self.counters
+
+    def update(self, counts: Mapping[str, int]) -> None:
+        """Add the counts of items (e.g. the exact counts of a batch)."""
+        counters = self.counters
+        for item, count in counts.items():
+            counters[item] = counters.get(item, 0) + count
+        if len(counters) > self.capacity:
+            # Subtract the (capacity + 1)-th largest counter and drop the counters left at zero
+            threshold = sorted(counters.values(), reverse=True)[self.capacity]
+            self.counters = {item: count - threshold for item, count in counters.items() if count > threshold}
+
+    def merge(self, other: "HeavyHitters") -> None:
+        if other.capacity != self.capacity:
+            raise ValueError("Cannot merge heavy-hitter summaries of different capacities.")
+        self.update(other.counters)
+
+
+class ModeStatistics:
+    """Sketches of the stems of one mode, with the exact token counts."""
+
+    def __init__(self, width: int, depth: int, precision: int, capacity: int, variant_precision: int) -> None:
+        self.variant_precision = variant_precision
+        self.num_tokens = 0
+        self.changed_tokens = 0
+        self.count_min = CountMinSketch(width, depth)
+        self.distinct_stems = HyperLogLog(precision)
+        self.heavy_hitters = HeavyHitters(capacity)
+        # Distinct variants (conflation class size) of every heavy-hitter stem
+        self.variants: Dict[str, HyperLogLog] = {}
+
+    def add_stems(self, stem_counts: Mapping[str, int], stem_variants: Mapping[str, Set[str]]) -> None:
+        """Add the exact stem counts of a batch, with the variants of every stem in the batch."""
+        stems = list(stem_counts)
+        hashes = hash_items(stems)
+        self.count_min.add(hashes, [stem_counts[stem] for stem in stems])
+        self.distinct_stems.add(hashes)
+        self.heavy_hitters.update(stem_counts)
+        self.track_variants({stem: hash_items(stem_variants[stem]) for stem in self.heavy_hitters.counters
+                             if stem in stem_variants})
+
+    def track_variants(self, variant_hashes: Mapping[str, Sequence[int]]) -> None:
+        """Add the hashed variants of the heavy-hitter stems, forgetting the stems dropped from the summary."""
+        counters = self.heavy_hitters.counters
+        self.variants = {stem: hll for stem, hll in self.variants.items() if stem in counters}
+        for stem, hashes in variant_hashes.items():
+            hll = self.variants.get(stem)
+            if hll is None:
+                hll = self.variants[stem] = HyperLogLog(self.variant_precision)
+            hll.add(hashes)
+
+    def merge(self, other: "ModeStatistics") -> None:
+        self.num_tokens += other.num_tokens
+        self.changed_tokens += other.changed_tokens
+        self.count_min.merge(other.count_min)
+        self.distinct_stems.merge(other.distinct_stems)
+        self.heavy_hitters.merge(other.heavy_hitters)
+        variants = self.variants
+        for stem, hll in other.variants.items():
+            if stem in variants:
+                variants[stem].merge(hll)
+            else:
+                variants[stem] = HyperLogLog(self.variant_precision, hll.registers.copy())
+        self.track_variants({})
+
+    def top_stems(self, top_k: int) -> List[Dict[str, object]]:
+        """Return the top_k heavy-hitter stems, ranked by their count-min estimate, with their class sizes."""
+        stems = list(self.heavy_hitters.counters)
+        estimates = self.count_min.estimate(hash_items(stems)).tolist()
+        ranked = sorted(zip(stems, estimates), key=lambda item: (-item[1], item[0]))[:top_k]
+        return [
+            {
+                "stem": stem,
+                "count": count,
+                "variants": round(self.variants[stem].estimate()) if stem in self.variants else None,
+            }
+            for stem, count in ranked
+        ]
+
+
+def sketch_parameters(
+    memory_budget: int,
+    depth: int = 4,
+    precision: int = 14,
+    capacity: int = 1000,
+    variant_precision: int = 8
+) -> Dict[str, int]:
+    """
+    Return the sketch parameters fitting (approximately, the heavy-hitter dictionaries aside) in
+    memory_budget bytes: the count-min width is the largest power of two left by the fixed-size
+    sketches of the three modes.
+    """
+    modes = len(STEMMER_MODES)
+    fixed = (modes + 1) * (1 << precision) + modes * capacity * (1 << variant_precision)
+    columns = (memory_budget - fixed) // (modes * depth * np.dtype(np.uint64).itemsize)
+    if columns < 1:
+        raise ValueError(f"A memory budget of {memory_budget} bytes is too small for the sketches.")
+    return {
+        "width": 1 << (columns.bit_length() - 1),
+        "depth": depth,
+        "precision": precision,
+        "capacity": capacity,
+        "variant_precision": variant_precision,
+    }
+
+
+class CorpusStatistics:
+    """
+    Streaming statistics of the light, moderate and heavy modes over a corpus, in fixed memory:
+    distinct surface words and stems (HyperLogLog), the most frequent stems (Misra-Gries, with
+    count-min estimates) and their conflation class sizes, and the exact fraction of tokens
+    every mode changes. Every batch of documents is counted exactly and its distinct words are
+    stemmed once with all modes before the counts go into the sketches. Statistics built with
+    the same parameters (e.g. one per shard) merge into the statistics of the whole corpus.
+    """
+
+    def __init__(
+        self,
+        stemmer: Optional[LabadainStemmer] = None,
+        width: int = 1 << 16,
+        depth: int = 4,
+        precision: int = 14,
+        capacity: int = 1000,
+        variant_precision: int = 8
+    ) -> None:
+        self.stemmer = stemmer or LabadainStemmer()
+        self.parameters = {
+            "width": width,
+            "depth": depth,
+            "precision": precision,
+            "capacity": capacity,
+            "variant_precision": variant_precision,
+        }
+        self.num_documents = 0
+        self.num_tokens = 0
+        self.distinct_words = HyperLogLog(precision)
+        self.modes = {mode: ModeStatistics(width, depth, precision, capacity, variant_precision) for mode in STEMMER_MODES}
+
+    def memory_bytes(self) -> int:
+        """Size of the sketch arrays (the heavy-hitter dictionaries aside)."""
+        size = self.distinct_words.registers.nbytes
+        for mode_statistics in self.modes.values():
+            size += len(mode_statistics.count_min) + mode_statistics.distinct_stems.registers.nbytes
+            size += self.parameters["capacity"] << self.parameters["variant_precision"]
+        return size
+
+    def add_counts(self, word_counts: Mapping[str, int]) -> None:
+        """Add the frequencies of (preprocessed) words, stemming every distinct word once with all modes."""
+        words = list(word_counts)
+        self.num_tokens += sum(word_counts.values())
+        self.distinct_words.add(hash_items(words))
+        stem_word_all = self.stemmer.stem_word_all
+        stem_counts: List[Counter] = [Counter() for _ in STEMMER_MODES]
+        stem_variants: List[Dict[str, Set[str]]] = [{} for _ in STEMMER_MODES]
+        changed_tokens = [0] * len(STEMMER_MODES)
+        for word in words:
+            count = word_counts[word]
+            for index, stem in enumerate(stem_word_all(word)):
+                stem_counts[index][stem] += count
+                stem_variants[index].setdefault(stem, set()).add(word)
+                if stem != word:
+                    changed_tokens[index] += count
+        for index, mode in enumerate(STEMMER_MODES):
+            mode_statistics = self.modes[mode]
+            mode_statistics.num_tokens += sum(word_counts.values())
+            mode_statistics.changed_tokens += changed_tokens[index]
+            mode_statistics.add_stems(stem_counts[index], stem_variants[index])
+
+    def add_documents(self, documents: Iterable[str], batch_size: int = 10000) -> None:
+        """Preprocess and tokenize raw documents and add their words, in batches of documents."""
+        tokenize = self.stemmer.fused_tokenizer.tokenize
+        word_counts: Counter = Counter()
+        for number, document in enumerate(documents, 1):
+            word_counts.update(tokenize(document))
+            self.num_documents += 1
+            if number % batch_size == 0:
+                self.add_counts(word_counts)
+                word_counts.clear()
+        self.add_counts(word_counts)
+
+    def merge(self, other: "CorpusStatistics") -> None:
+        """Add the statistics of another part of the corpus, built with the same parameters."""
+        if other.parameters != self.parameters:
+            raise ValueError("Cannot merge statistics built with different sketch parameters.")
+        self.num_documents += other.num_documents
+        self.num_tokens += other.num_tokens
+        self.distinct_words.merge(other.distinct_words)
+        for mode, mode_statistics in self.modes.items():
+            mode_statistics.merge(other.modes[mode])
+
+    def report(self, top_k: int = 20) -> Dict[str, object]:
+        """Return the statistics of every mode."""
+        distinct_words = self.distinct_words.estimate()
+        report: Dict[str, object] = {
+            "num_documents": self.num_documents,
+            "num_tokens": self.num_tokens,
+            "distinct_words": round(distinct_words),
+            "modes": {},
+        }
+        for mode, mode_statistics in self.modes.items():
+            distinct_stems = mode_statistics.distinct_stems.estimate()
+            report["modes"][mode] = {
+                "distinct_stems": round(distinct_stems),
+                "vocabulary_reduction": 1 - distinct_stems / distinct_words if distinct_words else 0.0,
+                "average_class_size": distinct_words / distinct_stems if distinct_stems else 0.0,
+                "changed_tokens": mode_statistics.changed_tokens,
+                "changed_token_fraction": (
+                    mode_statistics.changed_tokens / mode_statistics.num_tokens if mode_statistics.num_tokens else 0.0
+                ),
+                "top_stems": mode_statistics.top_stems(top_k),
+            }
+        return report
+
+    def save(self, file_path: Path) -> None:
+        """Write the statistics atomically in the .npz format."""
+        meta = {
+            "format": STATISTICS_FORMAT,
+            "version": STATISTICS_VERSION,
+            "stemmer_version": STEMMER_VERSION,
+            "parameters": self.parameters,
+            "num_documents": self.num_documents,
+            "num_tokens": self.num_tokens,
+            "modes": {},
+        }
+        arrays = {"words_hll": self.distinct_words.registers}
+        for mode, mode_statistics in self.modes.items():
+            variant_stems = list(mode_statistics.variants)
+            meta["modes"][mode] = {
+                "num_tokens": mode_statistics.num_tokens,
+                "changed_tokens": mode_statistics.changed_tokens,
+                "heavy_hitters": mode_statistics.heavy_hitters.counters,
+                "variant_stems": variant_stems,
+            }
+            arrays[f"{mode}_count_min"] = mode_statistics.count_min.table
+            arrays[f"{mode}_hll"] = mode_statistics.distinct_stems.registers
+            arrays[f"{mode}_variants"] = np.array(
+                [mode_statistics.variants[stem].registers for stem in variant_stems], dtype=np.uint8
+            ).reshape(len(variant_stems), 1 << self.parameters["variant_precision"])
+        arrays["meta"] = np.frombuffer(json.dumps(meta, ensure_ascii=False).encode("utf-8"), dtype=np.uint8)
+
+        buffer = io.BytesIO()
+        np.savez(buffer, **arrays)
+        temp_path = file_path.with_name(f"{file_path.name}.{os.getpid()}.tmp")
+        with temp_path.open("wb") as f_statistics:
+            f_statistics.write(buffer.getvalue())
+            f_statistics.flush()
+            os.fsync(f_statistics.fileno())
+        os.replace(temp_path, file_path)
+
+    @classmethod
+    def load(cls, file_path: Path, stemmer: Optional[LabadainStemmer] = None) -> "CorpusStatistics":
+        """Load saved statistics, ready for reports, merges and further updates."""
+        with np.load(file_path, allow_pickle=False) as arrays:
+            try:
+                meta = json.loads(arrays["meta"].tobytes().decode("utf-8"))
+            except KeyError:
+                raise ValueError(f"Not a corpus statistics file: {file_path}")
+            if meta.get("format") != STATISTICS_FORMAT or meta.get("version") != STATISTICS_VERSION:
+                raise ValueError(f"Not a corpus statistics file (version {STATISTICS_VERSION}): {file_path}")
+            if meta["stemmer_version"] != STEMMER_VERSION:
+                raise ValueError(f"{file_path} was built with stemmer version {meta['stemmer_version']}.")
+            statistics = cls(stemmer, **meta["parameters"])
+            statistics.num_documents = meta["num_documents"]
+            statistics.num_tokens = meta["num_tokens"]
+            statistics.distinct_words.registers = arrays["words_hll"]
+            variant_precision = meta["parameters"]["variant_precision"]
+            for mode, mode_statistics in statistics.modes.items():
+                mode_meta = meta["modes"][mode]
+                mode_statistics.num_tokens = mode_meta["num_tokens"]
+                mode_statistics.changed_tokens = mode_meta["changed_tokens"]
+                mode_statistics.heavy_hitters.counters = mode_meta["heavy_hitters"]
+                mode_statistics.count_min.table = arrays[f"{mode}_count_min"]
+                mode_statistics.distinct_stems.registers = arrays[f"{mode}_hll"]
+                mode_statistics.variants = {
+                    stem: HyperLogLog(variant_precision, registers)
+                    for stem, registers in zip(mode_meta["variant_stems"], arrays[f"{mode}_variants"])
+                }
+        return statistics
+
+
+def format_report(report: Mapping[str, object]) -> str:
+    """Return the report as a table per mode."""
+    lines = [
+        f"Documents: {report['num_documents']}  tokens: {report['num_tokens']}  "
+        f"distinct words: ~{report['distinct_words']}"
+    ]
+    for mode, mode_report in report["modes"].items():
+        lines.append("")
+        lines.append(
+            f"{mode}: ~{mode_report['distinct_stems']} distinct stems "
+            f"(vocabulary reduction {mode_report['vocabulary_reduction']:.1%}, "
+            f"{mode_report['average_class_size']:.2f} words per stem), "
+            f"{mode_report['changed_token_fraction']:.1%} of tokens changed"
+        )
+        for rank, top_stem in enumerate(mode_report["top_stems"], 1):
+            variants = "?" if top_stem["variants"] is None else top_stem["variants"]
+            lines.append(f"  {rank:>4}  {top_stem['stem']:<24} {top_stem['count']:>12}  {variants} variants")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    from config.utils import Utils
+
+    parser = argparse.ArgumentParser(description="Compare the stemming modes over a corpus with mergeable sketches")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    collect_parser = subparsers.add_parser("collect", help="Collect the statistics of a corpus (or shard)")
+    collect_parser.add_argument(
+        "-if",
+        "--input_file",
+        type=str,
+        required=True,
+        help="Path to input text file ('-' for stdin), possibly compressed, a directory or a glob pattern"
+    )
+    collect_parser.add_argument("-of", "--output_file", type=str, required=True, help="Path of the statistics (.npz)")
+    collect_parser.add_argument(
+        "-mb",
+        "--memory_budget",
+        type=int,
+        default=64,
+        help="Memory budget of the sketches in MiB (default: 64); statistics to merge need the same budget"
+    )
+    collect_parser.add_argument(
+        "-bs",
+        "--batch_size",
+        type=int,
+        default=10000,
+        help="Number of documents counted exactly before their stems go into the sketches (default: 10000)"
+    )
+
+    merge_parser = subparsers.add_parser("merge", help="Merge the statistics of several shards")
+    merge_parser.add_argument("-i", "--inputs", type=str, nargs="+", required=True, help="Paths of the statistics")
+    merge_parser.add_argument("-of", "--output_file", type=str, required=True, help="Path of the merged statistics")
+
+    report_parser = subparsers.add_parser("report", help="Print the statistics of every mode")
+    report_parser.add_argument("-i", "--input", type=str, required=True, help="Path of the statistics")
+    report_parser.add_argument("-k", "--top_k", type=int, default=20, help="Number of top stems (default: 20)")
+    report_parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    if args.command == "collect":
+        utils = Utils()
+        statistics = CorpusStatistics(**sketch_parameters(args.memory_budget << 20))
+        statistics.add_documents(utils.iter_corpora(utils.expand_corpus_paths(args.input_file)), args.batch_size)
+        statistics.save(Path(args.output_file))
+        print(
+            f"Saved the statistics of {statistics.num_documents} documents ({statistics.num_tokens} tokens, "
+            f"{statistics.memory_bytes() >> 20} MiB of sketches) to {args.output_file}"
+        )
+    elif args.command == "merge":
+        statistics = CorpusStatistics.load(Path(args.inputs[0]))
+        for input_path in args.inputs[1:]:
+            try:
+                statistics.merge(CorpusStatistics.load(Path(input_path)))
+            except ValueError as error:
+                parser.error(f"{input_path}: {error}")
+        statistics.save(Path(args.output_file))
+        print(f"Merged {len(args.inputs)} statistics ({statistics.num_documents} documents) into {args.output_file}")
+    else:
+        report = CorpusStatistics.load(Path(args.input)).report(args.top_k)
+        print(json.dumps(report, ensure_ascii=False, indent=2) if args.json else format_report(report))
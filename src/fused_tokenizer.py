@@ -0,0 +1,46 @@
+import re
+from typing import Iterator, List, Tuple
+from tetuntokenizer import tetun_patterns
+
+#!/usr/bin/env python3
+#
+# src.fused_tokenizer.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+# The TetunSimpleTokenizer patterns, matched on the original (not lowercased) text. The letter class
+# already has both cases; the Kelvin sign is the only other character lowercasing into it (to "k").
+# Known difference: "İ" (lowercased to "i" plus a combining dot) is not matched.
+FUSED_TOKEN_PATTERN = re.compile(
+    tetun_patterns.TETUN_TEXT_PATTERN.replace("A-Za-z", "A-Za-z\u212a") + "|" + tetun_patterns.DIGITS_PATTERN
+)
+
+
+class FusedTokenizer:
+    """
+    Lowercase, normalize apostrophes and tokenize in a single scan of the original text,
+    producing the same tokens as TextPreprocessing followed by TetunSimpleTokenizer.
+    Tokens are available lazily, with their (start, end) offsets in the original text.
+    """
+
+    def __init__(self) -> None:
+        self.pattern = FUSED_TOKEN_PATTERN
+
+    def iter_spans(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield the (start, end) offsets of every token in the original text."""
+        for match in self.pattern.finditer(text):
+            yield match.span()
+
+    def iter_tokens_with_spans(self, text: str) -> Iterator[Tuple[str, int, int]]:
+        """Yield every preprocessed token with its (start, end) offsets in the original text."""
+        for match in self.pattern.finditer(text):
+            yield match.group().lower().replace("'", "’"), match.start(), match.end()
+
+    def iter_tokens(self, text: str) -> Iterator[str]:
+        """Yield every preprocessed token."""
+        for match in self.pattern.finditer(text):
+            yield match.group().lower().replace("'", "’")
+
+    def tokenize(self, text: str) -> List[str]:
+        """Return the list of preprocessed tokens."""
+        return [token.lower().replace("'", "’") for token in self.pattern.findall(text)]
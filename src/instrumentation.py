@@ -0,0 +1,60 @@
+import threading
+from typing import Callable, Dict, Iterable, Optional
+
+#!/usr/bin/env python3
+#
+# src.instrumentation.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+NO_MATCH_NAME = "no_match"
+
+# Profiling hook called after every stemmed word with (mode, rule name, word, stemmed word, seconds).
+RuleHook = Callable[[str, str, str, str, float], None]
+
+
+class RuleStatistics:
+    """Hit counts and cumulative time of every rule of a stemmer pipeline (safe to update from several threads)."""
+
+    def __init__(self, mode: str, rule_names: Iterable[str], hook: Optional[RuleHook] = None) -> None:
+        self.mode = mode
+        self.rule_names = list(rule_names) + [NO_MATCH_NAME]
+        self.hook = hook
+        self.hits: Dict[str, int] = {}
+        self.seconds: Dict[str, float] = {}
+        self.lock = threading.Lock()
+        self.reset()
+
+    def record(self, rule_name: str, word: str, stemmed_word: str, seconds: float) -> None:
+        """Count a word handled by the given rule and call the profiling hook, if any."""
+        with self.lock:
+            self.hits[rule_name] += 1
+            self.seconds[rule_name] += seconds
+        if self.hook is not None:
+            self.hook(self.mode, rule_name, word, stemmed_word, seconds)
+
+    def reset(self) -> None:
+        """Reset the counters of every rule."""
+        with self.lock:
+            self.hits = dict.fromkeys(self.rule_names, 0)
+            self.seconds = dict.fromkeys(self.rule_names, 0.0)
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        """Return the hits and cumulative seconds of every rule."""
+        with self.lock:
+            return {name: {"hits": self.hits[name], "seconds": self.seconds[name]} for name in self.rule_names}
+
+    def report(self, cached_words: int = 0) -> str:
+        """
+        Format the statistics as a table, ordered by cumulative time. Words served by a stem cache
+        skip the rules and their counters; give their number (the cache hits) to note it.
+        """
+        total_hits = sum(self.hits.values()) or 1
+        lines = [f"Rule statistics ({self.mode})", f"{'rule':15} {'hits':>10} {'share':>7} {'seconds':>10} {'us/word':>8}"]
+        for name in sorted(self.rule_names, key=self.seconds.get, reverse=True):
+            hits, seconds = self.hits[name], self.seconds[name]
+            per_word = seconds / hits * 1e6 if hits else 0.0
+            lines.append(f"{name:15} {hits:10d} {hits / total_hits:7.1%} {seconds:10.4f} {per_word:8.2f}")
+        if cached_words:
+            lines.append(f"{cached_words} words served by the stem cache skipped the rules and are not counted")
+        return "\n".join(lines)
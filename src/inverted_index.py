@@ -0,0 +1,317 @@
+import argparse
+import json
+import math
+import mmap
+import os
+import tempfile
+import numpy as np
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from src.stemmer import STEMMER_MODES, LabadainStemmer
+from src.stem_cache import StemCache
+from src.term_frequencies import TermFrequencies
+
+#!/usr/bin/env python3
+#
+# src.inverted_index.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+# Index directory layout:
+#   meta.json              mode, number of documents, terms and postings
+#   terms.bin              UTF-8 stems sorted in code point order, concatenated
+#   term_byte_offsets.npy  start of each stem in terms.bin (number of terms + 1, uint64)
+#   term_offsets.npy       start of each term's postings (number of terms + 1, uint64)
+#   doc_deltas.npy         delta-encoded document ids of all postings, term after term
+#   term_freqs.npy         term frequency of every posting
+#   doc_lengths.npy        number of tokens of every document
+INDEX_FILES = (
+    "terms.bin", "term_byte_offsets.npy", "term_offsets.npy", "doc_deltas.npy", "term_freqs.npy", "doc_lengths.npy"
+)
+
+
+class InvertedIndexBuilder:
+    """
+    Build a stemmed inverted index from a document collection, one document at a time.
+    Postings are kept in memory until there are max_postings of them, then written as a run to a
+    temporary directory (in temp_dir, or the system's); write() scatters the runs into the
+    postings of the index and delta-encodes them in blocks, so memory is bounded by max_postings
+    and the stem dictionary. More documents can be added after write(); the runs are removed
+    with the builder.
+    """
+
+    def __init__(
+        self,
+        mode: str = "light",
+        cache_size: int = 100000,
+        max_postings: int = 1 << 22,
+        temp_dir: Optional[Path] = None
+    ) -> None:
+        self.mode = mode
+        self.stemmer = LabadainStemmer(mode=mode, cache=StemCache(cache_size) if cache_size > 0 else None)
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        self.num_postings = 0
+        self.max_postings = max_postings
+        self.temp_dir = temp_dir
+        self.run_dir: Optional[tempfile.TemporaryDirectory] = None
+        self.num_runs = 0
+        self.max_term_freq = 0
+        self.term_frequencies = TermFrequencies(self.stemmer)
+        self.doc_lengths = self.term_frequencies.doc_lengths
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    @property
+    def num_terms(self) -> int:
+        """Number of distinct stems indexed so far."""
+        return len(self.term_frequencies.document_frequencies)
+
+    def add_document(self, text: str) -> int:
+        """Preprocess, stem and index a document, returning its id."""
+        doc_id = len(self.doc_lengths)
+        counts = self.term_frequencies.add_document(text)
+        for stem, term_freq in counts.items():
+            postings = self.postings.get(stem)
+            if postings is None:
+                postings = self.postings[stem] = (array("I"), array("I"))
+            postings[0].append(doc_id)
+            postings[1].append(term_freq)
+        self.num_postings += len(counts)
+        if self.num_postings >= self.max_postings:
+            self.flush_run()
+        return doc_id
+
+    def add_documents(self, documents: Iterable[str]) -> None:
+        """Index every document of the collection."""
+        for document in documents:
+            self.add_document(document)
+
+    def run_path(self, run_number: int) -> Path:
+        """Path prefix of the files of a run."""
+        return Path(self.run_dir.name) / f"run-{run_number:05d}"
+
+    def flush_run(self) -> None:
+        """Write the postings held in memory as a run (terms, document frequencies and postings) and start a new one."""
+        if not self.postings:
+            return
+        if self.run_dir is None:
+            self.run_dir = tempfile.TemporaryDirectory(prefix="labadain-index-", dir=self.temp_dir)
+        run_path = self.run_path(self.num_runs)
+        terms = list(self.postings)
+        with run_path.with_suffix(".terms").open("w", encoding="utf-8") as f_terms:
+            # Stems never contain a newline (the tokenizer splits on whitespace)
+            f_terms.write("\n".join(terms))
+        postings = [self.postings[term] for term in terms]
+        term_freqs = np.concatenate([np.frombuffer(freqs, dtype=np.uint32) for _, freqs in postings])
+        self.max_term_freq = max(self.max_term_freq, int(term_freqs.max()))
+        np.save(run_path.with_suffix(".doc_freqs.npy"), np.fromiter((len(ids) for ids, _ in postings), np.uint64, len(terms)))
+        np.save(run_path.with_suffix(".doc_ids.npy"), np.concatenate([np.frombuffer(ids, dtype=np.uint32) for ids, _ in postings]))
+        np.save(run_path.with_suffix(".term_freqs.npy"), term_freqs)
+        self.postings = {}
+        self.num_postings = 0
+        self.num_runs += 1
+
+    def write(self, index_dir: Path, block_size: int = 1 << 22) -> None:
+        """Write the stem dictionary and the delta-encoded postings of the runs to the index directory."""
+        index_dir.mkdir(parents=True, exist_ok=True)
+        self.flush_run()
+        # Code point order, which is also the byte order of the UTF-8 stems
+        terms = sorted(self.term_frequencies.document_frequencies)
+        term_ids = {term: term_id for term_id, term in enumerate(terms)}
+        document_frequencies = self.term_frequencies.document_frequencies
+        term_offsets = np.zeros(len(terms) + 1, dtype=np.uint64)
+        np.cumsum(np.fromiter((document_frequencies[term] for term in terms), np.uint64, len(terms)), out=term_offsets[1:])
+        total = int(term_offsets[-1])
+
+        # Scatter the postings of every run after those of the earlier runs of the same term
+        doc_ids = open_array(Path(self.run_dir.name) / "doc_ids.npy", np.uint32, total) if total else None
+        term_freqs = open_array(index_dir / "term_freqs.npy", np.min_scalar_type(self.max_term_freq), total)
+        filled = term_offsets[:-1].astype(np.int64)
+        for run_number in range(self.num_runs):
+            run_path = self.run_path(run_number)
+            with run_path.with_suffix(".terms").open(encoding="utf-8") as f_terms:
+                run_term_ids = np.fromiter((term_ids[term] for term in f_terms.read().split("\n")), np.int64)
+            run_doc_freqs = np.load(run_path.with_suffix(".doc_freqs.npy")).astype(np.int64)
+            run_starts = np.cumsum(run_doc_freqs) - run_doc_freqs
+            positions = np.repeat(filled[run_term_ids] - run_starts, run_doc_freqs) + np.arange(int(run_doc_freqs.sum()))
+            filled[run_term_ids] += run_doc_freqs
+            doc_ids[positions] = np.load(run_path.with_suffix(".doc_ids.npy"), mmap_mode="r")
+            term_freqs[positions] = np.load(run_path.with_suffix(".term_freqs.npy"), mmap_mode="r")
+
+        # Delta encoding keeps the gaps small, so they usually fit a narrower integer type
+        term_starts = term_offsets[:-1].astype(np.int64)
+        max_doc_delta = 0
+        for start, end, deltas in iter_doc_deltas(doc_ids, term_starts, total, block_size):
+            max_doc_delta = max(max_doc_delta, int(deltas.max()))
+        doc_deltas = open_array(index_dir / "doc_deltas.npy", np.min_scalar_type(max_doc_delta), total)
+        for start, end, deltas in iter_doc_deltas(doc_ids, term_starts, total, block_size):
+            doc_deltas[start:end] = deltas
+        for mapped_array in (doc_deltas, term_freqs):
+            if isinstance(mapped_array, np.memmap):
+                mapped_array.flush()
+        del doc_ids
+
+        encoded_terms = [term.encode("utf-8") for term in terms]
+        with (index_dir / "terms.bin").open("wb") as f_terms:
+            f_terms.write(b"".join(encoded_terms))
+        term_byte_offsets = np.zeros(len(terms) + 1, dtype=np.uint64)
+        np.cumsum(np.fromiter(map(len, encoded_terms), np.uint64, len(terms)), out=term_byte_offsets[1:])
+        np.save(index_dir / "term_byte_offsets.npy", term_byte_offsets)
+        np.save(index_dir / "term_offsets.npy", term_offsets)
+        np.save(index_dir / "doc_lengths.npy", np.frombuffer(self.doc_lengths, dtype=np.uint32))
+        with (index_dir / "meta.json").open("w", encoding="utf-8") as f_meta:
+            json.dump({
+                "mode": self.mode,
+                "num_documents": len(self.doc_lengths),
+                "num_terms": len(terms),
+                "num_postings": total,
+            }, f_meta, indent=2)
+
+
+def iter_doc_deltas(
+    doc_ids: np.ndarray,
+    term_starts: np.ndarray,
+    total: int,
+    block_size: int
+) -> Iterator[Tuple[int, int, np.ndarray]]:
+    """Yield the gaps between the document ids of every term (the first id of a term as is), block after block."""
+    for start in range(0, total, block_size):
+        end = min(start + block_size, total)
+        block = doc_ids[start:end].astype(np.int64)
+        deltas = np.diff(block, prepend=int(doc_ids[start - 1]) if start else 0)
+        first = term_starts[np.searchsorted(term_starts, start):np.searchsorted(term_starts, end)]
+        deltas[first - start] = block[first - start]
+        yield start, end, deltas
+
+
+def open_array(file_path: Path, dtype: np.dtype, size: int) -> np.ndarray:
+    """Create a .npy file of the given size, memory-mapped for writing (an empty array cannot be mapped)."""
+    if size == 0:
+        np.save(file_path, np.empty(0, dtype=dtype))
+        return np.empty(0, dtype=dtype)
+    return np.lib.format.open_memmap(file_path, mode="w+", dtype=dtype, shape=(size,))
+
+
+class InvertedIndex:
+    """
+    A stemmed inverted index, memory-mapped from its directory for querying. Stems are looked up
+    by binary search over the mapped stem dictionary, so opening an index reads no term.
+    """
+
+    def __init__(self, index_dir: Path, k1: float = 1.2, b: float = 0.75) -> None:
+        with (index_dir / "meta.json").open(encoding="utf-8") as f_meta:
+            self.meta = json.load(f_meta)
+        self.mode = self.meta["mode"]
+        self.num_terms = self.meta["num_terms"]
+        with (index_dir / "terms.bin").open("rb") as f_terms:
+            # An empty file cannot be memory-mapped (no terms, or only the empty stem)
+            size = os.fstat(f_terms.fileno()).st_size
+            self.terms = mmap.mmap(f_terms.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        # Indexed through a memoryview, which is much faster than NumPy scalar indexing
+        self.term_byte_offsets = memoryview(np.load(index_dir / "term_byte_offsets.npy", mmap_mode="r"))
+        self.term_offsets = np.load(index_dir / "term_offsets.npy", mmap_mode="r")
+        self.doc_deltas = np.load(index_dir / "doc_deltas.npy", mmap_mode="r")
+        self.term_freqs = np.load(index_dir / "term_freqs.npy", mmap_mode="r")
+        self.doc_lengths = np.load(index_dir / "doc_lengths.npy", mmap_mode="r")
+        self.num_documents = len(self.doc_lengths)
+        self.average_length = float(self.doc_lengths.mean()) if self.num_documents else 0.0
+        self.k1 = k1
+        self.b = b
+        self.stemmer = LabadainStemmer(mode=self.mode)
+
+    def term_at(self, term_id: int) -> bytes:
+        """Return the UTF-8 bytes of the stem with the given id."""
+        return self.terms[self.term_byte_offsets[term_id]:self.term_byte_offsets[term_id + 1]]
+
+    def term_id(self, stem: str) -> Optional[int]:
+        """Return the id of a stem, or None if it is not indexed."""
+        target = stem.encode("utf-8")
+        low, high = 0, self.num_terms
+        while low < high:
+            middle = (low + high) // 2
+            if self.term_at(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.num_terms and self.term_at(low) == target:
+            return low
+        return None
+
+    def __len__(self) -> int:
+        return self.num_documents
+
+    def postings(self, stem: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the document ids and term frequencies of a stem (empty arrays if not indexed)."""
+        term_id = self.term_id(stem)
+        if term_id is None:
+            return np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.uint32)
+        start, end = int(self.term_offsets[term_id]), int(self.term_offsets[term_id + 1])
+        doc_ids = np.cumsum(self.doc_deltas[start:end], dtype=np.uint64).astype(np.uint32)
+        return doc_ids, np.asarray(self.term_freqs[start:end], dtype=np.uint32)
+
+    def stem_query(self, query: str) -> List[str]:
+        """Preprocess and stem a query with the mode the index was built with."""
+        return self.stemmer.stem_tokens(self.stemmer.fused_tokenizer.tokenize(query))
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[int, float]]:
+        """Rank the documents matching the query with BM25, returning (doc id, score) pairs."""
+        scores = np.zeros(self.num_documents, dtype=np.float64)
+        length_norm = None
+        for stem, query_freq in Counter(self.stem_query(query)).items():
+            doc_ids, term_freqs = self.postings(stem)
+            if not len(doc_ids):
+                continue
+            if length_norm is None:
+                length_norm = self.k1 * (1 - self.b + self.b * self.doc_lengths / (self.average_length or 1.0))
+            idf = math.log(1 + (self.num_documents - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5))
+            term_freqs = term_freqs.astype(np.float64)
+            scores[doc_ids] += query_freq * idf * term_freqs * (self.k1 + 1) / (term_freqs + length_norm[doc_ids])
+
+        matched = np.flatnonzero(scores)
+        if not len(matched):
+            return []
+        top = matched[np.argsort(-scores[matched], kind="stable")[:top_k]]
+        return [(int(doc_id), float(scores[doc_id])) for doc_id in top]
+
+
+if __name__ == "__main__":
+    from config.utils import Utils
+
+    parser = argparse.ArgumentParser(description="Build or query a stemmed inverted index")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Index a collection with one document per line")
+    build_parser.add_argument("-if", "--input_file", type=str, required=True, help="Path to input text file ('-' for stdin)")
+    build_parser.add_argument("-od", "--output_dir", type=str, required=True, help="Path to the index directory")
+    build_parser.add_argument(
+        "-m",
+        "--mode",
+        choices=STEMMER_MODES,
+        default="light",
+        help="Choose stemming mode (default: light)"
+    )
+    build_parser.add_argument(
+        "--max_postings",
+        type=int,
+        default=1 << 22,
+        help="Postings held in memory before they are written to a temporary run (default: 4194304)"
+    )
+
+    search_parser = subparsers.add_parser("search", help="Query an index")
+    search_parser.add_argument("-id", "--index_dir", type=str, required=True, help="Path to the index directory")
+    search_parser.add_argument("-q", "--query", type=str, required=True, help="Query text")
+    search_parser.add_argument("-k", "--top_k", type=int, default=10, help="Number of results (default: 10)")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        builder = InvertedIndexBuilder(args.mode, max_postings=args.max_postings)
+        builder.add_documents(Utils().iter_corpus(Path(args.input_file)))
+        builder.write(Path(args.output_dir))
+        print(f"Indexed {len(builder)} documents and {builder.num_terms} stems in {args.output_dir}")
+    else:
+        index = InvertedIndex(Path(args.index_dir))
+        for doc_id, score in index.search(args.query, args.top_k):
+            print(f"{doc_id}\t{score:.4f}")
@@ -1,4 +1,5 @@
-from typing import List, Tuple
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
 
 #!/usr/bin/env python3
 #
@@ -8,6 +9,25 @@ from typing import List, Tuple
 
 TETUN_VOWELS = "aeiouáéíóú"
 
+# Precompiled vowel lookups used to find the regions of a word.
+VOWEL_SET = frozenset(TETUN_VOWELS)
+VOWEL_PATTERN = re.compile(f"[{TETUN_VOWELS}]")
+CONSONANT_PATTERN = re.compile(f"[^{TETUN_VOWELS}]")
+REGIONS_R1_R2_PATTERN = re.compile(
+    f"[{TETUN_VOWELS}]([^{TETUN_VOWELS}])(?:.*?[{TETUN_VOWELS}]([^{TETUN_VOWELS}]))?", re.DOTALL
+)
+
+# Core methods that accept a precomputed WordRegions descriptor.
+REGION_METHODS = frozenset([
+    "simple_replace_suffixes", "process_amente_suffix", "process_mente_suffix",
+    "process_idades_suffixes", "process_ivos_suffixes", "residual_suffixes_removal",
+    "standard_suffix_removal", "verb_suffix_removal"
+])
+
+
+# The start positions of the R1, R2 and RV regions of a word, as a (r1, r2, rv) tuple.
+WordRegions = Tuple[int, int, int]
+
 
 class LabadainStemmerCore:
     """Stemmer Core Class for Portuguese Loanwords."""
@@ -15,26 +35,66 @@ class LabadainStemmerCore:
     def __init__(self):
         pass
 
-    def find_r1_r2_positions(self, word: str) -> Tuple[int]:
+    def find_regions(self, word: str) -> WordRegions:
         """
-        Define the start positions of R1 and R2.
+        Define the start positions of R1, R2 and RV: one regex search finds R1 and R2, and at most
+        one more search (from the third letter) finds RV.
         R1 and R2 definitions: http://snowball.tartarus.org/texts/r1r2.html
+        RV definition: http://snowball.tartarus.org/algorithms/spanish/stemmer.html
         """
-        r1 = len(word)
-        r2 = len(word)
+        word_length = len(word)
+
+        # R1 starts after the first vowel followed by a non-vowel, R2 after the next one
+        match = REGIONS_R1_R2_PATTERN.search(word)
+        if match is None:
+            r1 = r2 = word_length
+        else:
+            r1 = match.end(1)
+            r2 = match.end(2)
+            if r2 == -1:
+                r2 = word_length
+
+        if word_length < 3:
+            rv = word_length
+
+        # Case 1: Second letter is a consonant, find the region after the next following vowel.
+        elif word[1] not in VOWEL_SET:
+            match = VOWEL_PATTERN.search(word, 2)
+            rv = match.end() if match else word_length
+
+        # Case 2: First two letters are vowels, find the region after the next consonant
+        elif word[0] in VOWEL_SET:
+            match = CONSONANT_PATTERN.search(word, 2)
+            rv = match.end() if match else word_length
+
+        # Case 3: Consonant-Vowel case, RV is the region after the third letter
+        # Case 4: RV is the end of the word if these positions cannot be found
+        else:
+            rv = 3 if word_length > 3 else word_length
 
-        # Find R1
-        for i in range(1, len(word)):
-            if word[i] not in TETUN_VOWELS and word[i-1] in TETUN_VOWELS:
-                r1 = i + 1
-                break
+        return r1, r2, rv
 
-        # Find R2
-        for i in range(r1 + 1, len(word)):
-            if word[i] not in TETUN_VOWELS and word[i-1] in TETUN_VOWELS:
-                r2 = i + 1
-                break
+    def find_regions_batch(self, words: Iterable[str]) -> List[WordRegions]:
+        """
+        Define the R1, R2 and RV positions of many words, in the order of the words. Every distinct
+        word is scanned once with find_regions; repeated words reuse its regions.
+        """
+        find_regions = self.find_regions
+        word_regions: Dict[str, WordRegions] = {}
+        batch_regions = []
+        for word in words:
+            regions = word_regions.get(word)
+            if regions is None:
+                regions = word_regions[word] = find_regions(word)
+            batch_regions.append(regions)
+        return batch_regions
 
+    def find_r1_r2_positions(self, word: str) -> Tuple[int]:
+        """
+        Define the start positions of R1 and R2.
+        R1 and R2 definitions: http://snowball.tartarus.org/texts/r1r2.html
+        """
+        r1, r2, _ = self.find_regions(word)
         return r1, r2
 
     def find_rv_position(self, word: str) -> int:
@@ -42,34 +102,11 @@ class LabadainStemmerCore:
         Define the RV position.
         RV definition: http://snowball.tartarus.org/algorithms/spanish/stemmer.html
         """
-        second_char_consonant = word[1] not in TETUN_VOWELS
-        first_two_vowels = all(char in TETUN_VOWELS for char in word[:2])
-
-        if len(word) < 3:
-            return len(word)
-
-        # Case 1: Second letter is a consonant, find the region after the next following vowel.
-        if second_char_consonant:
-            for i in range(2, len(word)):
-                if word[i] in TETUN_VOWELS:
-                    return i + 1
-            return len(word)
-
-        # Case 2: First two letters are vowels, find the region after the next consonant
-        elif first_two_vowels:
-            for i in range(2, len(word)):
-                if word[i] not in TETUN_VOWELS:
-                    return i + 1
-            return len(word)
-
-        else:
-            # Case 3: Consonant-Vowel case, RV is the region after the third letter
-            # Case 4: RV is the end of the word if these positions cannot be found
-            return 3 if len(word) > 3 else len(word)
+        return self.find_regions(word)[2]
 
-    def simple_replace_suffixes(self, word: str, suffixes: List[str], term_to_replace_suffix: str) -> str:
+    def simple_replace_suffixes(self, word: str, suffixes: List[str], term_to_replace_suffix: str, regions: Optional[WordRegions] = None) -> str:
         """When a word terminates with "suffixes in the list", replace it with "term defined" if in R2."""
-        _, r2 = self.find_r1_r2_positions(word)
+        r2 = (regions or self.find_regions(word))[1]
         for suffix in suffixes:
             suffix_index = len(word) - len(suffix)
             if word.endswith(suffix) and suffix_index >= r2:
@@ -77,14 +114,14 @@ class LabadainStemmerCore:
 
         return word
 
-    def process_amente_suffix(self, word: str, suffix: str) -> str:
+    def process_amente_suffix(self, word: str, suffix: str, regions: Optional[WordRegions] = None) -> str:
         """
         When a word terminates with "amente" suffix:
         1. Delete if in R1.
         2. If preceded by iv, delete if in R2 (and if further preceded by at, delete if in R2), otherwise.
         3. If preceded by oz, ik or ad, delete if in R2.
         """
-        r1, r2 = self.find_r1_r2_positions(word)
+        r1, r2, _ = regions or self.find_regions(word)
         # Check if the suffix is in R1
         if word.endswith(suffix):
             suffix_index = len(word) - len(suffix)
@@ -115,13 +152,13 @@ class LabadainStemmerCore:
 
         return word
 
-    def process_mente_suffix(self, word: str, suffix: str) -> str:
+    def process_mente_suffix(self, word: str, suffix: str, regions: Optional[WordRegions] = None) -> str:
         """
         When a word terminates with "mente":
         1. Delete if in R2.
         2. if preceded by "ante", "avel" or "ível", delete if in R2.
         """
-        _, r2 = self.find_r1_r2_positions(word)
+        r2 = (regions or self.find_regions(word))[1]
         if word.endswith(suffix):
             suffix_index = len(word) - len(suffix)
             if suffix_index >= r2:
@@ -137,13 +174,13 @@ class LabadainStemmerCore:
 
         return word
 
-    def process_idades_suffixes(self, word: str, suffixes: List[str]) -> str:
+    def process_idades_suffixes(self, word: str, suffixes: List[str], regions: Optional[WordRegions] = None) -> str:
         """
         When a word terminates with "idade" or "idades":
         1. Delete if in R2.
         2. If preceded by "abil", "is" or "iv", delete if in R2.
         """
-        _, r2 = self.find_r1_r2_positions(word)
+        r2 = (regions or self.find_regions(word))[1]
         for suffix in suffixes:
             if word.endswith(suffix):
                 suffix_index = len(word) - len(suffix)
@@ -160,13 +197,13 @@ class LabadainStemmerCore:
 
         return word
 
-    def process_ivos_suffixes(self, word: str, suffixes: List[str]) -> str:
+    def process_ivos_suffixes(self, word: str, suffixes: List[str], regions: Optional[WordRegions] = None) -> str:
         """
         When a word terminates with "ivu", "iva, "ivus or "ivas":
         1. Delete if in R2
         2. If preceded by "at", delete if in R2
         """
-        _, r2 = self.find_r1_r2_positions(word)
+        r2 = (regions or self.find_regions(word))[1]
         for suffix in suffixes:
             if word.endswith(suffix):
                 suffix_index = len(word) - len(suffix)
@@ -181,9 +218,9 @@ class LabadainStemmerCore:
 
         return word
 
-    def residual_suffixes_removal(self, word: str, suffixes: List[str]) -> str:
+    def residual_suffixes_removal(self, word: str, suffixes: List[str], regions: Optional[WordRegions] = None) -> str:
         """Delete suffix "a", "e", "i", "u", or "us", if in RV."""
-        rv = self.find_rv_position(word)
+        rv = (regions or self.find_regions(word))[2]
         for suffix in suffixes:
             suffix_index = len(word) - len(suffix)
             if word.endswith(suffix) and suffix_index >= rv:
@@ -191,10 +228,10 @@ class LabadainStemmerCore:
 
         return word
 
-    def standard_suffix_removal(self, word: str, suffixes: List[str]) -> str:
+    def standard_suffix_removal(self, word: str, suffixes: List[str], presorted: bool = False, regions: Optional[WordRegions] = None) -> str:
         """Remove a suffix from the given word."""
-        _, r2 = self.find_r1_r2_positions(word)
-        sorted_suffixes = sorted(suffixes, key=len, reverse=True)
+        r2 = (regions or self.find_regions(word))[1]
+        sorted_suffixes = suffixes if presorted else sorted(suffixes, key=len, reverse=True)
         for suffix in sorted_suffixes:
             suffix_index = len(word) - len(suffix)
             if word.endswith(suffix) and suffix_index >= r2:
@@ -202,10 +239,10 @@ class LabadainStemmerCore:
 
         return word
 
-    def verb_suffix_removal(self, word: str, suffixes: List[str]) -> str:
+    def verb_suffix_removal(self, word: str, suffixes: List[str], presorted: bool = False, regions: Optional[WordRegions] = None) -> str:
         """Remove a suffix from the given word."""
-        rv = self.find_rv_position(word)
-        sorted_suffixes = sorted(suffixes, key=len, reverse=True)
+        rv = (regions or self.find_regions(word))[2]
+        sorted_suffixes = suffixes if presorted else sorted(suffixes, key=len, reverse=True)
         for suffix in sorted_suffixes:
             suffix_index = len(word) - len(suffix)
             if word.endswith(suffix) and suffix_index >= rv:
@@ -213,9 +250,9 @@ class LabadainStemmerCore:
 
         return word
 
-    def tetun_suffix_removal(self, word: str, suffixes: List[str]) -> str:
+    def tetun_suffix_removal(self, word: str, suffixes: List[str], presorted: bool = False) -> str:
         """Remove a suffix from the given word if the remaining root length is greater than two."""
-        sorted_suffixes = sorted(suffixes, key=len, reverse=True)
+        sorted_suffixes = suffixes if presorted else sorted(suffixes, key=len, reverse=True)
         for suffix in sorted_suffixes:
             if word.endswith(suffix):
                 stemmed_word = word[:-len(suffix)]
@@ -225,9 +262,9 @@ class LabadainStemmerCore:
 
         return word
 
-    def tetun_prefix_removal(self, word: str, prefixes: List[str]) -> str:
+    def tetun_prefix_removal(self, word: str, prefixes: List[str], presorted: bool = False) -> str:
         "Remove a prefix from the given word if the remaining root length is greater than two."
-        sorted_prefixes = sorted(prefixes, key=len, reverse=True)
+        sorted_prefixes = prefixes if presorted else sorted(prefixes, key=len, reverse=True)
         for prefix in sorted_prefixes:
             if word.startswith(prefix):
                 stemmed_word = word[len(prefix):]
@@ -0,0 +1,247 @@
+import json
+import os
+import sys
+from abc import ABC, abstractmethod
+from array import array
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+#!/usr/bin/env python3
+#
+# src.output_writers.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+# Stem id directory layout:
+#   meta.json            number of documents, tokens and stems, dtypes
+#   vocabulary.txt       interned stems in order of first occurrence, one per line ending with a newline
+#                        (line number = stem id; the empty stem is an empty line)
+#   stem_ids.bin         stem id of every token, document after document (little-endian uint32)
+#   doc_offsets.bin      start of each document's stem ids (number of documents + 1, little-endian uint64)
+STEM_ID_DTYPE = "<u4"
+DOC_OFFSET_DTYPE = "<u8"
+
+
+class DocumentWriter(ABC):
+    """Base class of the stemmed document writers: one write() call per document."""
+
+    def __enter__(self) -> "DocumentWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @abstractmethod
+    def write(self, stems: Sequence[str]) -> None:
+        """Write the stems of a document."""
+
+    def write_all(self, documents: Iterable[Sequence[str]]) -> None:
+        """Write every document of the collection."""
+        for stems in documents:
+            self.write(stems)
+
+    @abstractmethod
+    def close(self) -> None:
+        """Flush and close the output."""
+
+
+class LineWriter(DocumentWriter):
+    """Base class of the writers of one line per document, which can be synced to resume writing later."""
+
+    def __init__(self, path: Path, append: bool) -> None:
+        self.file = path.open("a" if append else "w", encoding="utf-8")
+
+    def sync(self) -> int:
+        """Flush the written documents to disk and return the size of the output in bytes."""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return self.file.tell()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class TextWriter(LineWriter):
+    """Write (or, with append=True, append) every document to a text file as a line of space-separated stems."""
+
+    def __init__(self, path: Path, append: bool = False) -> None:
+        super().__init__(path, append)
+
+    def write(self, stems: Sequence[str]) -> None:
+        self.file.write(" ".join(stems) + "\n")
+
+
+class JsonlWriter(LineWriter):
+    """
+    Write every document as a JSON object with its id and list of stems, one per line.
+    With append=True, the documents are added to an existing file, numbered from first_id.
+    """
+
+    def __init__(self, path: Path, append: bool = False, first_id: int = 0) -> None:
+        super().__init__(path, append)
+        self.num_documents = first_id
+
+    def write(self, stems: Sequence[str]) -> None:
+        self.file.write(json.dumps({"id": self.num_documents, "stems": list(stems)}, ensure_ascii=False) + "\n")
+        self.num_documents += 1
+
+
+class StemIdWriter(DocumentWriter):
+    """
+    Write the documents as a binary stream of uint32 stem ids with per-document offsets, and the
+    interned stem vocabulary (see the directory layout above). Ids are buffered and written in
+    blocks of buffer_size; the vocabulary and offsets are written on close().
+    """
+
+    def __init__(self, output_dir: Path, buffer_size: int = 1 << 16) -> None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self.output_dir = output_dir
+        self.buffer_size = buffer_size
+        self.vocabulary: Dict[str, int] = {}
+        self.buffer = array("I")
+        self.doc_offsets = array("Q", [0])
+        self.file = (output_dir / "stem_ids.bin").open("wb")
+
+    def write(self, stems: Sequence[str]) -> None:
+        vocabulary = self.vocabulary
+        for stem in stems:
+            stem_id = vocabulary.get(stem)
+            if stem_id is None:
+                stem_id = vocabulary[stem] = len(vocabulary)
+            self.buffer.append(stem_id)
+        self.doc_offsets.append(self.doc_offsets[-1] + len(stems))
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered stem ids to the stream."""
+        if sys.byteorder == "big":
+            self.buffer.byteswap()
+        self.buffer.tofile(self.file)
+        self.buffer = array("I")
+
+    def close(self) -> None:
+        if self.file.closed:
+            return
+        self.flush()
+        self.file.close()
+
+        offsets = self.doc_offsets
+        if sys.byteorder == "big":
+            offsets = array("Q", offsets)
+            offsets.byteswap()
+        with (self.output_dir / "doc_offsets.bin").open("wb") as f_offsets:
+            offsets.tofile(f_offsets)
+        write_vocabulary(self.output_dir / "vocabulary.txt", self.vocabulary)
+        with (self.output_dir / "meta.json").open("w", encoding="utf-8") as f_meta:
+            json.dump({
+                "num_documents": len(self.doc_offsets) - 1,
+                "num_tokens": self.doc_offsets[-1],
+                "vocabulary_size": len(self.vocabulary),
+                "stem_id_dtype": STEM_ID_DTYPE,
+                "doc_offset_dtype": DOC_OFFSET_DTYPE,
+            }, f_meta, indent=2)
+
+
+class TermFrequencyWriter(DocumentWriter):
+    """
+    Write the stem counts of every document to term_frequencies.jsonl in the output directory,
+    as {"id": ..., "length": ..., "tf": {stem: count, ...}} lines, and the collection statistics
+    (number of documents and tokens, average length and document frequencies) to collection.json
+    on close().
+    """
+
+    def __init__(self, output_dir: Path) -> None:
+        from src.term_frequencies import TermFrequencies
+
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self.output_dir = output_dir
+        self.term_frequencies = TermFrequencies()
+        self.file = (output_dir / "term_frequencies.jsonl").open("w", encoding="utf-8")
+
+    def write(self, stems: Sequence[str]) -> None:
+        doc_id = len(self.term_frequencies)
+        counts = self.term_frequencies.count_stems(stems)
+        self.file.write(json.dumps(
+            {"id": doc_id, "length": self.term_frequencies.doc_lengths[-1], "tf": counts}, ensure_ascii=False
+        ) + "\n")
+
+    def close(self) -> None:
+        if self.file.closed:
+            return
+        self.file.close()
+        with (self.output_dir / "collection.json").open("w", encoding="utf-8") as f_collection:
+            json.dump(self.term_frequencies.collection_stats(), f_collection, ensure_ascii=False)
+
+
+def write_vocabulary(file_path: Path, stems: Iterable[str]) -> None:
+    """Write a stem vocabulary file, every stem followed by a newline (so the empty stem is an empty line)."""
+    with file_path.open("w", encoding="utf-8") as f_vocabulary:
+        for stem in stems:
+            f_vocabulary.write(stem + "\n")
+
+
+def read_vocabulary(file_path: Path) -> List[str]:
+    """Read a stem vocabulary file, one stem per line, keeping the empty lines (empty stems)."""
+    with file_path.open(encoding="utf-8") as f_vocabulary:
+        stems = f_vocabulary.read().split("\n")
+    # The newline of the last stem (if any) ends the file rather than starting another stem
+    if stems[-1] == "":
+        stems.pop()
+    return stems
+
+
+def read_stem_ids(input_dir: Path) -> Tuple[List[str], "np.ndarray", "np.ndarray"]:
+    """
+    Load the output of a StemIdWriter: the stem vocabulary, the memory-mapped stem ids and the
+    document offsets (the stem ids of document i are stem_ids[doc_offsets[i]:doc_offsets[i + 1]]).
+    """
+    import numpy as np
+
+    vocabulary = read_vocabulary(input_dir / "vocabulary.txt")
+    doc_offsets = np.fromfile(input_dir / "doc_offsets.bin", dtype=DOC_OFFSET_DTYPE)
+    if doc_offsets[-1]:
+        stem_ids = np.memmap(input_dir / "stem_ids.bin", dtype=STEM_ID_DTYPE, mode="r")
+    else:
+        # An empty file cannot be memory-mapped
+        stem_ids = np.empty(0, dtype=STEM_ID_DTYPE)
+    return vocabulary, stem_ids, doc_offsets
+
+
+OUTPUT_FORMATS = {
+    "text": TextWriter,
+    "jsonl": JsonlWriter,
+    "stem_ids": StemIdWriter,
+    "term_frequencies": TermFrequencyWriter,
+}
+# Formats written to a directory rather than a file
+DIRECTORY_FORMATS = ("stem_ids", "term_frequencies")
+
+
+def open_writer(output_format: str, path: Path) -> DocumentWriter:
+    """Open a writer of the given output format ('text', 'jsonl', or a directory for 'stem_ids' and 'term_frequencies')."""
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Invalid output format '{output_format}'! Choose one of: {', '.join(OUTPUT_FORMATS)}.")
+    return OUTPUT_FORMATS[output_format](path)
+
+
+def write_stemmed_documents(
+    output_format: str,
+    paths: Sequence[Path],
+    rows: Iterable[Sequence[Sequence[str]]]
+) -> None:
+    """
+    Write rows of stemmed documents, the i-th document of every row going to the writer of the
+    i-th path (a single path, or one per mode with -m all).
+    """
+    writers = [open_writer(output_format, path) for path in paths]
+    try:
+        for row in rows:
+            for writer, stems in zip(writers, row):
+                writer.write(stems)
+    finally:
+        for writer in writers:
+            writer.close()
@@ -0,0 +1,358 @@
+import hashlib
+import json
+import os
+import shutil
+from collections import deque
+from pathlib import Path
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from time import perf_counter
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from src.stem_cache import StemCache
+from src.stem_lexicon import StemLexicon
+
+#!/usr/bin/env python3
+#
+# src.parallel_stemmer.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+# The stemming function of the current worker process, built once by init_worker.
+worker_stem = None
+
+
+def init_worker(
+    mode: str,
+    cache_size: int,
+    lexicon_path: Optional[str],
+    rules_path: Optional[str] = None,
+    as_tokens: bool = False,
+    normalization: Optional[str] = None
+) -> None:
+    """
+    Build the tokenizer and pipelines (and map the lexicon) once per worker process. With a
+    normalization ('nfc' or 'fold', see src/preprocessing.py), every line is normalized first.
+    """
+    from src.stemmer import ALL_MODES, LabadainStemmer
+    from src.preprocessing import normalize_unicode
+    from src.rule_sets import load_rule_sets
+
+    global worker_stem
+    cache = StemCache(cache_size) if cache_size > 0 else None
+    lexicon = StemLexicon(Path(lexicon_path)) if lexicon_path else None
+    rule_sets = load_rule_sets(Path(rules_path)) if rules_path else None
+    if mode == ALL_MODES:
+        stemmer = LabadainStemmer(cache=cache, lexicon=lexicon, rule_sets=rule_sets)
+        worker_stem = stemmer.stem_document_tokens_all if as_tokens else stemmer.stem_document_all
+    else:
+        stemmer = LabadainStemmer(mode=mode, cache=cache, lexicon=lexicon, rule_sets=rule_sets)
+        worker_stem = stemmer.stem_document_tokens if as_tokens else stemmer.stem_document
+    if normalization is not None:
+        stem_line = worker_stem
+        fold_punctuation = normalization == "fold"
+
+        def normalize_and_stem(line: str):
+            return stem_line(normalize_unicode(line, fold_punctuation))
+
+        worker_stem = normalize_and_stem
+
+
+def stem_chunk(lines: List[str]) -> List[str]:
+    """Preprocess and stem a chunk of lines in the worker process."""
+    return [worker_stem(line) for line in lines]
+
+
+def iter_chunks(lines: Iterable[str], chunk_size: int) -> Iterator[List[str]]:
+    """Group the input lines into line-aligned chunks of at most chunk_size lines."""
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def stem_parallel(
+    lines: Iterable[str],
+    mode: str = "light",
+    workers: Optional[int] = None,
+    chunk_size: int = 1000,
+    max_pending: Optional[int] = None,
+    cache_size: int = 0,
+    lexicon_path: Optional[str] = None,
+    rules_path: Optional[str] = None,
+    as_tokens: bool = False,
+    normalization: Optional[str] = None
+) -> Iterator[str]:
+    """
+    Stem the input lines in a pool of worker processes, yielding one stemmed line per input
+    line in the original order (with mode "all", a tuple of the light, moderate and heavy lines;
+    with as_tokens, lists of stems instead of lines).
+    At most max_pending chunks (default: two per worker) are in flight at any time, so the
+    reader cannot get ahead of slow workers. A lexicon file is
+    memory-mapped by every worker and shared through the page cache; a rule set file is parsed,
+    validated and compiled by every worker. With a normalization, the workers normalize the lines.
+    """
+    if chunk_size < 1:
+        raise ValueError("The chunk size must be a positive integer.")
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+
+    initargs = (mode, cache_size, lexicon_path, rules_path, as_tokens, normalization)
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=initargs) as pool:
+        pending: Deque[Future] = deque()
+        for chunk in iter_chunks(lines, chunk_size):
+            pending.append(pool.submit(stem_chunk, chunk))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def shard_output_path(input_path: Path, input_root: Path, output_dir: Path, output_format: str) -> Path:
+    """
+    Output path of a shard: its path relative to the input root, under the output directory,
+    without the compression suffix and with the suffix of the output format (e.g.
+    corpus/2024/part-01.txt.gz -> output_dir/2024/part-01.txt, .jsonl, or a directory).
+    """
+    from config.utils import COMPRESSION_MODULES
+    from src.output_writers import DIRECTORY_FORMATS
+
+    relative_path = input_path.relative_to(input_root)
+    if relative_path.suffix.lower() in COMPRESSION_MODULES:
+        relative_path = relative_path.with_suffix("")
+    if output_format == "jsonl":
+        relative_path = relative_path.with_suffix(".jsonl")
+    elif output_format in DIRECTORY_FORMATS:
+        relative_path = relative_path.with_suffix("")
+    return output_dir / relative_path
+
+
+def shard_config(
+    mode: str,
+    output_format: str,
+    rules_path: Optional[str],
+    lexicon_path: Optional[str],
+    normalization: Optional[str] = None
+) -> Dict[str, object]:
+    """The configuration a shard output depends on, besides its input: any change invalidates the output."""
+    from config.utils import Utils
+    from src.stemmer import STEMMER_VERSION
+    from src.rule_sets import rule_sets_digest
+
+    utils = Utils()
+    config = {
+        "stemmer_version": STEMMER_VERSION,
+        "mode": mode,
+        "output_format": output_format,
+        "built_in_rules_sha256": rule_sets_digest(),
+        "rules_sha256": utils.file_digest(Path(rules_path)) if rules_path else None,
+        "lexicon_sha256": utils.file_digest(Path(lexicon_path)) if lexicon_path else None,
+    }
+    # Only recorded when set, so the outputs of runs without normalization stay valid
+    if normalization is not None:
+        config["normalization"] = normalization
+    return config
+
+
+def stem_shard(
+    input_path: str,
+    output_paths: Sequence[str],
+    output_format: str,
+    shard_key: str,
+    checkpoint_lines: int = 10000
+) -> Dict[str, object]:
+    """
+    Read (decompressing on the fly), stem and write a whole shard in the worker process, with
+    one output per mode. The outputs are written to .partial files and renamed when the shard is
+    complete. For the line formats (text and jsonl), every checkpoint_lines lines the outputs are
+    synced and the progress is committed to a .checkpoint.json file, so a run interrupted on the
+    same input and configuration (the shard key) resumes after the last committed chunk.
+    Returns the shard's manifest entry, with the SHA-256 hash of the input computed in the worker.
+    """
+    from config.utils import Utils
+    from src.output_writers import JsonlWriter, TextWriter, open_writer
+
+    utils = Utils()
+    start = perf_counter()
+    output_paths = [Path(output_path) for output_path in output_paths]
+    partial_paths = [output_path.with_name(output_path.name + ".partial") for output_path in output_paths]
+    checkpoint_path = output_paths[0].with_name(output_paths[0].name + ".checkpoint.json")
+    resumable = output_format in ("text", "jsonl") and checkpoint_lines > 0
+
+    committed = {"key": shard_key, "lines": 0, "tokens": 0, "sizes": []}
+    if resumable and checkpoint_path.exists():
+        with checkpoint_path.open(encoding="utf-8") as f_checkpoint:
+            checkpoint = json.load(f_checkpoint)
+        if checkpoint.get("key") == shard_key and all(partial_path.exists() for partial_path in partial_paths):
+            committed = checkpoint
+            # Drop whatever was written after the last committed chunk
+            for partial_path, size in zip(partial_paths, committed["sizes"]):
+                os.truncate(partial_path, size)
+
+    writers = []
+    for partial_path in partial_paths:
+        partial_path.parent.mkdir(parents=True, exist_ok=True)
+        if output_format == "text":
+            writers.append(TextWriter(partial_path, append=committed["lines"] > 0))
+        elif output_format == "jsonl":
+            writers.append(JsonlWriter(partial_path, append=committed["lines"] > 0, first_id=committed["lines"]))
+        else:
+            writers.append(open_writer(output_format, partial_path))
+
+    lines, tokens = committed["lines"], committed["tokens"]
+    try:
+        for line_number, line in enumerate(utils.iter_corpus(Path(input_path))):
+            if line_number < committed["lines"]:
+                continue
+            stems = worker_stem(line)
+            row = stems if len(writers) > 1 else (stems,)
+            for writer, mode_stems in zip(writers, row):
+                writer.write(mode_stems)
+            lines += 1
+            tokens += len(row[0])
+            if resumable and lines % checkpoint_lines == 0:
+                sizes = [writer.sync() for writer in writers]
+                utils.write_json(checkpoint_path, {"key": shard_key, "lines": lines, "tokens": tokens, "sizes": sizes})
+    finally:
+        for writer in writers:
+            writer.close()
+
+    for partial_path, output_path in zip(partial_paths, output_paths):
+        if output_path.is_dir():
+            shutil.rmtree(output_path)
+        os.replace(partial_path, output_path)
+    checkpoint_path.unlink(missing_ok=True)
+    return {
+        "input": input_path,
+        "input_sha256": utils.file_digest(Path(input_path)),
+        "outputs": [str(output_path) for output_path in output_paths],
+        "lines": lines,
+        "tokens": tokens,
+        "resumed_at_line": committed["lines"],
+        "seconds": perf_counter() - start,
+    }
+
+
+def stem_shards(
+    input_paths: Sequence[Path],
+    output_dir: Path,
+    mode: str = "light",
+    output_format: str = "text",
+    workers: Optional[int] = None,
+    cache_size: int = 0,
+    lexicon_path: Optional[str] = None,
+    rules_path: Optional[str] = None,
+    checkpoint_lines: int = 10000,
+    force: bool = False,
+    normalization: Optional[str] = None,
+    verify_inputs: bool = False
+) -> Dict[str, object]:
+    """
+    Stem independent shards (plain or compressed files) in a pool of worker processes, one shard
+    per task, writing one output per shard (per mode with mode "all") under the output directory.
+    The output directory's manifest.json records every shard with the size, modification time and
+    hash of its content, the hash of the configuration (stemmer version, mode, format, rules,
+    lexicon and normalization), its outputs, line and token counts. It is rewritten atomically as
+    shards complete. A shard whose content and configuration match its manifest entry, and whose
+    outputs exist, is skipped unless force is set. The content is compared by size and
+    modification time; it is only hashed (in the parent) when they changed, or for every shard
+    with verify_inputs, and the shards to stem are hashed by the workers;
+    an interrupted shard resumes from its last checkpoint (see stem_shard). With a single worker,
+    the shards are stemmed in the current process. The files under the output directory are never
+    shards, so it can be placed inside the input directory. Raises ValueError, before writing
+    anything, if two shards would share an output or an output would overwrite an input.
+    """
+    from config.utils import Utils
+    from src.stemmer import ALL_MODES, mode_output_paths
+
+    utils = Utils()
+    input_paths = [Path(input_path) for input_path in input_paths]
+    if not input_paths:
+        raise ValueError("There are no shards to stem.")
+    resolved_output_dir = output_dir.resolve()
+    if resolved_output_dir == Path(os.path.commonpath([input_path.resolve().parent for input_path in input_paths])):
+        raise ValueError(f"The output directory {output_dir} must not be the input directory.")
+    # The outputs of earlier runs (and the manifest) are not shards, when the output directory is
+    # inside an expanded input directory
+    input_paths = [input_path for input_path in input_paths if resolved_output_dir not in input_path.resolve().parents]
+    if not input_paths:
+        raise ValueError(f"All the shards are inside the output directory {output_dir}.")
+    config = shard_config(mode, output_format, rules_path, lexicon_path, normalization)
+    config_digest = hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()
+    manifest_path = output_dir / "manifest.json"
+    previous_shards = {}
+    if manifest_path.exists() and not force:
+        with manifest_path.open(encoding="utf-8") as f_manifest:
+            previous_shards = {shard["input"]: shard for shard in json.load(f_manifest).get("shards", [])}
+
+    input_root = Path(os.path.commonpath([input_path.resolve().parent for input_path in input_paths]))
+    resolved_inputs = {input_path.resolve() for input_path in input_paths}
+    output_owners: Dict[Path, Path] = {manifest_path.resolve(): manifest_path}
+    shards: Dict[str, Optional[Dict[str, object]]] = {}
+    input_stats: Dict[str, Tuple[int, int]] = {}
+    tasks = []
+    for input_path in input_paths:
+        output_path = shard_output_path(input_path.resolve(), input_root, output_dir, output_format)
+        output_paths = [str(path) for path in (mode_output_paths(output_path) if mode == ALL_MODES else [output_path])]
+        for path in output_paths:
+            resolved_path = Path(path).resolve()
+            if resolved_path in resolved_inputs:
+                raise ValueError(f"The output {path} of {input_path} would overwrite an input file.")
+            if resolved_path in output_owners:
+                raise ValueError(f"{input_path} and {output_owners[resolved_path]} would both be written to {path}.")
+            output_owners[resolved_path] = input_path
+        stat = input_path.stat()
+        input_stat = input_stats[str(input_path)] = (stat.st_size, stat.st_mtime_ns)
+        previous = previous_shards.get(str(input_path))
+        if (
+            previous is not None
+            and previous.get("config_sha256") == config_digest
+            and previous.get("outputs") == output_paths
+            and all(Path(path).exists() for path in output_paths)
+            and (
+                (previous.get("input_size"), previous.get("input_mtime_ns")) == input_stat and not verify_inputs
+                or previous.get("input_sha256") == utils.file_digest(input_path)
+            )
+        ):
+            previous["input_size"], previous["input_mtime_ns"] = input_stat
+            shards[str(input_path)] = previous
+        else:
+            shards[str(input_path)] = None
+            # An interrupted shard only resumes on the same input (size and modification time) and configuration
+            shard_key = f"{input_stat[0]}:{input_stat[1]}:{config_digest}"
+            tasks.append((str(input_path), output_paths, output_format, shard_key, checkpoint_lines))
+
+    def manifest() -> Dict[str, object]:
+        done = [shard for shard in shards.values() if shard is not None]
+        return {
+            "config": config,
+            "config_sha256": config_digest,
+            "num_shards": len(done),
+            "lines": sum(shard["lines"] for shard in done),
+            "tokens": sum(shard["tokens"] for shard in done),
+            "stemmed_in_last_run": len(tasks),
+            "shards": done,
+        }
+
+    def commit(shard: Dict[str, object]) -> None:
+        shard["input_size"], shard["input_mtime_ns"] = input_stats[shard["input"]]
+        shard["config_sha256"] = config_digest
+        shards[shard["input"]] = shard
+        utils.write_json(manifest_path, manifest())
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    workers = min(workers or os.cpu_count() or 1, max(len(tasks), 1))
+    initargs = (mode, cache_size, lexicon_path, rules_path, True, normalization)
+    if workers == 1:
+        if tasks:
+            init_worker(*initargs)
+        for task in tasks:
+            commit(stem_shard(*task))
+    else:
+        with ProcessPoolExecutor(workers, initializer=init_worker, initargs=initargs) as pool:
+            for future in as_completed([pool.submit(stem_shard, *task) for task in tasks]):
+                commit(future.result())
+    utils.write_json(manifest_path, manifest())
+    return manifest()
@@ -1,18 +1,61 @@
+import re
+import unicodedata
+from typing import Iterable, Iterator
+
 #!/usr/bin/env python3
 #
 # src.preprocessing.py
 # Gabriel de Jesus (mestregabrieldejesus@gmail.com)
 # 09-05-2024
 
+# Typographic variants folded into the apostrophe and the hyphen matched inside words by the tokenizer
+APOSTROPHE_VARIANTS = "‘ʼ´′＇"  # ‘ ʼ ´ ′ ＇
+HYPHEN_VARIANTS = "‐‑﹣－"  # ‐ ‑ ﹣ －
+PUNCTUATION_VARIANTS = re.compile(f"[{APOSTROPHE_VARIANTS}{HYPHEN_VARIANTS}]")
+PUNCTUATION_FOLDING = str.maketrans(
+    {**dict.fromkeys(APOSTROPHE_VARIANTS, "’"), **dict.fromkeys(HYPHEN_VARIANTS, "-")}
+)
+# Unicode normalizations of the input: NFC, or NFC with the apostrophe and hyphen variants folded
+NORMALIZATIONS = ("nfc", "fold")
+
+
+def normalize_unicode(text: str, fold_punctuation: bool = False) -> str:
+    """
+    Convert a text (a line, a chunk of lines or a whole document) to NFC, so that decomposed
+    accents match the precomposed vowels of the rules, and optionally fold the typographic
+    apostrophe and hyphen variants. Pure ASCII text is returned as is: str.isascii() only
+    reads a flag of the string, so the fast path costs nothing.
+    """
+    if text.isascii():
+        return text
+    text = unicodedata.normalize("NFC", text)
+    if fold_punctuation and PUNCTUATION_VARIANTS.search(text):
+        text = text.translate(PUNCTUATION_FOLDING)
+    return text
+
+
+def normalize_lines(lines: Iterable[str], fold_punctuation: bool = False) -> Iterator[str]:
+    """Normalize a stream of lines (see normalize_unicode), passing the ASCII lines through."""
+    for line in lines:
+        yield line if line.isascii() else normalize_unicode(line, fold_punctuation)
+
+
 class TextPreprocessing:
     """
     Class to preprocess input document, including:
-    1. Lowercase the input text.
-    2. Normalize aposthropes.
+    1. Normalize the Unicode text to NFC (optional, with the apostrophe and hyphen variants folded).
+    2. Lowercase the input text.
+    3. Normalize aposthropes.
     """
 
-    def __init__(self, text: str):
+    def __init__(self, text: str, normalize: bool = False, fold_punctuation: bool = False):
         self.text = text
+        self.normalize = normalize or fold_punctuation
+        self.fold_punctuation = fold_punctuation
+
+    def normalize_unicode(self) -> str:
+        """Convert the input text to NFC, optionally folding the apostrophe and hyphen variants."""
+        return normalize_unicode(self.text, self.fold_punctuation)
 
     def lowercase_text(self) -> str:
         """Lowercase the input text."""
@@ -24,6 +67,8 @@ class TextPreprocessing:
 
     def preprocess_text(self) -> str:
         """Preprocess the input text."""
+        if self.normalize:
+            self.text = self.normalize_unicode()
         self.text = self.lowercase_text()
         preprocessed_text = self.normalize_apostrophes()
-        return preprocessed_text
\ No newline at end of file
+        return preprocessed_text
@@ -0,0 +1,302 @@
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import sys
+from pathlib import Path
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+import src.parallel_stemmer as parallel_stemmer
+from config.utils import COMPRESSION_MODULES, Utils
+from src.stemmer import ALL_MODES, STEMMER_MODES, mode_output_paths
+from src.output_writers import TextWriter
+from src.parallel_stemmer import shard_config
+
+#!/usr/bin/env python3
+#
+# src.shard_plan.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+# Shard plan (plan.json in the output directory, shared by every machine):
+#   {"format": "labadain-shard-plan", "version": 1,
+#    "input": "/data/corpus.txt", "input_size": 512000000000, "input_mtime_ns": ...,
+#    "config": {...}, "config_sha256": "...", "cache_size": 100000,
+#    "shards": [{"index": 0, "start": 0, "end": 8000000123}, ...]}
+# Shard i is stemmed into shard-0000i.txt (one file per mode with -m all), and its receipt
+# shard-0000i.json records the range, the number of lines and the size and hash of every output.
+PLAN_FORMAT = "labadain-shard-plan"
+PLAN_VERSION = 1
+PLAN_FILE = "plan.json"
+
+
+def line_boundaries(input_path: Path, num_shards: int) -> List[Tuple[int, int]]:
+    """
+    Split a file into num_shards byte ranges of about the same size, every range ending after
+    a newline (or at the end of the file). The file is memory-mapped, so only the pages around
+    the split points are read. Ranges may be empty when there are fewer lines than shards.
+    """
+    if num_shards < 1:
+        raise ValueError("The number of shards must be a positive integer.")
+    size = input_path.stat().st_size
+    if not size:
+        return [(0, 0)] * num_shards
+
+    boundaries = [0]
+    with input_path.open("rb") as f_input, mmap.mmap(f_input.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        for shard in range(1, num_shards):
+            target = max(shard * size // num_shards, boundaries[-1])
+            if target == 0 or mapped[target - 1] == ord("\n"):
+                boundaries.append(target)
+            else:
+                newline = mapped.find(b"\n", target)
+                boundaries.append(size if newline == -1 else newline + 1)
+    boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def create_plan(
+    input_path: Path,
+    output_dir: Path,
+    num_shards: int,
+    mode: str = "light",
+    cache_size: int = 0,
+    lexicon_path: Optional[str] = None,
+    rules_path: Optional[str] = None,
+    normalization: Optional[str] = None
+) -> Dict[str, object]:
+    """Plan the line-aligned shards of a file and write the plan to the output directory."""
+    if input_path.suffix.lower() in COMPRESSION_MODULES:
+        raise ValueError("A compressed file cannot be split into byte ranges; decompress it first.")
+    input_path = input_path.resolve()
+    config = shard_config(mode, "text", rules_path, lexicon_path, normalization)
+    stat = input_path.stat()
+    plan = {
+        "format": PLAN_FORMAT,
+        "version": PLAN_VERSION,
+        "input": str(input_path),
+        "input_size": stat.st_size,
+        "input_mtime_ns": stat.st_mtime_ns,
+        "config": config,
+        "config_sha256": hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest(),
+        "cache_size": cache_size,
+        "lexicon": str(Path(lexicon_path).resolve()) if lexicon_path else None,
+        "rules": str(Path(rules_path).resolve()) if rules_path else None,
+        "shards": [
+            {"index": index, "start": start, "end": end}
+            for index, (start, end) in enumerate(line_boundaries(input_path, num_shards))
+        ],
+    }
+    output_dir.mkdir(parents=True, exist_ok=True)
+    Utils().write_json(output_dir / PLAN_FILE, plan)
+    return plan
+
+
+def load_plan(plan_path: Path) -> Dict[str, object]:
+    """Load a shard plan and check that its ranges cover the input file, one after the other."""
+    with plan_path.open(encoding="utf-8") as f_plan:
+        plan = json.load(f_plan)
+    if plan.get("format") != PLAN_FORMAT or plan.get("version") != PLAN_VERSION:
+        raise ValueError(f"Not a shard plan (version {PLAN_VERSION}): {plan_path}")
+    position = 0
+    for index, shard in enumerate(plan["shards"]):
+        if shard["index"] != index or shard["start"] != position or shard["end"] < shard["start"]:
+            raise ValueError(f"The ranges of {plan_path} do not cover the input in order (shard {index}).")
+        position = shard["end"]
+    if position != plan["input_size"]:
+        raise ValueError(f"The ranges of {plan_path} do not cover the input in order (end {position}).")
+    return plan
+
+
+def shard_paths(plan_dir: Path, plan: Dict[str, object], index: int) -> Tuple[List[Path], Path]:
+    """Output files (one per mode with -m all) and receipt of a shard."""
+    output_path = plan_dir / f"shard-{index:05d}.txt"
+    if plan["config"]["mode"] == ALL_MODES:
+        return mode_output_paths(output_path), output_path.with_suffix(".json")
+    return [output_path], output_path.with_suffix(".json")
+
+
+def check_input(plan: Dict[str, object]) -> None:
+    """Check that the input file is the one the plan was made for."""
+    stat = Path(plan["input"]).stat()
+    if stat.st_size != plan["input_size"] or stat.st_mtime_ns != plan["input_mtime_ns"]:
+        raise ValueError(f"{plan['input']} changed since the shard plan was made.")
+
+
+def stem_range(plan_path: Path, index: int) -> Dict[str, object]:
+    """
+    Stem the byte range of one shard of a plan (on any machine sharing the input and output
+    directories), with the plan's configuration, and write its outputs and receipt. The outputs
+    are written to .partial files and renamed when complete, so an interrupted shard is simply
+    stemmed again.
+    """
+    plan = load_plan(plan_path)
+    if not 0 <= index < len(plan["shards"]):
+        raise ValueError(f"The plan has no shard {index} (0 to {len(plan['shards']) - 1}).")
+    check_input(plan)
+    config = plan["config"]
+    if shard_config(config["mode"], "text", plan["rules"], plan["lexicon"], config.get("normalization")) != config:
+        raise ValueError("The stemmer, rules or lexicon on this machine differ from the ones of the plan.")
+
+    utils = Utils()
+    start_time = perf_counter()
+    shard = plan["shards"][index]
+    output_paths, receipt_path = shard_paths(plan_path.parent, plan, index)
+    partial_paths = [output_path.with_name(output_path.name + ".partial") for output_path in output_paths]
+    receipt_path.unlink(missing_ok=True)
+
+    parallel_stemmer.init_worker(
+        config["mode"], plan["cache_size"], plan["lexicon"], plan["rules"], True, config.get("normalization")
+    )
+    stem_line = parallel_stemmer.worker_stem
+    writers = [TextWriter(partial_path, append=False) for partial_path in partial_paths]
+    lines = 0
+    try:
+        for line in utils.iter_corpus_range(Path(plan["input"]), shard["start"], shard["end"]):
+            stems = stem_line(line)
+            for writer, mode_stems in zip(writers, stems if len(writers) > 1 else (stems,)):
+                writer.write(mode_stems)
+            lines += 1
+        for writer in writers:
+            writer.sync()
+    finally:
+        for writer in writers:
+            writer.close()
+
+    for partial_path, output_path in zip(partial_paths, output_paths):
+        os.replace(partial_path, output_path)
+    receipt = {
+        "index": index,
+        "start": shard["start"],
+        "end": shard["end"],
+        "config_sha256": plan["config_sha256"],
+        "lines": lines,
+        "outputs": [
+            {"path": output_path.name, "size": output_path.stat().st_size, "sha256": utils.file_digest(output_path)}
+            for output_path in output_paths
+        ],
+        "seconds": perf_counter() - start_time,
+    }
+    utils.write_json(receipt_path, receipt)
+    return receipt
+
+
+def merge_shards(plan_path: Path, output_file: Path, block_size: int = 1 << 20) -> Dict[str, object]:
+    """
+    Concatenate the shard outputs in plan order into the output file (one per mode with -m all),
+    after checking that every shard was stemmed from its planned range with the planned
+    configuration. The size, hash and number of lines of every shard output are verified while
+    it is copied; the merged files are only published if everything matches.
+    """
+    plan = load_plan(plan_path)
+    check_input(plan)
+    missing, stale = [], []
+    receipts = []
+    for shard in plan["shards"]:
+        _, receipt_path = shard_paths(plan_path.parent, plan, shard["index"])
+        if not receipt_path.exists():
+            missing.append(shard["index"])
+            continue
+        with receipt_path.open(encoding="utf-8") as f_receipt:
+            receipt = json.load(f_receipt)
+        if (receipt["start"], receipt["end"], receipt["config_sha256"]) != (
+            shard["start"], shard["end"], plan["config_sha256"]
+        ):
+            stale.append(shard["index"])
+        receipts.append(receipt)
+    if missing or stale:
+        raise ValueError(
+            f"Cannot merge: missing shards {missing or 'none'}, shards stemmed for another plan {stale or 'none'}."
+        )
+
+    output_paths = mode_output_paths(output_file) if plan["config"]["mode"] == ALL_MODES else [output_file]
+    partial_paths = [output_path.with_name(output_path.name + ".partial") for output_path in output_paths]
+    try:
+        for mode_index, partial_path in enumerate(partial_paths):
+            with partial_path.open("wb") as f_output:
+                for receipt in receipts:
+                    expected = receipt["outputs"][mode_index]
+                    digest, size, lines = hashlib.sha256(), 0, 0
+                    with (plan_path.parent / expected["path"]).open("rb") as f_shard:
+                        for block in iter(lambda: f_shard.read(block_size), b""):
+                            digest.update(block)
+                            size += len(block)
+                            lines += block.count(b"\n")
+                            f_output.write(block)
+                    if (digest.hexdigest(), size, lines) != (expected["sha256"], expected["size"], receipt["lines"]):
+                        raise ValueError(f"The output {expected['path']} of shard {receipt['index']} does not match its receipt.")
+                f_output.flush()
+                os.fsync(f_output.fileno())
+    except BaseException:
+        for partial_path in partial_paths:
+            partial_path.unlink(missing_ok=True)
+        raise
+    for partial_path, output_path in zip(partial_paths, output_paths):
+        os.replace(partial_path, output_path)
+    return {
+        "outputs": [str(output_path) for output_path in output_paths],
+        "num_shards": len(receipts),
+        "lines": sum(receipt["lines"] for receipt in receipts),
+    }
+
+
+if __name__ == "__main__":
+    from src.preprocessing import NORMALIZATIONS
+
+    parser = argparse.ArgumentParser(description="Stem a huge text file as line-aligned shards on several machines")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    plan_parser = subparsers.add_parser("plan", help="Split the input file into line-aligned byte ranges")
+    plan_parser.add_argument("-if", "--input_file", type=str, required=True, help="Path to the (uncompressed) input file")
+    plan_parser.add_argument(
+        "-od",
+        "--output_dir",
+        type=str,
+        required=True,
+        help="Shared directory of the plan, the shard outputs and their receipts"
+    )
+    plan_parser.add_argument("-n", "--num_shards", type=int, required=True, help="Number of shards")
+    plan_parser.add_argument(
+        "-m",
+        "--mode",
+        choices=STEMMER_MODES + (ALL_MODES,),
+        default="light",
+        help="Choose stemming mode, or 'all' for light, moderate and heavy in one pass (default: light)"
+    )
+    plan_parser.add_argument("-cs", "--cache_size", type=int, default=100000, help="Cache up to N stemmed words (default: 100000)")
+    plan_parser.add_argument("-lx", "--lexicon", type=str, default=None, help="Path to a precomputed stem lexicon")
+    plan_parser.add_argument("-r", "--rules", type=str, default=None, help="Path to a rule set file")
+    plan_parser.add_argument("-nu", "--normalize", choices=NORMALIZATIONS, default=None, help="Normalize the input to Unicode NFC first")
+
+    work_parser = subparsers.add_parser("work", help="Stem one shard of a plan")
+    work_parser.add_argument("-pf", "--plan_file", type=str, required=True, help="Path of the plan.json")
+    work_parser.add_argument("-s", "--shard", type=int, required=True, help="Index of the shard to stem")
+
+    merge_parser = subparsers.add_parser("merge", help="Verify the shards against the plan and concatenate them")
+    merge_parser.add_argument("-pf", "--plan_file", type=str, required=True, help="Path of the plan.json")
+    merge_parser.add_argument("-of", "--output_file", type=str, required=True, help="Path of the merged output")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "plan":
+            plan = create_plan(
+                Path(args.input_file),
+                Path(args.output_dir),
+                args.num_shards,
+                mode=args.mode,
+                cache_size=args.cache_size,
+                lexicon_path=args.lexicon,
+                rules_path=args.rules,
+                normalization=args.normalize
+            )
+            print(f"Planned {len(plan['shards'])} shards of {plan['input']} in {Path(args.output_dir) / PLAN_FILE}")
+        elif args.command == "work":
+            receipt = stem_range(Path(args.plan_file), args.shard)
+            print(f"Stemmed shard {receipt['index']} ({receipt['lines']} lines) in {receipt['seconds']:.1f} s")
+        else:
+            result = merge_shards(Path(args.plan_file), Path(args.output_file))
+            print(f"Merged {result['num_shards']} shards ({result['lines']} lines) into {', '.join(result['outputs'])}")
+    except (ValueError, FileNotFoundError) as error:
+        print(error, file=sys.stderr)
+        sys.exit(1)
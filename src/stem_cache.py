@@ -0,0 +1,103 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Tuple, TypeVar, Union
+
+#!/usr/bin/env python3
+#
+# src.stem_cache.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+# A cached value is the stem of one mode, or the (light, moderate, heavy) stems of ALL_MODES
+Stems = TypeVar("Stems", str, Tuple[str, ...])
+
+
+class CacheShard:
+    """One LRU segment of a StemCache, with its own lock and counters."""
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.entries: "OrderedDict[Tuple[str, str], Union[str, Tuple[str, ...]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+
+class StemCache:
+    """
+    Bounded LRU cache of stemmed words, keyed by (namespace, word). The namespace, computed by
+    LabadainStemmer, identifies the mode, the rules and the lexicon of the stemmer, so a single
+    instance can be shared by stemmers with different rule sets or lexicons and by several threads.
+    The entries are split by key hash into shards with their own lock, so concurrent threads rarely
+    wait for each other; every shard evicts its least recently used entry when full. No lock is held
+    while a missing word is stemmed (two threads missing the same word may both stem it).
+    """
+
+    def __init__(self, max_size: int = 100000, shards: int = 16) -> None:
+        if max_size < 1:
+            raise ValueError("The cache size must be a positive integer.")
+        if shards < 1:
+            raise ValueError("The number of cache shards must be a positive integer.")
+        self.max_size = max_size
+        shards = min(shards, max_size)
+        self.shards: List[CacheShard] = [
+            CacheShard(max_size // shards + (index < max_size % shards)) for index in range(shards)
+        ]
+
+    def __len__(self) -> int:
+        return sum(len(shard.entries) for shard in self.shards)
+
+    def get_or_stem(self, namespace: str, word: str, stemmer: Callable[[str], Stems]) -> Stems:
+        """Return the cached stem(s) of the word, stemming and caching them on a miss."""
+        key = (namespace, word)
+        shard = self.shards[hash(key) % len(self.shards)]
+        with shard.lock:
+            stems = shard.entries.get(key)
+            if stems is not None:
+                shard.hits += 1
+                shard.entries.move_to_end(key)
+                return stems
+            shard.misses += 1
+
+        stems = stemmer(word)
+        with shard.lock:
+            shard.entries[key] = stems
+            if len(shard.entries) > shard.max_size:
+                shard.entries.popitem(last=False)
+                shard.evictions += 1
+        return stems
+
+    def stats(self) -> Dict[str, float]:
+        """Return the cache counters and the hit rate."""
+        size = hits = misses = evictions = 0
+        for shard in self.shards:
+            with shard.lock:
+                size += len(shard.entries)
+                hits += shard.hits
+                misses += shard.misses
+                evictions += shard.evictions
+        lookups = hits + misses
+        return {
+            "size": size,
+            "max_size": self.max_size,
+            "hits": hits,
+            "misses": misses,
+            "evictions": evictions,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+    def reset_stats(self) -> None:
+        """Reset the hit, miss and eviction counters (the cached entries are kept)."""
+        for shard in self.shards:
+            with shard.lock:
+                shard.hits = 0
+                shard.misses = 0
+                shard.evictions = 0
+
+    def clear(self) -> None:
+        """Remove all the cached entries and reset the counters."""
+        for shard in self.shards:
+            with shard.lock:
+                shard.entries.clear()
+        self.reset_stats()
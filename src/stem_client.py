@@ -0,0 +1,91 @@
+import argparse
+import json
+import socket
+from typing import Dict, List, Optional
+
+#!/usr/bin/env python3
+#
+# src.stem_client.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+
+class StemClient:
+    """Blocking client of the stemming service (see src/stem_server.py)."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, unix_socket: Optional[str] = None) -> None:
+        if unix_socket:
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.connect(unix_socket)
+        else:
+            self.socket = socket.create_connection((host, port))
+        self.stream = self.socket.makefile("rwb")
+        self.next_id = 0
+
+    def __enter__(self) -> "StemClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def request(self, request: Dict) -> Dict:
+        """Send a request and wait for its response."""
+        return self.request_many([request])[0]
+
+    def request_many(self, requests: List[Dict]) -> List[Dict]:
+        """Pipeline several requests on the connection and return their responses in order."""
+        for request in requests:
+            self.next_id += 1
+            request.setdefault("id", self.next_id)
+            self.stream.write((json.dumps(request, ensure_ascii=False) + "\n").encode("utf-8"))
+        self.stream.flush()
+        responses = [json.loads(self.stream.readline()) for _ in requests]
+        for response in responses:
+            if "error" in response:
+                raise ValueError(response["error"])
+        return responses
+
+    def stem_text(self, text: str, mode: str = "light") -> str:
+        """Preprocess and stem a text on the server."""
+        return self.request({"mode": mode, "text": text})["stemmed"]
+
+    def stem_texts(self, texts: List[str], mode: str = "light") -> List[str]:
+        """Preprocess and stem several texts, pipelined in one round trip."""
+        return [response["stemmed"] for response in self.request_many([{"mode": mode, "text": text} for text in texts])]
+
+    def stem_words(self, words: List[str], mode: str = "light") -> List[str]:
+        """Stem a list of tokens on the server."""
+        return self.request({"mode": mode, "words": words})["stems"]
+
+    def metrics(self) -> Dict:
+        """Return the server metrics."""
+        return self.request({"command": "metrics"})["metrics"]
+
+    def close(self) -> None:
+        """Close the connection."""
+        self.stream.close()
+        self.socket.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Labadain Stemmer service client")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="TCP host (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port (default: 8765)")
+    parser.add_argument("--unix_socket", type=str, default=None, help="Connect to this Unix socket path instead of TCP")
+    request_group = parser.add_mutually_exclusive_group(required=True)
+    request_group.add_argument("-it", "--input_text", type=str, help="Input string to stem")
+    request_group.add_argument("--metrics", action="store_true", help="Print the server metrics")
+    parser.add_argument(
+        "-m",
+        "--mode",
+        choices=["light", "moderate", "heavy"],
+        default="light",
+        help="Choose stemming mode (default: light)"
+    )
+    args = parser.parse_args()
+
+    with StemClient(args.host, args.port, args.unix_socket) as client:
+        if args.metrics:
+            print(json.dumps(client.metrics(), indent=2))
+        else:
+            print(client.stem_text(args.input_text, args.mode))
@@ -0,0 +1,201 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, Optional
+from zlib import crc32
+
+if TYPE_CHECKING:
+    from src.stemmer_rules import CompiledRuleSet
+
+#!/usr/bin/env python3
+#
+# src.stem_lexicon.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+# File layout (little-endian):
+#   header:  magic (8 bytes) | mode (8 bytes, ASCII, zero padded) | stemmer version (uint32) |
+#            number of entries N (uint32) | number of hash slots S (uint32, a power of two) |
+#            size of the records in bytes (uint32) | SHA-256 of the rules of the mode (32 bytes, see rule_sets_digest)
+#   slots:   S open-addressing slots (uint32), each 0 or 1 + the offset of a record, probed
+#            linearly from the CRC-32 of the UTF-8 word followed by a zero byte
+#   records: N records "word\0stem\n" (UTF-8), sorted by word
+LEXICON_MAGIC = b"LBDNLEX2"
+HEADER_FORMAT = "<8s8sIIII32s"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+
+def write_lexicon(file_path: Path, mode: str, stems: Dict[str, str], rules_sha256: str) -> None:
+    """
+    Write a word to stem table as sorted records with a hash index, recording the stemmer version
+    and the digest of the rules the stems were computed with.
+    """
+    from src.stemmer import STEMMER_VERSION
+
+    records = []
+    for word, stem in sorted(stems.items()):
+        if "\0" in word or "\n" in word or "\n" in stem:
+            raise ValueError(f"A lexicon word or stem cannot contain a zero byte or a newline: {word!r}")
+        records.append((word + "\0").encode("utf-8") + (stem + "\n").encode("utf-8"))
+
+    # At most half of the slots are used, so a lookup rarely probes more than two of them
+    num_slots = 1
+    while num_slots < 2 * len(records):
+        num_slots *= 2
+    slots = array("I", bytes(4 * num_slots))
+    mask = num_slots - 1
+    offset = 0
+    for record in records:
+        slot = crc32(record[:record.index(b"\0") + 1]) & mask
+        while slots[slot]:
+            slot = (slot + 1) & mask
+        slots[slot] = offset + 1
+        offset += len(record)
+    if sys.byteorder == "big":
+        slots.byteswap()
+
+    with file_path.open("wb") as f_lexicon:
+        f_lexicon.write(struct.pack(
+            HEADER_FORMAT,
+            LEXICON_MAGIC,
+            mode.encode("ascii"),
+            STEMMER_VERSION,
+            len(records),
+            num_slots,
+            offset,
+            bytes.fromhex(rules_sha256)
+        ))
+        f_lexicon.write(slots.tobytes())
+        f_lexicon.write(b"".join(records))
+
+
+class StemLexicon:
+    """
+    Read-only, memory-mapped word to stem table of one stemming mode.
+    Several processes opening the same file share it through the page cache. A lookup hashes the
+    word and compares it with the record of its slot (rarely more than two), so nothing but the
+    header is read at start-up.
+    """
+
+    def __init__(self, file_path: Path) -> None:
+        self.file_path = file_path
+        with file_path.open("rb") as f_lexicon:
+            if os.fstat(f_lexicon.fileno()).st_size < HEADER_SIZE:
+                raise ValueError(f"Not a stem lexicon file (too short): {file_path}")
+            self.buffer = mmap.mmap(f_lexicon.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, mode, self.stemmer_version, self.size, num_slots, records_size, rules_sha256 = struct.unpack_from(
+            HEADER_FORMAT, self.buffer
+        )
+        if magic != LEXICON_MAGIC or not num_slots or num_slots & (num_slots - 1):
+            self.buffer.close()
+            raise ValueError(f"Not a stem lexicon file (version 2): {file_path}")
+        self.records_start = HEADER_SIZE + 4 * num_slots
+        if len(self.buffer) != self.records_start + records_size:
+            self.buffer.close()
+            raise ValueError(f"Truncated or corrupt stem lexicon file: {file_path}")
+        self.mode = mode.rstrip(b"\0").decode("ascii")
+        self.rules_sha256 = rules_sha256.hex()
+
+        self.slots = memoryview(self.buffer)[HEADER_SIZE:self.records_start].cast("I")
+        if sys.byteorder == "big":
+            self.slots = array("I", self.slots)
+            self.slots.byteswap()
+        self.slot_mask = num_slots - 1
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def identity(self) -> str:
+        """Identity of the lexicon file (path, size and modification time), e.g. for stem cache keys."""
+        stat = self.file_path.stat()
+        return f"{self.file_path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    def __contains__(self, word: str) -> bool:
+        return self.get(word) is not None
+
+    def __enter__(self) -> "StemLexicon":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def get(self, word: str) -> Optional[str]:
+        """Return the stored stem of the word, or None if the word is not in the lexicon."""
+        key = (word + "\0").encode("utf-8")
+        slots, buffer, mask = self.slots, self.buffer, self.slot_mask
+        slot = crc32(key) & mask
+        while True:
+            offset = slots[slot]
+            if not offset:
+                return None
+            start = self.records_start + offset - 1
+            stem_start = start + len(key)
+            if buffer[start:stem_start] == key:
+                return buffer[stem_start:buffer.find(b"\n", stem_start)].decode("utf-8")
+            slot = (slot + 1) & mask
+
+    def close(self) -> None:
+        """Release the slots view and unmap the file."""
+        if isinstance(self.slots, memoryview):
+            self.slots.release()
+        self.buffer.close()
+
+
+def build_lexicon(
+    words: Iterable[str],
+    mode: str,
+    file_path: Path,
+    rule_sets: Optional[Dict[str, "CompiledRuleSet"]] = None
+) -> int:
+    """Stem the given vocabulary with the rule pipeline of the mode (or custom rule sets) and save it as a lexicon."""
+    from src.stemmer import LabadainStemmer
+
+    stemmer = LabadainStemmer(mode=mode, rule_sets=rule_sets)
+    stems = {word: stemmer.stem_word(word) for word in set(words) if len(word) > 3}
+    write_lexicon(file_path, mode, stems, stemmer.lexicon_rules_digest(mode))
+    return len(stems)
+
+
+if __name__ == "__main__":
+    from config.utils import Utils
+    from src.stemmer import STEMMER_MODES
+    from src.preprocessing import TextPreprocessing
+    from tetuntokenizer.tokenizer import TetunSimpleTokenizer
+
+    parser = argparse.ArgumentParser(description="Build a precomputed stem lexicon from a corpus vocabulary")
+    parser.add_argument("-if", "--input_file", type=str, required=True, help="Path to input text file ('-' for stdin)")
+    parser.add_argument("-of", "--output_file", type=str, required=True, help="Path to save the lexicon")
+    parser.add_argument(
+        "-m",
+        "--mode",
+        choices=STEMMER_MODES,
+        default="light",
+        help="Choose stemming mode (default: light)"
+    )
+    parser.add_argument(
+        "-r",
+        "--rules",
+        type=str,
+        default=None,
+        help="Path to a rule set file (see src/rule_sets.py); the lexicon must then be used with the same rules"
+    )
+    args = parser.parse_args()
+
+    tokenizer = TetunSimpleTokenizer()
+    vocabulary = set()
+    for line in Utils().iter_corpus(Path(args.input_file)):
+        vocabulary.update(tokenizer.tokenize(TextPreprocessing(line).preprocess_text()))
+
+    if args.rules:
+        from src.rule_sets import load_rule_sets
+        rule_sets = load_rule_sets(Path(args.rules))
+    else:
+        rule_sets = None
+    entries = build_lexicon(vocabulary, args.mode, Path(args.output_file), rule_sets)
+    print(f"Saved {entries} {args.mode} stems to {args.output_file}")
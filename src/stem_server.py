@@ -0,0 +1,244 @@
+import argparse
+import asyncio
+import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Deque, Dict, List, Optional, Tuple
+from src.stemmer import STEMMER_MODES, LabadainStemmer
+from src.stem_cache import StemCache
+
+#!/usr/bin/env python3
+#
+# src.stem_server.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+# Requests and responses are newline-delimited JSON objects:
+#   {"id": 1, "mode": "heavy", "text": "Komemorasaun loron independénsia"}  -> {"id": 1, "stemmed": "komemor loro independente"}
+#   {"id": 2, "mode": "light", "words": ["nasionál", "edukasaun"]}          -> {"id": 2, "stems": [...]}
+#   {"command": "metrics"}                                                 -> {"metrics": {...}}
+# A request that cannot be served gets {"id": ..., "error": "..."}.
+
+
+class StemServer:
+    """
+    Long-running stemming service keeping warm pipelines for all the modes.
+    Concurrent requests (from several connections, or pipelined on one) are queued and
+    coalesced into batches of up to max_batch_size. Every batch is stemmed in one call on a
+    stemming thread, so the event loop keeps reading and answering other connections while a
+    large text is stemmed, and the requests arriving meanwhile form the next batch. With
+    max_batch_delay, the loop also waits that many seconds for a batch to fill up. A request line
+    longer than max_request_size bytes is skipped and answered with a single error.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = 64,
+        max_batch_delay: float = 0.0,
+        cache_size: int = 100000,
+        max_request_size: int = 1 << 24
+    ) -> None:
+        self.max_batch_size = max_batch_size
+        self.max_batch_delay = max_batch_delay
+        self.max_request_size = max_request_size
+        self.cache = StemCache(cache_size) if cache_size > 0 else None
+        self.stemmers = {mode: LabadainStemmer(mode=mode, cache=self.cache) for mode in STEMMER_MODES}
+        self.queue: Optional[asyncio.Queue] = None
+        self.executor = ThreadPoolExecutor(1, thread_name_prefix="stemmer")
+        self.latencies: Deque[float] = deque(maxlen=10000)
+        self.requests = 0
+        self.batches = 0
+        self.max_queue_depth = 0
+
+    def stem_request(self, request: Dict) -> Dict:
+        """Serve a single stemming request."""
+        response = {"id": request.get("id")}
+        mode = request.get("mode", "light")
+        stemmer = self.stemmers.get(mode)
+        if stemmer is None:
+            response["error"] = f"Invalid mode '{mode}'! Choose 'light', 'moderate', or 'heavy'."
+        elif "text" in request:
+            if not isinstance(request["text"], str):
+                response["error"] = "The 'text' field must be a string."
+            else:
+                response["stemmed"] = stemmer.stem_document(request["text"])
+        elif "words" in request:
+            words = request["words"]
+            if not isinstance(words, list) or not all(isinstance(word, str) for word in words):
+                response["error"] = "The 'words' field must be a list of strings."
+            else:
+                response["stems"] = stemmer.stem_tokens(words)
+        else:
+            response["error"] = "The request must have a 'text' or 'words' field."
+        return response
+
+    def stem_batch(self, requests: List[Dict]) -> List[Dict]:
+        """Serve a batch of stemming requests (on the stemming thread), one response per request."""
+        responses = []
+        for request in requests:
+            try:
+                responses.append(self.stem_request(request))
+            except Exception as error:
+                responses.append({"id": request.get("id"), "error": str(error)})
+        return responses
+
+    async def process_batch(self, batch: List[Tuple[Dict, asyncio.Future, float]]) -> None:
+        """Stem a batch of queued requests on the stemming thread and resolve their futures."""
+        self.batches += 1
+        loop = asyncio.get_running_loop()
+        responses = await loop.run_in_executor(self.executor, self.stem_batch, [request for request, _, _ in batch])
+        for (_, future, queued_at), response in zip(batch, responses):
+            if not future.cancelled():
+                future.set_result(response)
+            self.latencies.append(perf_counter() - queued_at)
+
+    def drain_queue(self, batch: List) -> None:
+        """Move queued requests into the batch, up to the maximum batch size."""
+        while len(batch) < self.max_batch_size and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+
+    async def batch_loop(self) -> None:
+        """Collect the queued requests into batches and serve them."""
+        while True:
+            batch = [await self.queue.get()]
+            self.drain_queue(batch)
+            if len(batch) < self.max_batch_size and self.max_batch_delay > 0:
+                await asyncio.sleep(self.max_batch_delay)
+                self.drain_queue(batch)
+            await self.process_batch(batch)
+
+    def metrics(self) -> Dict:
+        """Return the request, batching, queue-depth and latency metrics."""
+        latencies = sorted(self.latencies)
+
+        def percentile(fraction: float) -> float:
+            return latencies[min(int(fraction * len(latencies)), len(latencies) - 1)] * 1000 if latencies else 0.0
+
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "max_queue_depth": self.max_queue_depth,
+            "latency_ms": {
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": latencies[-1] * 1000 if latencies else 0.0,
+            },
+            "cache": self.cache.stats() if self.cache else None,
+        }
+
+    @staticmethod
+    async def discard_line(reader: asyncio.StreamReader, consumed: int) -> None:
+        """Drop an over-long request line, up to and including its newline (or the end of the stream)."""
+        while True:
+            # The bytes before the newline, or all the buffered bytes if the newline has not come yet
+            await reader.readexactly(consumed)
+            try:
+                await reader.readuntil(b"\n")
+                return
+            except asyncio.LimitOverrunError as error:
+                consumed = error.consumed
+            except asyncio.IncompleteReadError:
+                return
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Read the requests of a connection and write the responses back in the same order."""
+        loop = asyncio.get_running_loop()
+        responses: asyncio.Queue = asyncio.Queue()
+
+        async def write_responses() -> None:
+            while True:
+                future = await responses.get()
+                if future is None:
+                    break
+                writer.write((json.dumps(await future, ensure_ascii=False) + "\n").encode("utf-8"))
+                await writer.drain()
+
+        writer_task = asyncio.create_task(write_responses())
+        try:
+            while True:
+                try:
+                    line = await reader.readuntil(b"\n")
+                except asyncio.IncompleteReadError as error:
+                    # The end of the stream, after a last line without a newline (if any)
+                    line = error.partial
+                except asyncio.LimitOverrunError as error:
+                    await self.discard_line(reader, error.consumed)
+                    future = loop.create_future()
+                    future.set_result({"id": None, "error": f"The request exceeds {self.max_request_size} bytes."})
+                    responses.put_nowait(future)
+                    continue
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                future = loop.create_future()
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError as error:
+                    future.set_result({"id": None, "error": f"Invalid JSON: {error}"})
+                    responses.put_nowait(future)
+                    continue
+                if not isinstance(request, dict):
+                    future.set_result({"id": None, "error": "The request must be a JSON object."})
+                    responses.put_nowait(future)
+                    continue
+
+                if request.get("command") == "metrics":
+                    future.set_result({"id": request.get("id"), "metrics": self.metrics()})
+                else:
+                    self.requests += 1
+                    self.queue.put_nowait((request, future, perf_counter()))
+                    self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+                responses.put_nowait(future)
+        finally:
+            responses.put_nowait(None)
+            await writer_task
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765, unix_socket: Optional[str] = None) -> None:
+        """Serve on a Unix socket if one is given, otherwise on a (localhost) TCP port."""
+        self.queue = asyncio.Queue()
+        batch_task = asyncio.create_task(self.batch_loop())
+        if unix_socket:
+            server = await asyncio.start_unix_server(self.handle_connection, path=unix_socket, limit=self.max_request_size)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port, limit=self.max_request_size)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batch_task.cancel()
+            self.executor.shutdown(wait=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Labadain Stemmer service")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="TCP host (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port (default: 8765)")
+    parser.add_argument("--unix_socket", type=str, default=None, help="Serve on this Unix socket path instead of TCP")
+    parser.add_argument("--max_batch_size", type=int, default=64, help="Maximum requests per batch (default: 64)")
+    parser.add_argument(
+        "--max_batch_delay",
+        type=float,
+        default=0.0,
+        help="Seconds to wait for a batch to fill up (default: 0, the requests arriving while a batch "
+             "is stemmed form the next one)"
+    )
+    parser.add_argument("-cs", "--cache_size", type=int, default=100000, help="Stem cache size (default: 100000)")
+    parser.add_argument(
+        "--max_request_size",
+        type=int,
+        default=1 << 24,
+        help="Maximum size of a request line in bytes (default: 16 MiB)"
+    )
+    args = parser.parse_args()
+
+    server = StemServer(args.max_batch_size, args.max_batch_delay, args.cache_size, args.max_request_size)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix_socket))
+    except KeyboardInterrupt:
+        pass
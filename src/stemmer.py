@@ -0,0 +1,287 @@
+import hashlib
+from functools import cached_property
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from src.rule_sets import rule_sets_digest
+from src.stem_cache import StemCache
+from src.stemmer_rules import CompiledRuleSet
+from src.stemmer_pipeline import (
+    LighStemmerPipeline,
+    ModerateStemmerPipeline,
+    HeavyStemmerPipeline,
+    MultiModePipeline
+)
+
+if TYPE_CHECKING:
+    from tetuntokenizer.tokenizer import TetunSimpleTokenizer
+    from src.fused_tokenizer import FusedTokenizer
+    from src.instrumentation import RuleHook, RuleStatistics
+    from src.stem_lexicon import StemLexicon
+
+#!/usr/bin/env python3
+#
+# src.stemmer.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 09-05-2024
+
+
+STEMMER_MODES = ("light", "moderate", "heavy")
+# Bumped whenever a change of the stemming code changes the stems (outputs of an older version are stale)
+STEMMER_VERSION = 1
+# Stem with every mode in a single pass (see LabadainStemmer.stem_document_all)
+ALL_MODES = "all"
+
+
+class LabadainStemmer:
+    """
+    An implementation of the Labadain stemmer algorithm.
+    The stemmer can be bound to a text (stem()), or built once per mode and reused for any number
+    of words, token lists and documents (stem_word, stem_tokens, stem_text and stem_batch), which
+    keep no per-call state. The tokenizers are only built (and imported) when first used.
+
+    These methods are thread-safe: a single instance (and its StemCache) can be shared by any
+    number of threads, e.g. with src/threaded_stemmer.py or stem_batch_threaded. Only
+    instrument() and uninstrument() must not be called while other threads are stemming.
+    """
+
+    def __init__(
+        self,
+        text: str = "",
+        mode: str = "light",
+        cache: Optional[StemCache] = None,
+        lexicon: Optional["StemLexicon"] = None,
+        rule_sets: Optional[Dict[str, CompiledRuleSet]] = None
+    ) -> None:
+        if mode not in STEMMER_MODES:
+            raise ValueError("Invalid mode! Choose 'light', 'moderate', or 'heavy'.")
+        self.text = text
+        self.mode = mode
+        self.cache = cache
+        rule_sets = rule_sets or {}
+        self.light_stemmer_pipe = LighStemmerPipeline(rule_sets.get("light"))
+        self.moderate_stemmer_pipe = ModerateStemmerPipeline(rule_sets.get("moderate"))
+        self.heavy_stemmer_pipe = HeavyStemmerPipeline(rule_sets.get("heavy"))
+        self.pipes = {
+            "light": self.light_stemmer_pipe,
+            "moderate": self.moderate_stemmer_pipe,
+            "heavy": self.heavy_stemmer_pipe,
+        }
+        self.pipelines = {
+            "light": self.light_stemmer_pipe.light_stemmer,
+            "moderate": self.moderate_stemmer_pipe.moderate_stemmer,
+            "heavy": self.heavy_stemmer_pipe.heavy_stemmer,
+        }
+        self.lexicon = lexicon
+        if lexicon is not None:
+            self.check_lexicon(lexicon)
+            self.pipelines[lexicon.mode] = self.lexicon_stemmer(self.pipelines[lexicon.mode])
+
+    @cached_property
+    def tokenizer(self) -> "TetunSimpleTokenizer":
+        """Tokenizer of preprocessed texts."""
+        from tetuntokenizer.tokenizer import TetunSimpleTokenizer
+        return TetunSimpleTokenizer()
+
+    @cached_property
+    def fused_tokenizer(self) -> "FusedTokenizer":
+        """Preprocessing tokenizer of raw documents."""
+        from src.fused_tokenizer import FusedTokenizer
+        return FusedTokenizer()
+
+    @cached_property
+    def multi_mode_stemmer(self) -> Callable[[str], Tuple[str, ...]]:
+        """Stemmer returning the light, moderate and heavy stems of a word in one pass."""
+        stemmer = MultiModePipeline([self.pipes[mode] for mode in STEMMER_MODES]).stem_word
+        if self.lexicon is None:
+            return stemmer
+
+        lexicon_get = self.lexicon.get
+        lexicon_index = STEMMER_MODES.index(self.lexicon.mode)
+
+        def stem_with_lexicon(word: str) -> Tuple[str, ...]:
+            stems = stemmer(word)
+            stemmed_word = lexicon_get(word)
+            if stemmed_word is None:
+                return stems
+            return stems[:lexicon_index] + (stemmed_word,) + stems[lexicon_index + 1:]
+
+        return stem_with_lexicon
+
+    def tokenize_text(self, text: Optional[str] = None) -> List[str]:
+        """Remove punctuation, special characters, and tokenize into word and number tokens."""
+        return self.tokenizer.tokenize(self.text if text is None else text)
+
+    def lexicon_rules_digest(self, mode: str) -> str:
+        """Digest of the rules of a mode, recorded in (and checked against) the lexicons of the mode."""
+        return rule_sets_digest({mode: self.pipes[mode].rule_set.rules})
+
+    def check_lexicon(self, lexicon: "StemLexicon") -> None:
+        """Refuse a lexicon built by another stemmer version or with other rules than this stemmer's."""
+        if lexicon.stemmer_version != STEMMER_VERSION:
+            raise ValueError(
+                f"The lexicon {lexicon.file_path} was built by stemmer version {lexicon.stemmer_version} "
+                f"(this is version {STEMMER_VERSION}); rebuild it."
+            )
+        if lexicon.rules_sha256 != self.lexicon_rules_digest(lexicon.mode):
+            raise ValueError(f"The lexicon {lexicon.file_path} was built with other {lexicon.mode} rules; rebuild it.")
+
+    def lexicon_stemmer(self, stemmer: Callable[[str], str]) -> Callable[[str], str]:
+        """Consult the precomputed lexicon before running the rule pipeline."""
+        lexicon_get = self.lexicon.get
+
+        def stem_with_lexicon(word: str) -> str:
+            stemmed_word = lexicon_get(word)
+            return stemmer(word) if stemmed_word is None else stemmed_word
+
+        return stem_with_lexicon
+
+    @cached_property
+    def cache_namespaces(self) -> Dict[str, str]:
+        """
+        Stem cache namespace of every mode (and ALL_MODES): the mode with a digest of the rules
+        and the lexicon, so stemmers sharing a cache only share the entries they agree on.
+        """
+        digest = hashlib.sha256(rule_sets_digest({mode: pipe.rule_set.rules for mode, pipe in self.pipes.items()}).encode())
+        if self.lexicon is not None:
+            digest.update(f"\0{self.lexicon.mode}\0{self.lexicon.identity}".encode("utf-8"))
+        identity = digest.hexdigest()[:16]
+        return {mode: f"{mode}:{identity}" for mode in STEMMER_MODES + (ALL_MODES,)}
+
+    def cached_stem(self, mode: str, stemmer: Callable[[str], str], word: str) -> str:
+        """Stem a word with the given pipeline, through the stem cache if one is set."""
+        if self.cache is None:
+            return stemmer(word)
+        return self.cache.get_or_stem(self.cache_namespaces[mode], word, stemmer)
+
+    def instrument(self, hook: Optional["RuleHook"] = None) -> "RuleStatistics":
+        """Record the hits and time of every rule of the stemmer's mode (see RuleBasedPipeline.instrument)."""
+        return self.pipes[self.mode].instrument(hook)
+
+    def uninstrument(self) -> None:
+        """Stop recording rule statistics."""
+        self.pipes[self.mode].uninstrument()
+
+    def stem_tokens_with(self, mode: str, tokens: Iterable[str]) -> List[str]:
+        """Stem the tokens with the pipeline of the given mode, keeping tokens of up to three characters."""
+        stemmer = self.pipelines[mode]
+        stemmed_words_list = []
+        for word in tokens:
+            if len(word) > 3:
+                stemmed_word = self.cached_stem(mode, stemmer, word.strip())
+                stemmed_words_list.append(stemmed_word)
+            else:
+                stemmed_words_list.append(word)
+        return stemmed_words_list
+
+    def stem_word(self, word: str) -> str:
+        """Stem a single token."""
+        if len(word) > 3:
+            return self.cached_stem(self.mode, self.pipelines[self.mode], word.strip())
+        return word
+
+    def stem_tokens(self, tokens: Iterable[str]) -> List[str]:
+        """Stem a list of tokens."""
+        return self.stem_tokens_with(self.mode, tokens)
+
+    def stem_text(self, text: str) -> str:
+        """Tokenize and stem a (preprocessed) text, returning the space-separated stems."""
+        return " ".join(self.stem_tokens_with(self.mode, self.tokenize_text(text)))
+
+    def stem_document_tokens(self, text: str) -> List[str]:
+        """Preprocess, tokenize and stem a raw document in one scan, returning the list of stems."""
+        return self.stem_tokens_with(self.mode, self.fused_tokenizer.tokenize(text))
+
+    def stem_document(self, text: str) -> str:
+        """Preprocess, tokenize and stem a raw document in one scan, returning the space-separated stems."""
+        return " ".join(self.stem_document_tokens(text))
+
+    def iter_stem_spans(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """Yield the (start, end) offsets in the raw text and the stem of every token, lazily."""
+        stem_word = self.stem_word
+        for token, start, end in self.fused_tokenizer.iter_tokens_with_spans(text):
+            yield start, end, stem_word(token)
+
+    def stem_word_all(self, word: str) -> Tuple[str, ...]:
+        """Stem a single token with every mode, returning the (light, moderate, heavy) stems."""
+        if len(word) <= 3:
+            return (word,) * len(STEMMER_MODES)
+        if self.cache is None:
+            return self.multi_mode_stemmer(word.strip())
+        return self.cache.get_or_stem(self.cache_namespaces[ALL_MODES], word.strip(), self.multi_mode_stemmer)
+
+    def stem_tokens_all(self, tokens: Iterable[str]) -> Tuple[List[str], ...]:
+        """Stem a list of tokens with every mode, returning the aligned (light, moderate, heavy) stem lists."""
+        stems = [self.stem_word_all(word) for word in tokens]
+        if not stems:
+            return tuple([] for _ in STEMMER_MODES)
+        return tuple(list(mode_stems) for mode_stems in zip(*stems))
+
+    def stem_text_all(self, text: str) -> Tuple[str, ...]:
+        """Tokenize a (preprocessed) text once and stem it with every mode."""
+        return tuple(" ".join(mode_stems) for mode_stems in self.stem_tokens_all(self.tokenize_text(text)))
+
+    def stem_document_tokens_all(self, text: str) -> Tuple[List[str], ...]:
+        """Preprocess and tokenize a raw document once and stem it with every mode, returning the stem lists."""
+        return self.stem_tokens_all(self.fused_tokenizer.tokenize(text))
+
+    def stem_document_all(self, text: str) -> Tuple[str, ...]:
+        """Preprocess and tokenize a raw document once and stem it with every mode."""
+        return tuple(" ".join(mode_stems) for mode_stems in self.stem_document_tokens_all(text))
+
+    def stem_batch(self, documents: Iterable[str]) -> List[str]:
+        """Tokenize and stem a batch of (preprocessed) documents."""
+        return [self.stem_text(document) for document in documents]
+
+    def stem_batch_threaded(self, documents: Iterable[str], threads: Optional[int] = None) -> List[str]:
+        """
+        Preprocess and stem a batch of raw documents in a pool of threads sharing this stemmer.
+        Threads run in parallel on free-threaded Python builds; with the GIL, the batch is
+        stemmed in the calling thread.
+        """
+        from src.threaded_stemmer import stem_threaded
+        return stem_threaded(documents, self.stem_document, threads)
+
+    def light_stemmer(self) -> str:
+        """Stem words to the root using light stemmer."""
+        return " ".join(self.stem_tokens_with("light", self.tokenize_text()))
+
+    def moderate_stemmer(self) -> str:
+        """Stem words to the root using moderate stemmer."""
+        return " ".join(self.stem_tokens_with("moderate", self.tokenize_text()))
+
+    def heavy_stemmer(self) -> str:
+        """Stem words to the root using heavy stemmer."""
+        return " ".join(self.stem_tokens_with("heavy", self.tokenize_text()))
+
+    def stem(self) -> str:
+        """Stem the text bound to the stemmer."""
+        if self.mode == "light":
+            return self.light_stemmer()
+        elif self.mode == "moderate":
+            return self.moderate_stemmer()
+        elif self.mode == "heavy":
+            return self.heavy_stemmer()
+        else:
+            raise ValueError("Invalid mode! Choose 'light', 'moderate', or 'heavy'.")
+
+
+def iter_stem(
+    lines: Iterable[str],
+    mode: str = "light",
+    cache: Optional[StemCache] = None,
+    lexicon: Optional["StemLexicon"] = None,
+    stemmer: Optional[LabadainStemmer] = None
+) -> Iterator[str]:
+    """
+    Preprocess and stem the input lines one at a time, yielding one stemmed line per input line.
+    The tokenizer and pipelines are built once (or an existing stemmer is reused), so memory
+    stays flat regardless of the input size.
+    """
+    stemmer = stemmer or LabadainStemmer(mode=mode, cache=cache, lexicon=lexicon)
+    for line in lines:
+        yield stemmer.stem_document(line)
+
+
+def mode_output_paths(output_file: Path) -> List[Path]:
+    """Output file of every mode with -m all, e.g. result.txt -> result.light.txt, result.moderate.txt, ..."""
+    return [output_file.with_name(f"{output_file.stem}.{mode}{output_file.suffix}") for mode in STEMMER_MODES]
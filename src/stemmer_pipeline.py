@@ -1,5 +1,14 @@
+from time import perf_counter
+from typing import Optional, Sequence, Tuple
+from src.instrumentation import NO_MATCH_NAME, RuleHook, RuleStatistics
 from src.labadain_stemmer_core import LabadainStemmerCore
-from config import tetun_affixes as affix
+from src.stemmer_rules import (
+    NO_MATCH,
+    CompiledRuleSet,
+    LIGHT_RULES,
+    MODERATE_RULES,
+    HEAVY_RULES
+)
 
 #!/usr/bin/env python3
 #
@@ -8,174 +17,125 @@ from config import tetun_affixes as affix
 # 09-05-2024
 
 
-class LighStemmerPipeline(LabadainStemmerCore):
-    """Labadain Stemmer Pipeline."""
+class RuleBasedPipeline(LabadainStemmerCore):
+    """
+    Base class of the Labadain Stemmer pipelines.
+    The rule set of each mode is compiled once, when the module is imported, and the
+    first rule matching the word (in pipeline order) is applied. A rule set loaded from a
+    file (see src/rule_sets.py) can replace the built-in one.
+    """
 
-    def __init__(self) -> None:
-        pass
+    mode = ""
+    rule_set = CompiledRuleSet(())
 
-    def light_stemmer(self, word: str) -> str:
-        """Pipeline to execute the Labadain Stemmer algorithm."""
-        # === Step 1 - Standard suffix removal ===
-        if word.endswith(tuple(affix.general_suffixes)):
-            return self.standard_suffix_removal(word, affix.general_suffixes)
-
-        # "lojia" or "lojias" endings
-        elif word.endswith(tuple(affix.lojias_suffixes)):
-            return self.simple_replace_suffixes(word, affix.lojias_suffixes, "loj")
-
-        # "usaun" or "usoens" endings
-        elif word.endswith(tuple(affix.usoens_suffixes)):
-            return self.simple_replace_suffixes(word, affix.usoens_suffixes, "u")
-
-        # "énsia" or "énsias" endings
-        elif word.endswith(tuple(affix.ensias_suffixes)):
-            return self.simple_replace_suffixes(word, affix.ensias_suffixes, "ente")
+    def __init__(self, rule_set: Optional[CompiledRuleSet] = None) -> None:
+        if rule_set is not None:
+            self.rule_set = rule_set
+        self.actions = self.rule_set.bind(self)
+        self.statistics: Optional[RuleStatistics] = None
 
-        # "amente" ending
-        elif word.endswith(affix.amente_suffix):
-            return self.process_amente_suffix(word, affix.amente_suffix)
+    def stem_word(self, word: str) -> str:
+        """Pipeline to execute the Labadain Stemmer algorithm."""
+        index = self.rule_set.dispatch(word)
+        if index == NO_MATCH:
+            # Return original word if it doesn't match any rule
+            return word
+        return self.apply_rule(index, word)
+
+    def apply_rule(self, index: int, word: str) -> str:
+        """Apply the rule at the given index of the rule set to the word."""
+        if self.rule_set.uses_regions[index]:
+            # Find R1, R2 and RV once and pass them to the rule
+            return self.actions[index](word, regions=self.find_regions(word))
+        return self.actions[index](word)
+
+    def instrumented_stem_word(self, word: str) -> str:
+        """Same as stem_word, recording the rule applied and the time spent."""
+        start = perf_counter()
+        index = self.rule_set.dispatch(word)
+        if index == NO_MATCH:
+            stemmed_word, rule_name = word, NO_MATCH_NAME
+        else:
+            stemmed_word, rule_name = self.apply_rule(index, word), self.rule_set.rules[index].name
+        self.statistics.record(rule_name, word, stemmed_word, perf_counter() - start)
+        return stemmed_word
 
-        # "mente" ending
-        elif word.endswith(affix.mente_suffix):
-            return self.process_mente_suffix(word, affix.mente_suffix)
+    def instrument(self, hook: Optional[RuleHook] = None) -> RuleStatistics:
+        """
+        Count the hits and time of every rule (and call the hook after every word) until
+        uninstrument() is called. When disabled, the pipeline runs without any overhead.
+        """
+        self.statistics = RuleStatistics(self.mode, (rule.name for rule in self.rule_set.rules), hook)
+        self.stem_word = self.instrumented_stem_word
+        return self.statistics
 
-        # "idade" or "idades" suffixes
-        elif word.endswith(tuple(affix.idades_suffixes)):
-            return self.process_idades_suffixes(word, affix.idades_suffixes)
+    def uninstrument(self) -> None:
+        """Stop recording rule statistics."""
+        self.__dict__.pop("stem_word", None)
+        self.statistics = None
 
-        # "ivu", "iva", "ivus", or "ivas" suffixes
-        elif word.endswith(tuple(affix.ivos_suffixes)):
-            return self.process_ivos_suffixes(word, affix.ivos_suffixes)
 
-        # === Step 2 - Verb suffixes removal ===
-        elif word.endswith(tuple(affix.verb_based_suffixes)):
-            return self.verb_suffix_removal(word, affix.verb_based_suffixes)
+class LighStemmerPipeline(RuleBasedPipeline):
+    """Labadain Stemmer Pipeline: Portuguese-derived suffixes."""
 
-        # === Step 3 (step 4 in Snowball) - Residual suffix removal
-        elif word.endswith(tuple(affix.residual_suffixes)):
-            return self.residual_suffixes_removal(word, affix.residual_suffixes)
+    mode = "light"
+    rule_set = CompiledRuleSet(LIGHT_RULES)
 
-        # Return original word if it doesn't match the previous rules
-        else:
-            return word
+    def light_stemmer(self, word: str) -> str:
+        """Pipeline to execute the Labadain Stemmer algorithm."""
+        return self.stem_word(word)
 
 
-class ModerateStemmerPipeline(LabadainStemmerCore):
-    """Labadain Stemmer Pipeline."""
+class ModerateStemmerPipeline(RuleBasedPipeline):
+    """Labadain Stemmer Pipeline: light pipeline plus Tetun native suffixes."""
 
-    def __init__(self) -> None:
-        pass
+    mode = "moderate"
+    rule_set = CompiledRuleSet(MODERATE_RULES)
 
     def moderate_stemmer(self, word: str) -> str:
         """Pipeline to execute the Labadain Stemmer algorithm."""
-        # === Step 1 - Standard suffix removal ===
-        if word.endswith(tuple(affix.general_suffixes)):
-            return self.standard_suffix_removal(word, affix.general_suffixes)
-
-        # "lojia" or "lojias" endings
-        elif word.endswith(tuple(affix.lojias_suffixes)):
-            return self.simple_replace_suffixes(word, affix.lojias_suffixes, "loj")
-
-        # "usaun" or "usoens" endings
-        elif word.endswith(tuple(affix.usoens_suffixes)):
-            return self.simple_replace_suffixes(word, affix.usoens_suffixes, "u")
-
-        # "énsia" or "énsias" endings
-        elif word.endswith(tuple(affix.ensias_suffixes)):
-            return self.simple_replace_suffixes(word, affix.ensias_suffixes, "ente")
-
-        # "amente" ending
-        elif word.endswith(affix.amente_suffix):
-            return self.process_amente_suffix(word, affix.amente_suffix)
-
-        # "mente" ending
-        elif word.endswith(affix.mente_suffix):
-            return self.process_mente_suffix(word, affix.mente_suffix)
-
-        # "idade" or "idades" suffixes
-        elif word.endswith(tuple(affix.idades_suffixes)):
-            return self.process_idades_suffixes(word, affix.idades_suffixes)
-
-        # "ivu", "iva", "ivus", or "ivas" suffixes
-        elif word.endswith(tuple(affix.ivos_suffixes)):
-            return self.process_ivos_suffixes(word, affix.ivos_suffixes)
-
-        # === Step 2 - Verb suffixes removal ===
-        elif word.endswith(tuple(affix.verb_based_suffixes)):
-            return self.verb_suffix_removal(word, affix.verb_based_suffixes)
+        return self.stem_word(word)
 
-        # === Tetun native ===
 
-        # Tetun suffixes removal
-        elif word.endswith(tuple(affix.tetun_suffixes)):
-            return self.tetun_suffix_removal(word, affix.tetun_suffixes)
+class HeavyStemmerPipeline(RuleBasedPipeline):
+    """Labadain Stemmer Pipeline: moderate pipeline plus Tetun native prefixes."""
 
-        # === Step 3 (step 4 in Snowball) - Residual suffix removal
-        elif word.endswith(tuple(affix.residual_suffixes)):
-            return self.residual_suffixes_removal(word, affix.residual_suffixes)
-
-        # Return original word if it doesn't match the previous rules
-        else:
-            return word
-
-
-class HeavyStemmerPipeline(LabadainStemmerCore):
-    """Labadain Stemmer Pipeline."""
-
-    def __init__(self) -> None:
-        pass
+    mode = "heavy"
+    rule_set = CompiledRuleSet(HEAVY_RULES)
 
     def heavy_stemmer(self, word: str) -> str:
         """Pipeline to execute the Labadain Stemmer algorithm."""
-        # === Step 1 - Standard suffix removal ===
-        if word.endswith(tuple(affix.general_suffixes)):
-            return self.standard_suffix_removal(word, affix.general_suffixes)
-
-        # "lojia" or "lojias" endings
-        elif word.endswith(tuple(affix.lojias_suffixes)):
-            return self.simple_replace_suffixes(word, affix.lojias_suffixes, "loj")
-
-        # "usaun" or "usoens" endings
-        elif word.endswith(tuple(affix.usoens_suffixes)):
-            return self.simple_replace_suffixes(word, affix.usoens_suffixes, "u")
-
-        # "énsia" or "énsias" endings
-        elif word.endswith(tuple(affix.ensias_suffixes)):
-            return self.simple_replace_suffixes(word, affix.ensias_suffixes, "ente")
-
-        # "amente" ending
-        elif word.endswith(affix.amente_suffix):
-            return self.process_amente_suffix(word, affix.amente_suffix)
-
-        # "mente" ending
-        elif word.endswith(affix.mente_suffix):
-            return self.process_mente_suffix(word, affix.mente_suffix)
-
-        # "idade" or "idades" suffixes
-        elif word.endswith(tuple(affix.idades_suffixes)):
-            return self.process_idades_suffixes(word, affix.idades_suffixes)
-
-        # "ivu", "iva", "ivus", or "ivas" suffixes
-        elif word.endswith(tuple(affix.ivos_suffixes)):
-            return self.process_ivos_suffixes(word, affix.ivos_suffixes)
-
-        # === Step 2 - Verb suffixes removal ===
-        elif word.endswith(tuple(affix.verb_based_suffixes)):
-            return self.verb_suffix_removal(word, affix.verb_based_suffixes)
-
-        # Tetun suffixes removal
-        elif word.endswith(tuple(affix.tetun_suffixes)):
-            return self.tetun_suffix_removal(word, affix.tetun_suffixes)
-
-        # Tetun prefixes removal
-        elif word.startswith(tuple(affix.tetun_prefixes)):
-            return self.tetun_prefix_removal(word, affix.tetun_prefixes)
-
-        # === Step 3 (step 4 in Snowball) - Residual suffix removal
-        elif word.endswith(tuple(affix.residual_suffixes)):
-            return self.residual_suffixes_removal(word, affix.residual_suffixes)
-
-        # Return original word if it doesn't match the previous rules
-        else:
-            return word
\ No newline at end of file
+        return self.stem_word(word)
+
+
+class MultiModePipeline:
+    """
+    Stem a word under several pipelines in a single pass. The pipelines share their leading
+    rules (step 1 and step 2 for the built-in modes), so those are dispatched once per word;
+    only a word none of them matches goes through the remaining rules of every pipeline
+    (the Tetun suffix, Tetun prefix and residual steps).
+    """
+
+    def __init__(self, pipes: Sequence[RuleBasedPipeline]) -> None:
+        self.pipes = tuple(pipes)
+        rule_lists = [pipe.rule_set.rules for pipe in self.pipes]
+        shared_length = 0
+        for rules in zip(*rule_lists):
+            if any(rule != rules[0] for rule in rules):
+                break
+            shared_length += 1
+        self.shared_length = shared_length
+        self.shared_rule_set = CompiledRuleSet(rule_lists[0][:shared_length] if rule_lists else ())
+        self.tail_rule_sets = tuple(CompiledRuleSet(rules[shared_length:]) for rules in rule_lists)
+
+    def stem_word(self, word: str) -> Tuple[str, ...]:
+        """Return the stem of the word under every pipeline, in pipeline order."""
+        index = self.shared_rule_set.dispatch(word)
+        if index != NO_MATCH:
+            return (self.pipes[0].apply_rule(index, word),) * len(self.pipes)
+
+        stems = []
+        for pipe, tail_rule_set in zip(self.pipes, self.tail_rule_sets):
+            index = tail_rule_set.dispatch(word)
+            stems.append(word if index == NO_MATCH else pipe.apply_rule(self.shared_length + index, word))
+        return tuple(stems)
@@ -0,0 +1,136 @@
+from functools import partial
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from config import tetun_affixes as affix
+from src.labadain_stemmer_core import REGION_METHODS
+
+#!/usr/bin/env python3
+#
+# src.stemmer_rules.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+NO_MATCH = -1
+
+
+class AffixRule(NamedTuple):
+    """
+    A single branch of a stemmer pipeline:
+    - name: label of the branch (e.g. "general", "lojia").
+    - affixes: the endings (or beginnings, if prefix is True) that select the branch.
+    - action: name of the LabadainStemmerCore method applied to the word.
+    - params: keyword arguments passed to the action.
+    """
+    name: str
+    affixes: Tuple[str, ...]
+    action: str
+    params: Dict[str, object]
+    prefix: bool = False
+
+
+def longest_first(affixes: Sequence[str]) -> Tuple[str, ...]:
+    """Sort the affixes by length in descending order, as done by the core removal methods."""
+    return tuple(sorted(affixes, key=len, reverse=True))
+
+
+# Actions receiving the affixes sorted longest first (and told so with presorted=True)
+SORTED_AFFIX_ACTIONS = frozenset({
+    "standard_suffix_removal",
+    "verb_suffix_removal",
+    "tetun_suffix_removal",
+    "tetun_prefix_removal",
+})
+# Actions receiving a single suffix
+SINGLE_SUFFIX_ACTIONS = frozenset({"process_amente_suffix", "process_mente_suffix"})
+# Actions replacing the suffix with a replacement term
+REPLACE_ACTIONS = frozenset({"simple_replace_suffixes"})
+PREFIX_ACTIONS = frozenset({"tetun_prefix_removal"})
+RULE_ACTIONS = SORTED_AFFIX_ACTIONS | SINGLE_SUFFIX_ACTIONS | REPLACE_ACTIONS | frozenset({
+    "process_idades_suffixes",
+    "process_ivos_suffixes",
+    "residual_suffixes_removal",
+})
+
+
+def make_rule(name: str, affixes: Sequence[str], action: str, replacement: Optional[str] = None) -> AffixRule:
+    """Build a rule, deriving the keyword arguments of its action from the affixes."""
+    affixes = tuple(affixes)
+    prefix = action in PREFIX_ACTIONS
+    if action in SINGLE_SUFFIX_ACTIONS:
+        params: Dict[str, object] = {"suffix": affixes[0]}
+    elif action in SORTED_AFFIX_ACTIONS:
+        params = {"prefixes" if prefix else "suffixes": longest_first(affixes), "presorted": True}
+    else:
+        params = {"suffixes": affixes}
+    if action in REPLACE_ACTIONS:
+        params["term_to_replace_suffix"] = replacement
+    return AffixRule(name, affixes, action, params, prefix)
+
+
+# === Step 1 - Standard suffix removal ===
+STEP_1_RULES = (
+    make_rule("general", affix.general_suffixes, "standard_suffix_removal"),
+    make_rule("lojia", affix.lojias_suffixes, "simple_replace_suffixes", "loj"),
+    make_rule("usaun", affix.usoens_suffixes, "simple_replace_suffixes", "u"),
+    make_rule("ensia", affix.ensias_suffixes, "simple_replace_suffixes", "ente"),
+    make_rule("amente", (affix.amente_suffix,), "process_amente_suffix"),
+    make_rule("mente", (affix.mente_suffix,), "process_mente_suffix"),
+    make_rule("idade", affix.idades_suffixes, "process_idades_suffixes"),
+    make_rule("ivu", affix.ivos_suffixes, "process_ivos_suffixes"),
+)
+
+# === Step 2 - Verb suffixes removal ===
+STEP_2_RULES = (
+    make_rule("verb", affix.verb_based_suffixes, "verb_suffix_removal"),
+)
+
+# === Tetun native ===
+TETUN_SUFFIX_RULE = make_rule("tetun_suffix", affix.tetun_suffixes, "tetun_suffix_removal")
+TETUN_PREFIX_RULE = make_rule("tetun_prefix", affix.tetun_prefixes, "tetun_prefix_removal")
+
+# === Step 3 (step 4 in Snowball) - Residual suffix removal ===
+RESIDUAL_RULE = make_rule("residual", affix.residual_suffixes, "residual_suffixes_removal")
+
+LIGHT_RULES = STEP_1_RULES + STEP_2_RULES + (RESIDUAL_RULE,)
+MODERATE_RULES = STEP_1_RULES + STEP_2_RULES + (TETUN_SUFFIX_RULE, RESIDUAL_RULE)
+HEAVY_RULES = STEP_1_RULES + STEP_2_RULES + (TETUN_SUFFIX_RULE, TETUN_PREFIX_RULE, RESIDUAL_RULE)
+MODE_RULES = {"light": LIGHT_RULES, "moderate": MODERATE_RULES, "heavy": HEAVY_RULES}
+
+
+class CompiledRuleSet:
+    """
+    An ordered list of affix rules compiled into a lookup table keyed by the word's last
+    character. Each entry holds, in pipeline order, only the rules (and suffixes) that can
+    match a word with that ending, so a word is tested against a handful of candidates
+    instead of every rule of the pipeline.
+    """
+
+    def __init__(self, rules: Sequence[AffixRule]) -> None:
+        self.rules = tuple(rules)
+        self.uses_regions = tuple(rule.action in REGION_METHODS for rule in self.rules)
+        endings = {suffix[-1] for rule in self.rules if not rule.prefix for suffix in rule.affixes}
+        self.prefix_candidates = tuple(
+            (index, rule.affixes, True) for index, rule in enumerate(self.rules) if rule.prefix
+        )
+        self.candidates: Dict[str, Tuple[Tuple[int, Tuple[str, ...], bool], ...]] = {}
+        for ending in endings:
+            candidates = []
+            for index, rule in enumerate(self.rules):
+                if rule.prefix:
+                    candidates.append((index, rule.affixes, True))
+                    continue
+                suffixes = tuple(suffix for suffix in rule.affixes if suffix[-1] == ending)
+                if suffixes:
+                    candidates.append((index, suffixes, False))
+            self.candidates[ending] = tuple(candidates)
+
+    def dispatch(self, word: str) -> int:
+        """Return the index of the first rule matching the word, or NO_MATCH."""
+        for index, affixes, prefix in self.candidates.get(word[-1:], self.prefix_candidates):
+            if word.startswith(affixes) if prefix else word.endswith(affixes):
+                return index
+
+        return NO_MATCH
+
+    def bind(self, core: object) -> List[Callable[[str], str]]:
+        """Bind every rule action to the given stemmer core, in rule order."""
+        return [partial(getattr(core, rule.action), **rule.params) for rule in self.rules]
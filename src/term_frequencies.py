@@ -0,0 +1,75 @@
+from array import array
+from collections import Counter
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+    from src.stemmer import LabadainStemmer
+
+#!/usr/bin/env python3
+#
+# src.term_frequencies.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+
+class TermFrequencies:
+    """
+    Per-document stem counts, computed straight from the token stream (no joined string to split
+    again), with the document lengths and the document frequency of every stem accumulated over
+    the collection as the documents go by.
+    """
+
+    def __init__(self, stemmer: Optional["LabadainStemmer"] = None) -> None:
+        # The stemmer is only needed to add raw documents; count_stems takes stems
+        self.stemmer = stemmer
+        self.doc_lengths = array("I")
+        self.document_frequencies: Dict[str, int] = {}
+        self.vocabulary: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def count_stems(self, stems: Iterable[str]) -> Counter:
+        """Count the stems of a document and add it to the collection statistics."""
+        counts = Counter(stems)
+        self.doc_lengths.append(sum(counts.values()))
+        document_frequencies = self.document_frequencies
+        for stem in counts:
+            document_frequencies[stem] = document_frequencies.get(stem, 0) + 1
+        return counts
+
+    def add_document(self, text: str) -> Counter:
+        """Preprocess, tokenize and stem a raw document, returning its stem counts."""
+        if self.stemmer is None:
+            raise ValueError("A stemmer is required to add raw documents.")
+        return self.count_stems(self.stemmer.stem_document_tokens(text))
+
+    def add_document_ids(self, text: str) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Same as add_document, returning the (stem id, count) arrays of the document, with ids
+        interned in the vocabulary in order of first occurrence.
+        """
+        import numpy as np
+
+        counts = self.add_document(text)
+        vocabulary = self.vocabulary
+        stem_ids = np.fromiter(
+            (vocabulary.setdefault(stem, len(vocabulary)) for stem in counts), dtype=np.uint32, count=len(counts)
+        )
+        return stem_ids, np.fromiter(counts.values(), dtype=np.uint32, count=len(counts))
+
+    def iter_documents(self, documents: Iterable[str]) -> Iterator[Counter]:
+        """Yield the stem counts of every raw document."""
+        for document in documents:
+            yield self.add_document(document)
+
+    def collection_stats(self) -> Dict[str, object]:
+        """Return the number of documents and tokens, the average document length and the document frequencies."""
+        num_tokens = sum(self.doc_lengths)
+        return {
+            "num_documents": len(self.doc_lengths),
+            "num_tokens": num_tokens,
+            "average_length": num_tokens / len(self.doc_lengths) if self.doc_lengths else 0.0,
+            "document_frequencies": self.document_frequencies,
+        }
@@ -0,0 +1,66 @@
+import os
+import sys
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Iterable, Iterator, List, Optional
+from src.parallel_stemmer import iter_chunks
+
+#!/usr/bin/env python3
+#
+# src.threaded_stemmer.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+
+def gil_enabled() -> bool:
+    """Whether the interpreter runs with the GIL (always, before the free-threaded 3.13 builds)."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return True if is_gil_enabled is None else is_gil_enabled()
+
+
+def iter_stem_threaded(
+    lines: Iterable[str],
+    stem_line: Callable[[str], object],
+    threads: Optional[int] = None,
+    chunk_size: int = 256,
+    max_pending: Optional[int] = None,
+    force: bool = False
+) -> Iterator[object]:
+    """
+    Stem the input lines in a pool of threads sharing one stemmer (e.g. stem_line=stemmer.stem_document),
+    yielding the results in the original order, with at most max_pending chunks (default: two per
+    thread) in flight. Stemming is pure Python, so threads only run in parallel on free-threaded
+    builds; with the GIL, the lines are stemmed in the calling thread instead (unless force is set),
+    which is as fast and avoids the pool overhead.
+    """
+    if chunk_size < 1:
+        raise ValueError("The chunk size must be a positive integer.")
+    threads = threads or os.cpu_count() or 1
+    if threads == 1 or (gil_enabled() and not force):
+        for line in lines:
+            yield stem_line(line)
+        return
+
+    def stem_chunk(chunk: List[str]) -> List[object]:
+        return [stem_line(line) for line in chunk]
+
+    max_pending = max_pending or 2 * threads
+    with ThreadPoolExecutor(threads) as pool:
+        pending: Deque[Future] = deque()
+        for chunk in iter_chunks(lines, chunk_size):
+            pending.append(pool.submit(stem_chunk, chunk))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def stem_threaded(
+    documents: Iterable[str],
+    stem_line: Callable[[str], object],
+    threads: Optional[int] = None,
+    chunk_size: int = 256,
+    force: bool = False
+) -> List[object]:
+    """Stem a batch of documents in a pool of threads (see iter_stem_threaded), returning the results in order."""
+    return list(iter_stem_threaded(documents, stem_line, threads, chunk_size, force=force))
@@ -0,0 +1,342 @@
+import argparse
+import json
+import os
+import numpy as np
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from src.stemmer import STEMMER_MODES, LabadainStemmer
+from src.corpus_statistics import hash_items
+from src.output_writers import read_vocabulary, write_vocabulary
+from src.parallel_stemmer import iter_chunks
+from src.stem_cache import StemCache
+
+#!/usr/bin/env python3
+#
+# src.vectorizer.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+# Document-term matrix directory layout (CSR, loadable with scipy.sparse.csr_matrix((data, indices, indptr), shape)):
+#   meta.json            mode, number of documents, features and non-zeros, dtypes, hashing or vocabulary
+#   indptr.bin           start of each document's row (number of documents + 1, little-endian uint64)
+#   indices.bin          column (feature) of every non-zero, rows sorted by column (little-endian uint32)
+#   data.bin             stem count of every non-zero (little-endian uint32)
+#   vocabulary.txt       with a frozen vocabulary, the stem of every column, each ending with a newline
+#                        (see output_writers.write_vocabulary, so the empty stem is an empty line)
+INDPTR_DTYPE = "<u8"
+INDEX_DTYPE = "<u4"
+DATA_DTYPE = "<u4"
+DEFAULT_NUM_FEATURES = 1 << 20
+
+# A CSR block of consecutive documents: indptr (starting at 0), indices and data
+CsrChunk = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+class StemVectorizer:
+    """
+    Turn raw documents into rows of a sparse document-term matrix of stem counts, in CSR form.
+    Columns are either hashed stems (feature hashing, num_features columns, no vocabulary kept)
+    or the positions of the stems in a frozen vocabulary (stems outside it are dropped). The
+    stems of a chunk of documents are counted as they come out of the pipeline, without
+    building the stemmed text, and every distinct stem of the chunk is hashed once.
+    """
+
+    def __init__(
+        self,
+        stemmer: Optional[LabadainStemmer] = None,
+        num_features: int = DEFAULT_NUM_FEATURES,
+        vocabulary: Optional[Sequence[str]] = None
+    ) -> None:
+        self.stemmer = stemmer or LabadainStemmer()
+        if vocabulary is not None:
+            self.vocabulary: Optional[Dict[str, int]] = {stem: column for column, stem in enumerate(vocabulary)}
+            if len(self.vocabulary) != len(vocabulary):
+                raise ValueError("The vocabulary has duplicate stems.")
+            num_features = len(self.vocabulary)
+        else:
+            self.vocabulary = None
+            if not 1 <= num_features <= 1 << 32:
+                raise ValueError("The number of features must be between 1 and 2**32.")
+        self.num_features = num_features
+
+    def columns(self, stems: Iterable[str]) -> Dict[str, int]:
+        """Return the column of every stem (the frozen vocabulary, or the hashed stems)."""
+        if self.vocabulary is not None:
+            return self.vocabulary
+        stems = list(stems)
+        hashes = np.array(hash_items(stems), dtype=np.uint64) % np.uint64(self.num_features)
+        return dict(zip(stems, hashes.tolist()))
+
+    def transform_chunk(self, documents: Iterable[str]) -> CsrChunk:
+        """Preprocess, tokenize and stem a chunk of raw documents, returning its CSR block."""
+        stem_document_tokens = self.stemmer.stem_document_tokens
+        rows = [Counter(stem_document_tokens(document)) for document in documents]
+        column_of = self.columns(set().union(*rows))
+
+        indptr = np.zeros(len(rows) + 1, dtype=np.uint64)
+        indices: List[int] = []
+        data: List[int] = []
+        for number, counts in enumerate(rows, 1):
+            row: Dict[int, int] = {}
+            for stem, count in counts.items():
+                column = column_of.get(stem)
+                if column is not None:
+                    # Hashed stems may collide
+                    row[column] = row.get(column, 0) + count
+            columns = sorted(row)
+            indices.extend(columns)
+            data.extend(map(row.__getitem__, columns))
+            indptr[number] = len(indices)
+        return indptr, np.array(indices, dtype=np.uint32), np.array(data, dtype=np.uint32)
+
+    def iter_transform(self, documents: Iterable[str], chunk_size: int = 10000) -> Iterator[CsrChunk]:
+        """Yield the CSR blocks of chunks of at most chunk_size documents."""
+        for chunk in iter_chunks(documents, chunk_size):
+            yield self.transform_chunk(chunk)
+
+    def transform(self, documents: Iterable[str], chunk_size: int = 10000) -> CsrChunk:
+        """Return the (indptr, indices, data) arrays of the whole collection."""
+        return concatenate_chunks(self.iter_transform(documents, chunk_size))
+
+
+def concatenate_chunks(chunks: Iterable[CsrChunk]) -> CsrChunk:
+    """Join consecutive CSR blocks into the (indptr, indices, data) arrays of one matrix."""
+    indptrs, indices, data = [np.zeros(1, dtype=np.uint64)], [], []
+    num_non_zeros = 0
+    for chunk_indptr, chunk_indices, chunk_data in chunks:
+        indptrs.append(chunk_indptr[1:] + np.uint64(num_non_zeros))
+        indices.append(chunk_indices)
+        data.append(chunk_data)
+        num_non_zeros += len(chunk_indices)
+    return (
+        np.concatenate(indptrs),
+        np.concatenate(indices) if indices else np.empty(0, dtype=np.uint32),
+        np.concatenate(data) if data else np.empty(0, dtype=np.uint32),
+    )
+
+
+# The vectorizer of the current worker process, built once by init_worker.
+worker_vectorizer = None
+
+
+def init_worker(
+    mode: str,
+    num_features: int,
+    vocabulary_path: Optional[str],
+    cache_size: int,
+    lexicon_path: Optional[str],
+    rules_path: Optional[str]
+) -> None:
+    """Build the stemmer and the vectorizer (and load the vocabulary) once per worker process."""
+    from src.rule_sets import load_rule_sets
+    from src.stem_lexicon import StemLexicon
+
+    global worker_vectorizer
+    stemmer = LabadainStemmer(
+        mode=mode,
+        cache=StemCache(cache_size) if cache_size > 0 else None,
+        lexicon=StemLexicon(Path(lexicon_path)) if lexicon_path else None,
+        rule_sets=load_rule_sets(Path(rules_path)) if rules_path else None
+    )
+    vocabulary = read_vocabulary(Path(vocabulary_path)) if vocabulary_path else None
+    worker_vectorizer = StemVectorizer(stemmer, num_features, vocabulary)
+
+
+def transform_chunk(documents: List[str]) -> CsrChunk:
+    """Vectorize a chunk of documents in the worker process."""
+    return worker_vectorizer.transform_chunk(documents)
+
+
+def vectorize_parallel(
+    documents: Iterable[str],
+    mode: str = "light",
+    num_features: int = DEFAULT_NUM_FEATURES,
+    vocabulary_path: Optional[str] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = 10000,
+    max_pending: Optional[int] = None,
+    cache_size: int = 0,
+    lexicon_path: Optional[str] = None,
+    rules_path: Optional[str] = None
+) -> Iterator[CsrChunk]:
+    """
+    Vectorize chunks of documents in a pool of worker processes, yielding the CSR block of every
+    chunk in the original order. At most max_pending chunks (default: two per worker) are in
+    flight, so memory is bounded by the chunk size. With a single worker, the chunks are
+    vectorized in the current process.
+    """
+    if chunk_size < 1:
+        raise ValueError("The chunk size must be a positive integer.")
+    workers = workers or os.cpu_count() or 1
+    initargs = (mode, num_features, vocabulary_path, cache_size, lexicon_path, rules_path)
+    if workers == 1:
+        init_worker(*initargs)
+        for chunk in iter_chunks(documents, chunk_size):
+            yield transform_chunk(chunk)
+        return
+
+    max_pending = max_pending or 2 * workers
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=initargs) as pool:
+        pending: Deque[Future] = deque()
+        for chunk in iter_chunks(documents, chunk_size):
+            pending.append(pool.submit(transform_chunk, chunk))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+class CsrWriter:
+    """
+    Append CSR blocks to a matrix directory (see the layout above) as they are produced, so the
+    matrix never has to fit in memory. The metadata is written on close().
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        num_features: int,
+        mode: str,
+        vocabulary: Optional[Sequence[str]] = None
+    ) -> None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self.output_dir = output_dir
+        self.num_features = num_features
+        self.mode = mode
+        self.vocabulary = vocabulary
+        self.num_documents = 0
+        self.num_non_zeros = 0
+        self.indptr_file = (output_dir / "indptr.bin").open("wb")
+        self.indices_file = (output_dir / "indices.bin").open("wb")
+        self.data_file = (output_dir / "data.bin").open("wb")
+        np.zeros(1, dtype=INDPTR_DTYPE).tofile(self.indptr_file)
+
+    def __enter__(self) -> "CsrWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write(self, chunk: CsrChunk) -> None:
+        """Append the rows of a CSR block."""
+        indptr, indices, data = chunk
+        (indptr[1:] + np.uint64(self.num_non_zeros)).astype(INDPTR_DTYPE).tofile(self.indptr_file)
+        indices.astype(INDEX_DTYPE).tofile(self.indices_file)
+        data.astype(DATA_DTYPE).tofile(self.data_file)
+        self.num_documents += len(indptr) - 1
+        self.num_non_zeros += len(indices)
+
+    def close(self) -> None:
+        if self.indptr_file.closed:
+            return
+        for f_output in (self.indptr_file, self.indices_file, self.data_file):
+            f_output.close()
+        if self.vocabulary is not None:
+            write_vocabulary(self.output_dir / "vocabulary.txt", self.vocabulary)
+        with (self.output_dir / "meta.json").open("w", encoding="utf-8") as f_meta:
+            json.dump({
+                "mode": self.mode,
+                "num_documents": self.num_documents,
+                "num_features": self.num_features,
+                "num_non_zeros": self.num_non_zeros,
+                "features": "hashing" if self.vocabulary is None else "vocabulary",
+                "indptr_dtype": INDPTR_DTYPE,
+                "index_dtype": INDEX_DTYPE,
+                "data_dtype": DATA_DTYPE,
+            }, f_meta, indent=2)
+
+
+def read_csr(input_dir: Path) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Tuple[int, int]]:
+    """
+    Load a matrix directory written by CsrWriter: the memory-mapped indptr, indices and data
+    arrays and the shape of the matrix.
+    """
+    with (input_dir / "meta.json").open(encoding="utf-8") as f_meta:
+        meta = json.load(f_meta)
+
+    def load(name: str, dtype: str) -> np.ndarray:
+        # An empty file cannot be memory-mapped
+        if not (input_dir / name).stat().st_size:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(input_dir / name, dtype=dtype, mode="r")
+
+    shape = (meta["num_documents"], meta["num_features"])
+    return load("indptr.bin", meta["indptr_dtype"]), load("indices.bin", meta["index_dtype"]), \
+        load("data.bin", meta["data_dtype"]), shape
+
+
+if __name__ == "__main__":
+    from config.utils import Utils
+
+    parser = argparse.ArgumentParser(description="Build a sparse document-term matrix (CSR) of stem counts")
+    parser.add_argument(
+        "-if",
+        "--input_file",
+        type=str,
+        required=True,
+        help="Path to input text file ('-' for stdin, one document per line), possibly compressed, "
+             "a directory or a glob pattern"
+    )
+    parser.add_argument("-od", "--output_dir", type=str, required=True, help="Directory of the matrix")
+    parser.add_argument(
+        "-m",
+        "--mode",
+        choices=STEMMER_MODES,
+        default="light",
+        help="Choose stemming mode (default: light)"
+    )
+    features_group = parser.add_mutually_exclusive_group()
+    features_group.add_argument(
+        "-nf",
+        "--num_features",
+        type=int,
+        default=DEFAULT_NUM_FEATURES,
+        help=f"Number of hashed features (default: {DEFAULT_NUM_FEATURES})"
+    )
+    features_group.add_argument(
+        "-vf",
+        "--vocabulary_file",
+        type=str,
+        default=None,
+        help="Frozen stem vocabulary, one stem per line (e.g. the vocabulary.txt of -fmt stem_ids), "
+             "instead of feature hashing"
+    )
+    parser.add_argument("-cs", "--cache_size", type=int, default=100000, help="Cache up to N stemmed words (default: 100000)")
+    parser.add_argument("-lx", "--lexicon", type=str, default=None, help="Path to a precomputed stem lexicon")
+    parser.add_argument("-r", "--rules", type=str, default=None, help="Path to a rule set file")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Vectorize chunks in N worker processes (default: 1)")
+    parser.add_argument(
+        "--chunk_size",
+        type=int,
+        default=10000,
+        help="Number of documents per chunk (default: 10000)"
+    )
+    args = parser.parse_args()
+
+    utils = Utils()
+    vocabulary = read_vocabulary(Path(args.vocabulary_file)) if args.vocabulary_file else None
+    num_features = args.num_features if vocabulary is None else len(vocabulary)
+    if args.rules:
+        # Validate the rule sets before starting the workers
+        from src.rule_sets import load_rule_sets
+        load_rule_sets(Path(args.rules))
+    chunks = vectorize_parallel(
+        utils.iter_corpora(utils.expand_corpus_paths(args.input_file)),
+        mode=args.mode,
+        num_features=num_features,
+        vocabulary_path=args.vocabulary_file,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        cache_size=args.cache_size,
+        lexicon_path=args.lexicon,
+        rules_path=args.rules
+    )
+    with CsrWriter(Path(args.output_dir), num_features, args.mode, vocabulary) as writer:
+        for chunk in chunks:
+            writer.write(chunk)
+    print(
+        f"Wrote a {writer.num_documents} x {writer.num_features} matrix "
+        f"({writer.num_non_zeros} non-zeros) to {args.output_dir}"
+    )
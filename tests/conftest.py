@@ -0,0 +1,64 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+import pytest
+from benchmarks.corpus_generator import generate_corpus
+
+#!/usr/bin/env python3
+#
+# tests.conftest.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = Path(__file__).resolve().parent / "data"
+
+# Lines exercising the preprocessing: capitals, apostrophe and hyphen variants, decomposed accents, numbers
+UNICODE_LINES = [
+    "Komemorasaun loron independénsia Timor-Leste nian iha 28 Novembru 2024.",
+    "Ne'e mak ida-ne’ebé PROFESÓR sira hanorin iha universidade nasionál.",
+    "Edukasaun nasionál no administrasaun públika, 1.000,50 dolar.",
+    "Ne\u2018e ida\u2011ne\u02bceb\u00e9 nasiona\u0301l, \u212aomunikasaun KAPASIDADE!",
+    "",
+]
+
+
+def load_golden_stems() -> List[List[str]]:
+    """Rows of (word, light, moderate, heavy) stemmed by the original pipelines."""
+    with (DATA_DIR / "golden_stems.tsv").open(encoding="utf-8") as f_golden:
+        next(f_golden)
+        return [line.rstrip("\n").split("\t") for line in f_golden]
+
+
+def load_golden_documents() -> List[Dict[str, str]]:
+    """Documents with their stemmed text in every mode, as the original command line produced them."""
+    with (DATA_DIR / "golden_documents.jsonl").open(encoding="utf-8") as f_golden:
+        return [json.loads(line) for line in f_golden]
+
+
+def run_cli(*args: str) -> str:
+    """Run labadain_stemmer.py and return its standard output."""
+    result = subprocess.run(
+        [sys.executable, "labadain_stemmer.py", *args],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        check=True,
+        encoding="utf-8"
+    )
+    return result.stdout
+
+
+@pytest.fixture(scope="session")
+def corpus_lines() -> List[str]:
+    """A small synthetic corpus, followed by the Unicode lines."""
+    return list(generate_corpus(300, 12, seed=5)) + UNICODE_LINES
+
+
+@pytest.fixture
+def corpus_file(tmp_path: Path, corpus_lines: List[str]) -> Path:
+    """The corpus lines written to a text file."""
+    file_path = tmp_path / "corpus.txt"
+    file_path.write_text("\n".join(corpus_lines) + "\n", encoding="utf-8")
+    return file_path
@@ -0,0 +1,43 @@
+import pytest
+from src.batch_stemmer import BatchStemmer, factorize
+from src.stemmer import STEMMER_MODES, LabadainStemmer
+from tests.conftest import load_golden_documents
+
+#!/usr/bin/env python3
+#
+# tests.test_batch_stemmer.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+
+def test_factorize():
+    types, codes = factorize(["ba", "nasionál", "ba", "iha", "nasionál"])
+    assert types == ["ba", "nasionál", "iha"]
+    assert codes.tolist() == [0, 1, 0, 2, 1]
+    types, codes = factorize([])
+    assert types == [] and codes.tolist() == []
+
+
+@pytest.mark.parametrize("mode", STEMMER_MODES)
+def test_stems_match_the_stemmer(mode, corpus_lines):
+    stemmer = LabadainStemmer(mode=mode)
+    batch_stemmer = BatchStemmer(mode)
+    tokens = [token for line in corpus_lines for token in stemmer.fused_tokenizer.tokenize(line)]
+    assert batch_stemmer.stem_tokens(tokens) == stemmer.stem_tokens(tokens)
+    assert batch_stemmer.stem_tokens([]) == []
+
+    stem_vocabulary, stem_ids = batch_stemmer.stem_token_ids(tokens)
+    assert len(stem_vocabulary) == len(set(stem_vocabulary))
+    assert [stem_vocabulary[stem_id] for stem_id in stem_ids] == stemmer.stem_tokens(tokens)
+
+
+@pytest.mark.parametrize("mode", STEMMER_MODES)
+def test_stem_documents(mode):
+    documents = load_golden_documents()
+    texts = [document["text"].lower().replace("'", "’") for document in documents]
+    assert BatchStemmer(mode).stem_documents(texts) == [document[mode] for document in documents]
+
+
+def test_shared_stemmer():
+    stemmer = LabadainStemmer(mode="heavy")
+    assert BatchStemmer(stemmer=stemmer).stem_tokens(["hamoris", "hamoris", "ba"]) == ["moris", "moris", "ba"]
@@ -0,0 +1,104 @@
+import subprocess
+import sys
+from collections import Counter, defaultdict
+from typing import Dict, List
+import pytest
+from src.conflation_map import ConflationMap
+from src.stemmer import STEMMER_MODES, LabadainStemmer
+from tests.conftest import REPO_ROOT
+
+#!/usr/bin/env python3
+#
+# tests.test_conflation_map.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+
+def reference_stems(documents: List[str], mode: str) -> Dict[str, Dict[str, int]]:
+    """Stem to variants map of the documents, stemming every token."""
+    stemmer = LabadainStemmer(mode=mode)
+    stems: Dict[str, Counter] = defaultdict(Counter)
+    for document in documents:
+        for word in stemmer.fused_tokenizer.tokenize(document):
+            stems[stemmer.stem_word(word)][word] += 1
+    return {stem: dict(variants) for stem, variants in stems.items()}
+
+
+@pytest.mark.parametrize("mode", STEMMER_MODES)
+def test_map_matches_the_reference(mode, corpus_lines):
+    conflation_map = ConflationMap(mode)
+    conflation_map.add_documents(corpus_lines, batch_size=7)
+    assert conflation_map.stems == reference_stems(corpus_lines, mode)
+
+
+def test_incremental_updates_and_merge(corpus_lines):
+    whole = ConflationMap("heavy")
+    whole.add_documents(corpus_lines)
+    incremental = ConflationMap("heavy")
+    incremental.add_documents(corpus_lines[:100])
+    incremental.variants(next(iter(incremental.stems)))
+    incremental.add_documents(corpus_lines[100:])
+    assert incremental.stems == whole.stems
+
+    first, second = ConflationMap("heavy"), ConflationMap("heavy")
+    first.add_documents(corpus_lines[::2])
+    second.add_documents(corpus_lines[1::2])
+    first.merge(second)
+    assert first.stems == whole.stems
+    with pytest.raises(ValueError, match="Cannot merge"):
+        first.merge(ConflationMap("light"))
+
+
+def test_lookups():
+    conflation_map = ConflationMap("heavy")
+    conflation_map.add_words(["komemorasaun"] * 3 + ["komemora", "Komemorasaun", "ivamente"])
+    stem = conflation_map.stemmer.stem_word("komemorasaun")
+    assert stem in conflation_map and "" in conflation_map
+    assert conflation_map.frequencies(stem)["komemorasaun"] == 3
+    assert conflation_map.variants(stem)[0] == "komemorasaun"
+    assert conflation_map.expand("komemorasaun") == conflation_map.variants(stem)
+    assert conflation_map.variants("") == ["ivamente"]
+    assert conflation_map.expand("uma") == ["uma"]
+    assert conflation_map.variants("uma") == [] and "uma" not in conflation_map.ranked_variants
+    assert conflation_map.expand_query("Komemorasaun uma") == {
+        "komemorasaun": conflation_map.variants(stem),
+        "uma": ["uma"],
+    }
+
+
+def test_save_and_load(corpus_lines, tmp_path):
+    conflation_map = ConflationMap("moderate")
+    conflation_map.add_documents(corpus_lines)
+    conflation_map.save(tmp_path / "map.json")
+    loaded = ConflationMap.load(tmp_path / "map.json")
+    assert loaded.mode == "moderate" and loaded.stems == conflation_map.stems
+
+    (tmp_path / "other.json").write_text('{"format": "other"}', encoding="utf-8")
+    with pytest.raises(ValueError, match="Not a conflation map"):
+        ConflationMap.load(tmp_path / "other.json")
+    with pytest.raises(ValueError, match="Invalid mode"):
+        ConflationMap("all")
+
+
+def test_cli(corpus_file, corpus_lines, tmp_path):
+    def run(*args: str) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [sys.executable, "-m", "src.conflation_map", *args],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            encoding="utf-8"
+        )
+
+    map_path = tmp_path / "map.json"
+    first_half, second_half = tmp_path / "first.txt", tmp_path / "second.txt"
+    first_half.write_text("\n".join(corpus_lines[:100]) + "\n", encoding="utf-8")
+    second_half.write_text("\n".join(corpus_lines[100:]) + "\n", encoding="utf-8")
+    assert run("build", "-if", str(first_half), "-om", str(map_path), "-m", "heavy").returncode == 0
+    assert run("build", "-if", str(second_half), "-om", str(map_path), "-m", "heavy", "-u").returncode == 0
+    assert ConflationMap.load(map_path).stems == reference_stems(corpus_lines, "heavy")
+    result = run("build", "-if", str(corpus_file), "-om", str(map_path), "-m", "light", "-u")
+    assert result.returncode == 2 and "heavy mode" in result.stderr
+
+    result = run("variants", "-im", str(map_path), "-q", "Komemorasaun")
+    variants = ConflationMap.load(map_path).expand("komemorasaun")
+    assert result.stdout == f"komemorasaun\t{' '.join(variants)}\n"
@@ -0,0 +1,179 @@
+import json
+import subprocess
+import sys
+from collections import Counter
+import numpy as np
+import pytest
+from src.corpus_statistics import (
+    CorpusStatistics,
+    CountMinSketch,
+    HeavyHitters,
+    HyperLogLog,
+    hash_items,
+    sketch_parameters,
+)
+from src.stemmer import STEMMER_MODES, LabadainStemmer
+from tests.conftest import REPO_ROOT
+
+#!/usr/bin/env python3
+#
+# tests.test_corpus_statistics.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+WORDS = [f"word{number}" for number in range(20000)]
+
+
+def test_hash_items():
+    hashes = hash_items(["eduk", "", "eduk", "nasionál"])
+    assert hashes[0] == hashes[2] and len(set(hashes)) == 3
+    assert all(0 <= value < 1 << 64 for value in hashes)
+    assert hash_items([]) == []
+
+
+def test_count_min_never_undercounts():
+    counts = Counter({word: 1 + number % 7 for number, word in enumerate(WORDS[:5000])})
+    sketch = CountMinSketch(1024, 4)
+    hashes = hash_items(list(counts))
+    sketch.add(hashes, list(counts.values()))
+    estimates = sketch.estimate(hashes)
+    assert np.all(estimates >= np.array(list(counts.values()), dtype=np.uint64))
+    assert sketch.estimate([]).tolist() == []
+
+    first, second = CountMinSketch(1024, 4), CountMinSketch(1024, 4)
+    first.add(hashes[:2500], list(counts.values())[:2500])
+    second.add(hashes[2500:], list(counts.values())[2500:])
+    first.merge(second)
+    assert np.array_equal(first.table, sketch.table)
+    with pytest.raises(ValueError, match="different shapes"):
+        first.merge(CountMinSketch(512, 4))
+    with pytest.raises(ValueError, match="power of two"):
+        CountMinSketch(1000, 4)
+    with pytest.raises(ValueError, match="depth"):
+        CountMinSketch(1024, 0)
+
+
+@pytest.mark.parametrize("num_items", [0, 10, 1000, 20000])
+def test_hyperloglog_estimate(num_items):
+    hll = HyperLogLog(12)
+    hll.add(hash_items(WORDS[:num_items] * 2))
+    # Relative standard error 1.04 / 64 ~ 1.6%; allow five of them
+    assert abs(hll.estimate() - num_items) <= 0.08 * num_items
+
+
+def test_hyperloglog_merge():
+    whole, first, second = HyperLogLog(10), HyperLogLog(10), HyperLogLog(10)
+    whole.add(hash_items(WORDS[:3000]))
+    first.add(hash_items(WORDS[:2000]))
+    second.add(hash_items(WORDS[1000:3000]))
+    first.merge(second)
+    assert np.array_equal(first.registers, whole.registers)
+    with pytest.raises(ValueError, match="different precisions"):
+        first.merge(HyperLogLog(12))
+    with pytest.raises(ValueError, match="between 4 and 18"):
+        HyperLogLog(3)
+
+
+def test_heavy_hitters_keep_the_frequent_items():
+    counts = Counter({word: 1 for word in WORDS[:1000]})
+    counts.update({"eduk": 400, "nasionál": 200})
+    total = sum(counts.values())
+    heavy_hitters = HeavyHitters(10)
+    items = list(counts.items())
+    for start in range(0, len(items), 100):
+        heavy_hitters.update(dict(items[start:start + 100]))
+    assert len(heavy_hitters) <= 10
+    for item in ("eduk", "nasionál"):
+        assert item in heavy_hitters
+        assert counts[item] - total / 11 <= heavy_hitters.counters[item] <= counts[item]
+
+    other = HeavyHitters(10)
+    other.update({"eduk": 50, "uma": 3})
+    heavy_hitters.merge(other)
+    assert "eduk" in heavy_hitters and len(heavy_hitters) <= 10
+    with pytest.raises(ValueError, match="different capacities"):
+        heavy_hitters.merge(HeavyHitters(5))
+    with pytest.raises(ValueError, match="positive integer"):
+        HeavyHitters(0)
+
+
+def collect(documents, batch_size: int = 10000) -> CorpusStatistics:
+    statistics = CorpusStatistics(width=1 << 12, precision=12, capacity=5000)
+    statistics.add_documents(documents, batch_size)
+    return statistics
+
+
+def test_statistics_match_the_exact_counts(corpus_lines):
+    stemmer = LabadainStemmer()
+    tokens = [word for line in corpus_lines for word in stemmer.fused_tokenizer.tokenize(line)]
+    report = collect(corpus_lines, batch_size=50).report(top_k=5)
+    assert report["num_documents"] == len(corpus_lines) and report["num_tokens"] == len(tokens)
+    num_words = len(set(tokens))
+    assert abs(report["distinct_words"] - num_words) <= 0.05 * num_words
+
+    for index, mode in enumerate(STEMMER_MODES):
+        stems = [stemmer.stem_word_all(word)[index] for word in tokens]
+        stem_counts = Counter(stems)
+        mode_report = report["modes"][mode]
+        assert mode_report["changed_tokens"] == sum(stem != word for stem, word in zip(stems, tokens))
+        assert abs(mode_report["distinct_stems"] - len(stem_counts)) <= 0.05 * len(stem_counts)
+        # Nothing is evicted with this capacity, so the top stems are the most frequent ones
+        top_counts = [count for _, count in stem_counts.most_common(5)]
+        assert sorted((stem_counts[top_stem["stem"]] for top_stem in mode_report["top_stems"]), reverse=True) == top_counts
+        for top_stem in mode_report["top_stems"]:
+            assert top_stem["count"] >= stem_counts[top_stem["stem"]]
+            variants = len({word for word, stem in zip(tokens, stems) if stem == top_stem["stem"]})
+            assert top_stem["variants"] == pytest.approx(variants, abs=1)
+
+
+def test_merged_shards_match_the_whole_corpus(corpus_lines):
+    whole = collect(corpus_lines)
+    merged = collect(corpus_lines[::2])
+    merged.merge(collect(corpus_lines[1::2]))
+    assert merged.report() == whole.report()
+    with pytest.raises(ValueError, match="different sketch parameters"):
+        merged.merge(CorpusStatistics(width=1 << 10))
+
+
+def test_save_and_load(corpus_lines, tmp_path):
+    statistics = collect(corpus_lines)
+    statistics.save(tmp_path / "statistics.npz")
+    loaded = CorpusStatistics.load(tmp_path / "statistics.npz")
+    assert loaded.report() == statistics.report()
+    loaded.add_documents(corpus_lines)
+    statistics.merge(collect(corpus_lines))
+    assert loaded.report() == statistics.report()
+
+    np.savez(tmp_path / "other.npz", values=np.zeros(3))
+    with pytest.raises(ValueError, match="Not a corpus statistics file"):
+        CorpusStatistics.load(tmp_path / "other.npz")
+
+
+def test_sketch_parameters():
+    parameters = sketch_parameters(64 << 20)
+    assert CorpusStatistics(**parameters).memory_bytes() <= 64 << 20
+    assert parameters["width"] & (parameters["width"] - 1) == 0
+    with pytest.raises(ValueError, match="too small"):
+        sketch_parameters(1 << 10)
+
+
+def test_cli(corpus_lines, tmp_path):
+    def run(*args: str) -> str:
+        result = subprocess.run(
+            [sys.executable, "-m", "src.corpus_statistics", *args],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            check=True,
+            encoding="utf-8"
+        )
+        return result.stdout
+
+    for number, shard in enumerate((corpus_lines[::2], corpus_lines[1::2])):
+        (tmp_path / f"part-{number}.txt").write_text("\n".join(shard) + "\n", encoding="utf-8")
+        run("collect", "-if", str(tmp_path / f"part-{number}.txt"), "-of", str(tmp_path / f"part-{number}.npz"), "-mb", "1")
+    run("merge", "-i", str(tmp_path / "part-0.npz"), str(tmp_path / "part-1.npz"), "-of", str(tmp_path / "all.npz"))
+    report = json.loads(run("report", "-i", str(tmp_path / "all.npz"), "-k", "3", "--json"))
+    assert report["num_documents"] == len(corpus_lines)
+    assert set(report["modes"]) == set(STEMMER_MODES)
+    assert all(len(mode_report["top_stems"]) == 3 for mode_report in report["modes"].values())
+    assert run("report", "-i", str(tmp_path / "all.npz"), "-k", "3").startswith(f"Documents: {len(corpus_lines)}")
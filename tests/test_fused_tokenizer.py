@@ -0,0 +1,57 @@
+from tetuntokenizer.tokenizer import TetunSimpleTokenizer
+from src.fused_tokenizer import FusedTokenizer
+from src.preprocessing import TextPreprocessing
+from src.stemmer import LabadainStemmer
+from tests.conftest import UNICODE_LINES, load_golden_documents
+
+#!/usr/bin/env python3
+#
+# tests.test_fused_tokenizer.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+# Tokenizer edge cases: apostrophes, hyphens, numbers with separators, punctuation and the Kelvin sign
+EDGE_CASES = [
+    "ne'e ne’e Ne'ebé ida-ne'ebé Timor-Leste -ida ida- 'ida' ’",
+    "1.000,50 2024. 3,5% 10:30 +670 $20",
+    "Ó ÁÉÍÓÚ ñ Ñ K Komunikasaun",
+    "tab\tnewline\nreturn\r\nend...?!",
+    "   ",
+    "",
+]
+
+
+def reference_tokens(text: str):
+    return TetunSimpleTokenizer().tokenize(TextPreprocessing(text).preprocess_text())
+
+
+def test_tokens_match_preprocessing_and_tokenizer(corpus_lines):
+    tokenizer = FusedTokenizer()
+    texts = corpus_lines + EDGE_CASES + [document["text"] for document in load_golden_documents()]
+    for text in texts:
+        assert tokenizer.tokenize(text) == reference_tokens(text), text
+        assert list(tokenizer.iter_tokens(text)) == reference_tokens(text), text
+
+
+def test_tokens_match_on_a_whole_document(corpus_lines):
+    text = "\n".join(corpus_lines + EDGE_CASES)
+    assert FusedTokenizer().tokenize(text) == reference_tokens(text)
+
+
+def test_spans_point_into_the_original_text():
+    tokenizer = FusedTokenizer()
+    for text in UNICODE_LINES + EDGE_CASES:
+        spans = list(tokenizer.iter_spans(text))
+        tokens = list(tokenizer.iter_tokens_with_spans(text))
+        assert [(start, end) for _, start, end in tokens] == spans
+        for token, start, end in tokens:
+            assert text[start:end].lower().replace("'", "’") == token
+
+
+def test_stem_spans():
+    stemmer = LabadainStemmer(mode="heavy")
+    for document in load_golden_documents():
+        text = document["text"]
+        spans = list(stemmer.iter_stem_spans(text))
+        assert [stem for _, _, stem in spans] == stemmer.stem_document_tokens(text)
+        assert [(start, end) for start, end, _ in spans] == list(stemmer.fused_tokenizer.iter_spans(text))
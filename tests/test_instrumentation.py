@@ -0,0 +1,69 @@
+import subprocess
+import sys
+from src.instrumentation import NO_MATCH_NAME
+from src.stem_cache import StemCache
+from src.stemmer import LabadainStemmer
+from tests.conftest import REPO_ROOT, load_golden_documents
+
+#!/usr/bin/env python3
+#
+# tests.test_instrumentation.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+
+def test_every_stemmed_word_is_counted_once(corpus_lines):
+    stemmer = LabadainStemmer(mode="heavy")
+    tokens = [token for line in corpus_lines for token in stemmer.fused_tokenizer.tokenize(line)]
+    expected = stemmer.stem_tokens(tokens)
+    calls = []
+    statistics = stemmer.instrument(hook=lambda *call: calls.append(call))
+
+    assert stemmer.stem_tokens(tokens) == expected
+    num_stemmed = sum(len(token) > 3 for token in tokens)
+    counters = statistics.as_dict()
+    assert sum(counter["hits"] for counter in counters.values()) == num_stemmed == len(calls)
+    assert counters[NO_MATCH_NAME]["hits"] > 0 and counters["usaun"]["hits"] > 0
+    assert all(mode == "heavy" and rule in counters and seconds >= 0 for mode, rule, _, _, seconds in calls)
+    assert [stemmed_word for *_, stemmed_word, _ in calls] == [stem for token, stem in zip(tokens, expected) if len(token) > 3]
+
+    statistics.reset()
+    assert all(counter["hits"] == 0 for counter in statistics.as_dict().values())
+    stemmer.uninstrument()
+    stemmer.stem_tokens(tokens)
+    assert all(counter["hits"] == 0 for counter in statistics.as_dict().values())
+
+
+def test_report_notes_the_cache_hits():
+    cache = StemCache(100)
+    stemmer = LabadainStemmer(mode="light", cache=cache)
+    statistics = stemmer.instrument()
+    stemmer.stem_tokens(["edukasaun", "edukasaun", "edukasaun"])
+    assert sum(statistics.hits.values()) == 1
+    report = statistics.report(cache.stats()["hits"])
+    assert report.startswith("Rule statistics (light)")
+    assert report.endswith("2 words served by the stem cache skipped the rules and are not counted")
+    assert "stem cache" not in statistics.report()
+
+
+def test_cli_report(corpus_file, corpus_lines):
+    result = subprocess.run(
+        [sys.executable, "labadain_stemmer.py", "-if", str(corpus_file), "-m", "heavy", "-s", "-pr"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        check=True,
+        encoding="utf-8"
+    )
+    stemmer = LabadainStemmer(mode="heavy")
+    assert result.stdout == "".join(stemmer.stem_document(line) + "\n" for line in corpus_lines)
+    assert result.stderr.startswith("Rule statistics (heavy)")
+
+
+def test_cli_refuses_workers():
+    result = subprocess.run(
+        [sys.executable, "labadain_stemmer.py", "-it", load_golden_documents()[0]["text"], "-pr", "-w", "2"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        encoding="utf-8"
+    )
+    assert result.returncode == 2 and "--profile_rules is not available with --workers" in result.stderr
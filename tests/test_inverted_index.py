@@ -0,0 +1,124 @@
+import math
+import subprocess
+import sys
+from collections import Counter
+from typing import Dict, List
+import numpy as np
+import pytest
+from src.inverted_index import INDEX_FILES, InvertedIndex, InvertedIndexBuilder
+from src.stemmer import LabadainStemmer
+from tests.conftest import REPO_ROOT
+
+#!/usr/bin/env python3
+#
+# tests.test_inverted_index.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+
+def reference_postings(documents: List[str], mode: str) -> Dict[str, List[List[int]]]:
+    """The postings of every stem, as [doc id, term frequency] pairs, computed naively."""
+    stemmer = LabadainStemmer(mode=mode)
+    postings: Dict[str, List[List[int]]] = {}
+    for doc_id, document in enumerate(documents):
+        for stem, term_freq in Counter(stemmer.stem_document_tokens(document)).items():
+            postings.setdefault(stem, []).append([doc_id, term_freq])
+    return postings
+
+
+def reference_scores(documents: List[str], mode: str, query: str, k1: float = 1.2, b: float = 0.75) -> Dict[int, float]:
+    """The BM25 scores of the documents matching the query, computed naively."""
+    stemmer = LabadainStemmer(mode=mode)
+    stemmed_documents = [Counter(stemmer.stem_document_tokens(document)) for document in documents]
+    lengths = [sum(counts.values()) for counts in stemmed_documents]
+    average_length = sum(lengths) / len(lengths)
+    scores: Dict[int, float] = {}
+    for stem, query_freq in Counter(stemmer.stem_document_tokens(query)).items():
+        matching = [doc_id for doc_id, counts in enumerate(stemmed_documents) if stem in counts]
+        idf = math.log(1 + (len(documents) - len(matching) + 0.5) / (len(matching) + 0.5))
+        for doc_id in matching:
+            term_freq = stemmed_documents[doc_id][stem]
+            norm = k1 * (1 - b + b * lengths[doc_id] / average_length)
+            scores[doc_id] = scores.get(doc_id, 0.0) + query_freq * idf * term_freq * (k1 + 1) / (term_freq + norm)
+    return scores
+
+
+def build(documents: List[str], index_dir, mode: str = "heavy", **options) -> InvertedIndex:
+    builder = InvertedIndexBuilder(mode, **options)
+    builder.add_documents(documents)
+    builder.write(index_dir)
+    return InvertedIndex(index_dir)
+
+
+@pytest.mark.parametrize("max_postings", [1 << 22, 100, 1])
+def test_postings_match_the_reference(max_postings, corpus_lines, tmp_path):
+    index = build(corpus_lines, tmp_path / "index", max_postings=max_postings)
+    expected = reference_postings(corpus_lines, "heavy")
+    assert len(index) == len(corpus_lines) and index.num_terms == len(expected)
+    for stem, stem_postings in expected.items():
+        doc_ids, term_freqs = index.postings(stem)
+        assert np.column_stack([doc_ids, term_freqs]).tolist() == stem_postings, stem
+    assert [len(array) for array in index.postings("unindexed")] == [0, 0]
+    assert index.term_id("unindexed") is None and index.term_id("") is None
+
+
+@pytest.mark.parametrize("max_postings", [1 << 22, 1])
+def test_runs_write_the_same_index(max_postings, corpus_lines, tmp_path):
+    build(corpus_lines, tmp_path / "memory", max_postings=1 << 22)
+    build(corpus_lines, tmp_path / "runs", max_postings=max_postings)
+    for file_name in INDEX_FILES + ("meta.json",):
+        assert (tmp_path / "runs" / file_name).read_bytes() == (tmp_path / "memory" / file_name).read_bytes()
+
+
+@pytest.mark.parametrize("query", ["komemorasaun independénsia", "hamoris hamoris kapasidade", "ba iha"])
+def test_bm25_ranking(query, corpus_lines, tmp_path):
+    index = build(corpus_lines, tmp_path / "index")
+    expected = reference_scores(corpus_lines, "heavy", query)
+    results = index.search(query, top_k=len(corpus_lines))
+    assert [doc_id for doc_id, _ in results] == sorted(expected, key=lambda doc_id: (-expected[doc_id], doc_id))
+    assert [score for _, score in results] == pytest.approx([expected[doc_id] for doc_id, _ in results])
+    assert index.search(query, top_k=3) == results[:3]
+    assert index.search("unindexed") == []
+
+
+def test_empty_index_and_empty_stem(tmp_path):
+    index = build([], tmp_path / "empty")
+    assert len(index) == 0 and index.num_terms == 0 and index.search("nasionál") == []
+
+    # "ivamente" stems to the empty stem, which must round-trip through the dictionary
+    index = build(["ivamente", "ivamente ivamente"], tmp_path / "empty_stem")
+    assert index.num_terms == 1 and index.term_id("") == 0
+    assert [array.tolist() for array in index.postings("")] == [[0, 1], [1, 2]]
+
+
+def test_documents_added_after_write(corpus_lines, tmp_path):
+    builder = InvertedIndexBuilder("light", max_postings=50)
+    builder.add_documents(corpus_lines[:100])
+    builder.write(tmp_path / "first")
+    builder.add_documents(corpus_lines[100:])
+    builder.write(tmp_path / "second")
+    assert len(InvertedIndex(tmp_path / "first")) == 100
+    index = InvertedIndex(tmp_path / "second")
+    for stem, stem_postings in reference_postings(corpus_lines, "light").items():
+        assert np.column_stack(index.postings(stem)).tolist() == stem_postings, stem
+
+
+def test_cli(corpus_file, tmp_path):
+    index_dir = tmp_path / "index"
+    commands = [
+        ["build", "-if", str(corpus_file), "-od", str(index_dir), "-m", "heavy", "--max_postings", "100"],
+        ["search", "-id", str(index_dir), "-q", "hamoris", "-k", "2"],
+    ]
+    outputs = [
+        subprocess.run(
+            [sys.executable, "-m", "src.inverted_index", *command],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            check=True,
+            encoding="utf-8"
+        ).stdout
+        for command in commands
+    ]
+    assert outputs[0].startswith(f"Indexed {len(corpus_file.read_text(encoding='utf-8').splitlines())} documents")
+    results = InvertedIndex(index_dir).search("hamoris", top_k=2)
+    assert outputs[1] == "".join(f"{doc_id}\t{score:.4f}\n" for doc_id, score in results)
@@ -0,0 +1,31 @@
+import pytest
+from src.labadain_stemmer_core import LabadainStemmerCore
+from tests.conftest import load_golden_stems
+
+#!/usr/bin/env python3
+#
+# tests.test_labadain_stemmer_core.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+
+@pytest.mark.parametrize("word, regions", [
+    ("beautiful", (5, 7, 3)),
+    ("animadversion", (2, 4, 3)),
+    ("sprinkled", (5, 9, 4)),
+    ("eucharist", (3, 6, 3)),
+    ("edukasaun", (2, 4, 3)),
+    ("ua", (2, 2, 2)),
+    ("", (0, 0, 0)),
+])
+def test_find_regions(word, regions):
+    assert LabadainStemmerCore().find_regions(word) == regions
+
+
+def test_find_regions_batch_matches_find_regions():
+    core = LabadainStemmerCore()
+    words = [row[0] for row in load_golden_stems()]
+    words = words + words[::-1] + ["", "a", "ua"]
+    assert core.find_regions_batch(words) == [core.find_regions(word) for word in words]
+    assert core.find_regions_batch(iter(words)) == [core.find_regions(word) for word in words]
+    assert core.find_regions_batch([]) == []
@@ -0,0 +1,46 @@
+import pytest
+from src.stem_cache import StemCache
+from src.stemmer import ALL_MODES, STEMMER_MODES, LabadainStemmer, mode_output_paths
+from src.stemmer_pipeline import MultiModePipeline
+from tests.conftest import load_golden_documents, load_golden_stems, run_cli
+
+#!/usr/bin/env python3
+#
+# tests.test_multi_mode.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+
+def test_pipeline_matches_the_golden_stems():
+    stemmer = LabadainStemmer()
+    pipeline = MultiModePipeline([stemmer.pipes[mode] for mode in STEMMER_MODES])
+    for word, *stems in load_golden_stems():
+        assert pipeline.stem_word(word) == tuple(stems), word
+
+
+@pytest.mark.parametrize("cache_size", [0, 64])
+def test_words_and_documents(cache_size):
+    stemmer = LabadainStemmer(cache=StemCache(cache_size) if cache_size else None)
+    for word, *stems in load_golden_stems():
+        assert stemmer.stem_word_all(word) == (tuple(stems) if len(word) > 3 else (word,) * 3), word
+    for document in load_golden_documents():
+        assert stemmer.stem_document_all(document["text"]) == tuple(document[mode] for mode in STEMMER_MODES)
+        assert stemmer.stem_text_all(document["text"].lower().replace("'", "’")) == stemmer.stem_document_all(document["text"])
+    assert stemmer.stem_tokens_all([]) == ([], [], [])
+
+
+def test_mode_output_paths(tmp_path):
+    assert [path.name for path in mode_output_paths(tmp_path / "result.txt")] == [
+        "result.light.txt", "result.moderate.txt", "result.heavy.txt"
+    ]
+
+
+def test_cli(corpus_file, corpus_lines, tmp_path):
+    stemmer = LabadainStemmer()
+    rows = [stemmer.stem_document_all(line) for line in corpus_lines]
+    assert run_cli("-if", str(corpus_file), "-m", ALL_MODES, "--stream") == "".join("\t".join(row) + "\n" for row in rows)
+
+    output_file = tmp_path / "stems.txt"
+    run_cli("-if", str(corpus_file), "-m", ALL_MODES, "-w", "2", "--chunk_size", "7", "-of", str(output_file))
+    for index, output_path in enumerate(mode_output_paths(output_file)):
+        assert output_path.read_text(encoding="utf-8") == "".join(row[index] + "\n" for row in rows)
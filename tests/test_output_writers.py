@@ -0,0 +1,110 @@
+import json
+import numpy as np
+import pytest
+from src.output_writers import (
+    DocumentWriter,
+    JsonlWriter,
+    StemIdWriter,
+    TermFrequencyWriter,
+    TextWriter,
+    open_writer,
+    read_stem_ids,
+    read_vocabulary,
+    write_stemmed_documents,
+    write_vocabulary
+)
+from src.stemmer import LabadainStemmer
+from tests.conftest import run_cli
+
+#!/usr/bin/env python3
+#
+# tests.test_output_writers.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+DOCUMENTS = [["komemor", "loro", "independente"], [], ["eduk", "nasionál", "eduk"], [""], ["", "ba"]]
+
+
+def decode(input_dir):
+    vocabulary, stem_ids, doc_offsets = read_stem_ids(input_dir)
+    return [[vocabulary[stem_id] for stem_id in stem_ids[start:end]] for start, end in zip(doc_offsets[:-1], doc_offsets[1:])]
+
+
+def test_text_and_jsonl_writers(tmp_path):
+    with TextWriter(tmp_path / "stems.txt") as writer:
+        writer.write_all(DOCUMENTS[:2])
+        size = writer.sync()
+    assert size == len("komemor loro independente\n\n".encode("utf-8"))
+    with TextWriter(tmp_path / "stems.txt", append=True) as writer:
+        writer.write(DOCUMENTS[2])
+    assert (tmp_path / "stems.txt").read_text(encoding="utf-8") == "komemor loro independente\n\neduk nasionál eduk\n"
+    with TextWriter(tmp_path / "stems.txt") as writer:
+        writer.write(["ba"])
+    assert (tmp_path / "stems.txt").read_text(encoding="utf-8") == "ba\n"
+
+    with JsonlWriter(tmp_path / "stems.jsonl") as writer:
+        writer.write_all(DOCUMENTS[:2])
+    with JsonlWriter(tmp_path / "stems.jsonl", append=True, first_id=2) as writer:
+        writer.write(DOCUMENTS[2])
+    lines = (tmp_path / "stems.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == [{"id": index, "stems": stems} for index, stems in enumerate(DOCUMENTS[:3])]
+
+
+@pytest.mark.parametrize("buffer_size", [1 << 16, 1])
+def test_stem_ids_round_trip(buffer_size, tmp_path):
+    with StemIdWriter(tmp_path / "ids", buffer_size=buffer_size) as writer:
+        writer.write_all(DOCUMENTS)
+    assert decode(tmp_path / "ids") == DOCUMENTS
+    meta = json.loads((tmp_path / "ids" / "meta.json").read_text(encoding="utf-8"))
+    assert meta["num_documents"] == 5 and meta["num_tokens"] == 9 and meta["vocabulary_size"] == 7
+
+
+@pytest.mark.parametrize("documents", [[], [[]], [[""]], [["", ""], [""]]])
+def test_stem_ids_of_empty_documents_and_stems(documents, tmp_path):
+    with StemIdWriter(tmp_path / "ids") as writer:
+        writer.write_all(documents)
+    assert decode(tmp_path / "ids") == documents
+
+
+@pytest.mark.parametrize("stems", [[], [""], ["a"], ["a", ""], ["", "a"], ["eduk", "", "nasionál"]])
+def test_vocabulary_round_trip(stems, tmp_path):
+    write_vocabulary(tmp_path / "vocabulary.txt", stems)
+    assert read_vocabulary(tmp_path / "vocabulary.txt") == stems
+
+
+def test_vocabulary_without_a_last_newline(tmp_path):
+    (tmp_path / "vocabulary.txt").write_text("eduk\nnasionál", encoding="utf-8")
+    assert read_vocabulary(tmp_path / "vocabulary.txt") == ["eduk", "nasionál"]
+
+
+def test_term_frequency_writer(tmp_path):
+    with TermFrequencyWriter(tmp_path / "tf") as writer:
+        writer.write_all(DOCUMENTS[:3])
+    lines = (tmp_path / "tf" / "term_frequencies.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"id": 0, "length": 3, "tf": {"komemor": 1, "loro": 1, "independente": 1}},
+        {"id": 1, "length": 0, "tf": {}},
+        {"id": 2, "length": 3, "tf": {"eduk": 2, "nasionál": 1}},
+    ]
+    collection = json.loads((tmp_path / "tf" / "collection.json").read_text(encoding="utf-8"))
+    assert collection["num_documents"] == 3 and collection["num_tokens"] == 6
+    assert collection["document_frequencies"]["eduk"] == 1
+
+
+def test_open_writer(tmp_path):
+    with pytest.raises(ValueError):
+        open_writer("csv", tmp_path / "stems.csv")
+    with pytest.raises(TypeError):
+        DocumentWriter()
+    write_stemmed_documents("jsonl", [tmp_path / "a.jsonl", tmp_path / "b.jsonl"], [(["a"], ["b"]), (["c"], ["d"])])
+    assert [json.loads(line)["stems"] for line in (tmp_path / "b.jsonl").read_text(encoding="utf-8").splitlines()] == [["b"], ["d"]]
+
+
+def test_cli_stem_ids(corpus_file, corpus_lines, tmp_path):
+    run_cli("-if", str(corpus_file), "-of", str(tmp_path / "ids"), "-m", "heavy", "-s", "-fmt", "stem_ids")
+    stemmer = LabadainStemmer(mode="heavy")
+    assert decode(tmp_path / "ids") == [stemmer.stem_document_tokens(line) for line in corpus_lines]
+    # A document stemmed to the empty stem only
+    run_cli("-it", "ivamente", "-of", str(tmp_path / "empty_stem"), "-m", "heavy", "-s", "-fmt", "stem_ids")
+    vocabulary, stem_ids, _ = read_stem_ids(tmp_path / "empty_stem")
+    assert vocabulary == [""] and np.asarray(stem_ids).tolist() == [0]
@@ -0,0 +1,42 @@
+import pytest
+from src.parallel_stemmer import iter_chunks, stem_parallel
+from src.stemmer import ALL_MODES, STEMMER_MODES, LabadainStemmer
+from tests.conftest import run_cli
+
+#!/usr/bin/env python3
+#
+# tests.test_parallel_stemmer.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+
+def test_iter_chunks():
+    assert list(iter_chunks(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(iter_chunks([], 3)) == []
+
+
+@pytest.mark.parametrize("mode", STEMMER_MODES + (ALL_MODES,))
+def test_output_keeps_the_input_order(mode, corpus_lines):
+    stemmer = LabadainStemmer(mode="light" if mode == ALL_MODES else mode)
+    stem_line = stemmer.stem_document_all if mode == ALL_MODES else stemmer.stem_document
+    expected = [stem_line(line) for line in corpus_lines]
+    assert list(stem_parallel(corpus_lines, mode, workers=2, chunk_size=5, max_pending=2)) == expected
+
+
+def test_tokens_cache_and_normalization(corpus_lines):
+    stemmer = LabadainStemmer(mode="heavy")
+    expected = [stemmer.stem_document_tokens(line) for line in corpus_lines]
+    stemmed_lines = stem_parallel(corpus_lines, "heavy", workers=2, chunk_size=7, cache_size=100, as_tokens=True)
+    assert list(stemmed_lines) == expected
+    assert list(stem_parallel(["nasiona\u0301l"], "light", workers=2, normalization="nfc")) == ["nasionál"]
+
+
+def test_invalid_chunk_size(corpus_lines):
+    with pytest.raises(ValueError):
+        list(stem_parallel(corpus_lines, chunk_size=0))
+
+
+@pytest.mark.parametrize("mode", STEMMER_MODES)
+def test_workers_cli_matches_stream(mode, corpus_file):
+    stream_output = run_cli("-if", str(corpus_file), "-m", mode, "--stream")
+    assert run_cli("-if", str(corpus_file), "-m", mode, "-w", "2", "--chunk_size", "7") == stream_output
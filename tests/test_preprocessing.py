@@ -0,0 +1,58 @@
+import pytest
+from tetuntokenizer.tokenizer import TetunSimpleTokenizer
+from src.fused_tokenizer import FusedTokenizer
+from src.preprocessing import TextPreprocessing, normalize_lines, normalize_unicode
+from src.stemmer import LabadainStemmer
+from tests.conftest import UNICODE_LINES, run_cli
+
+#!/usr/bin/env python3
+#
+# tests.test_preprocessing.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+DECOMPOSED = "nasiona\u0301l ida\u2011ne\u02bceb\u00e9"
+
+
+def test_ascii_text_is_returned_as_is():
+    text = "Ne'e mak ida-ne'ebe"
+    assert normalize_unicode(text) is text
+    assert normalize_unicode(text, fold_punctuation=True) is text
+
+
+@pytest.mark.parametrize("fold_punctuation, expected", [
+    (False, "nasion\u00e1l ida\u2011ne\u02bceb\u00e9"),
+    (True, "nasion\u00e1l ida-ne\u2019eb\u00e9"),
+])
+def test_normalize_unicode(fold_punctuation, expected):
+    assert normalize_unicode(DECOMPOSED, fold_punctuation) == expected
+    assert normalize_unicode("\u212aomunikasaun") == "Komunikasaun"
+    assert list(normalize_lines([DECOMPOSED, "uma", ""], fold_punctuation)) == [expected, "uma", ""]
+
+
+def test_text_preprocessing():
+    assert TextPreprocessing("Ne'e NASIONÁL").preprocess_text() == "ne’e nasionál"
+    assert TextPreprocessing("Ne'e NASIONA\u0301L", normalize=True).preprocess_text() == "ne\u2019e nasion\u00e1l"
+    assert TextPreprocessing("Ne\u2018e", fold_punctuation=True).preprocess_text() == "ne\u2019e"
+
+
+def test_tokens_of_normalized_text():
+    tokenizer = FusedTokenizer()
+    for text in UNICODE_LINES:
+        for fold_punctuation in (False, True):
+            preprocessed_text = TextPreprocessing(text, normalize=True, fold_punctuation=fold_punctuation).preprocess_text()
+            tokens = TetunSimpleTokenizer().tokenize(preprocessed_text)
+            assert tokenizer.tokenize(normalize_unicode(text, fold_punctuation)) == tokens, text
+
+
+@pytest.mark.parametrize("normalization", ["nfc", "fold"])
+def test_cli_stream_and_workers_agree(normalization, tmp_path):
+    input_file = tmp_path / "unicode.txt"
+    input_file.write_text("\n".join(UNICODE_LINES) + "\n", encoding="utf-8")
+    stemmer = LabadainStemmer(mode="heavy")
+    fold_punctuation = normalization == "fold"
+    expected = "".join(
+        stemmer.stem_document(normalize_unicode(line, fold_punctuation)) + "\n" for line in UNICODE_LINES
+    )
+    assert run_cli("-if", str(input_file), "-m", "heavy", "-nu", normalization, "-s") == expected
+    assert run_cli("-if", str(input_file), "-m", "heavy", "-nu", normalization, "-w", "2") == expected
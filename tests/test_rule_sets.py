@@ -0,0 +1,94 @@
+import json
+import subprocess
+import sys
+import pytest
+from src.rule_sets import (
+    compile_rule_sets,
+    load_rule_sets,
+    rule_sets_digest,
+    rule_sets_to_dict,
+    write_rule_sets
+)
+from src.stemmer import STEMMER_MODES, LabadainStemmer
+from tests.conftest import REPO_ROOT, load_golden_stems
+
+#!/usr/bin/env python3
+#
+# tests.test_rule_sets.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+
+def built_in_rule_sets() -> dict:
+    return json.loads(json.dumps(rule_sets_to_dict()))
+
+
+def test_exported_rules_stem_like_the_built_in_rules(tmp_path):
+    write_rule_sets(tmp_path / "rules.json", rule_sets_to_dict())
+    rule_sets = load_rule_sets(tmp_path / "rules.json")
+    assert set(rule_sets) == set(STEMMER_MODES)
+    for mode in STEMMER_MODES:
+        column = STEMMER_MODES.index(mode) + 1
+        stemmer = LabadainStemmer(mode=mode, rule_sets=rule_sets)
+        for row in load_golden_stems():
+            word = row[0]
+            assert stemmer.stem_word(word) == (row[column] if len(word) > 3 else word), word
+
+
+def test_custom_rules_replace_their_modes_only():
+    data = built_in_rule_sets()
+    data["modes"] = {"heavy": []}
+    rule_sets = compile_rule_sets(data)
+    assert set(rule_sets) == {"heavy"}
+    assert LabadainStemmer(mode="heavy", rule_sets=rule_sets).stem_word("edukasaun") == "edukasaun"
+    assert LabadainStemmer(mode="light", rule_sets=rule_sets).stem_word("edukasaun") == "eduk"
+    stemmer = LabadainStemmer(rule_sets=rule_sets)
+    assert stemmer.lexicon_rules_digest("heavy") != LabadainStemmer().lexicon_rules_digest("heavy")
+    assert stemmer.lexicon_rules_digest("light") == LabadainStemmer().lexicon_rules_digest("light")
+
+
+def invalid(update):
+    data = built_in_rule_sets()
+    update(data)
+    return data
+
+
+@pytest.mark.parametrize("data, message", [
+    ([], "must contain a JSON object"),
+    (invalid(lambda data: data.update(version=2)), "Unsupported rule set version"),
+    (invalid(lambda data: data.pop("modes")), "'rules' and 'modes' objects"),
+    (invalid(lambda data: data["rules"].update(general=[])), "must be an object"),
+    (invalid(lambda data: data["rules"]["general"].update(weight=1)), "unknown fields: weight"),
+    (invalid(lambda data: data["rules"]["general"].update(action="remove")), "unknown action 'remove'"),
+    (invalid(lambda data: data["rules"]["general"].update(affixes=[])), "non-empty list of affixes"),
+    (invalid(lambda data: data["rules"]["general"].update(affixes=["ás", ""])), "empty or non-string affix"),
+    (invalid(lambda data: data["rules"]["general"].update(affixes=["ás", "ás"])), "duplicate affixes"),
+    (invalid(lambda data: data["rules"]["lojia"].pop("replacement")), "requires a string replacement"),
+    (invalid(lambda data: data["rules"]["general"].update(replacement="x")), "takes no replacement"),
+    (invalid(lambda data: data["modes"].update(extreme=[])), "Invalid mode 'extreme'"),
+    (invalid(lambda data: data["modes"].update(light="general")), "must list its rule names"),
+    (invalid(lambda data: data["modes"]["light"].append("missing")), "undefined rules: missing"),
+    (invalid(lambda data: data["modes"]["light"].append("general")), "lists a rule more than once"),
+])
+def test_invalid_rule_sets(data, message):
+    with pytest.raises(ValueError, match=message):
+        compile_rule_sets(data)
+
+
+def test_digest_identifies_the_rules():
+    assert rule_sets_digest() == rule_sets_digest()
+    assert len(rule_sets_digest()) == 64
+
+
+def test_cli(tmp_path):
+    rules_path = str(tmp_path / "rules.json")
+    for command in (["export", "-of", rules_path], ["compile", "-r", rules_path]):
+        subprocess.run([sys.executable, "-m", "src.rule_sets", *command], cwd=REPO_ROOT, check=True, capture_output=True)
+    stemmer_output = subprocess.run(
+        [sys.executable, "labadain_stemmer.py", "-it", "Edukasaun nasionál hamoris", "-m", "heavy", "-r", rules_path],
+        cwd=REPO_ROOT,
+        check=True,
+        capture_output=True,
+        encoding="utf-8"
+    ).stdout
+    assert stemmer_output == "eduk nasionál moris\n"
@@ -0,0 +1,127 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import List
+import pytest
+from src.shard_plan import PLAN_FILE, create_plan, line_boundaries, load_plan, merge_shards, stem_range
+from src.stemmer import ALL_MODES, STEMMER_MODES, LabadainStemmer, mode_output_paths
+from tests.conftest import REPO_ROOT
+
+#!/usr/bin/env python3
+#
+# tests.test_shard_plan.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+
+def expected_output(lines: List[str], mode: str) -> str:
+    """Output of a single-machine streaming run."""
+    stemmer = LabadainStemmer(mode=mode)
+    return "".join(stemmer.stem_document(line) + "\n" for line in lines)
+
+
+def stem_all_shards(input_path: Path, plan_dir: Path, num_shards: int, mode: str = "heavy") -> Path:
+    """Plan, stem every shard (last first) and merge, returning the merged output path."""
+    plan = create_plan(input_path, plan_dir, num_shards, mode=mode, cache_size=100)
+    for shard in reversed(plan["shards"]):
+        stem_range(plan_dir / PLAN_FILE, shard["index"])
+    merge_shards(plan_dir / PLAN_FILE, plan_dir / "merged.txt", block_size=64)
+    return plan_dir / "merged.txt"
+
+
+@pytest.mark.parametrize("content", [b"", b"\n", b"a\nb\n", b"a\nbb\nccc", b"uma\n" * 50, b"x" * 100])
+@pytest.mark.parametrize("num_shards", [1, 3, 7])
+def test_line_boundaries(content, num_shards, tmp_path):
+    input_path = tmp_path / "input.txt"
+    input_path.write_bytes(content)
+    ranges = line_boundaries(input_path, num_shards)
+    assert len(ranges) == num_shards
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(content)
+    assert all(start <= end for start, end in ranges)
+    assert all(previous[1] == following[0] for previous, following in zip(ranges, ranges[1:]))
+    assert all(end in (0, len(content)) or content[end - 1:end] == b"\n" for _, end in ranges)
+    with pytest.raises(ValueError, match="positive integer"):
+        line_boundaries(input_path, 0)
+
+
+@pytest.mark.parametrize("num_shards", [1, 4, 500])
+def test_merged_output_matches_a_single_run(num_shards, corpus_file, corpus_lines, tmp_path):
+    merged_path = stem_all_shards(corpus_file, tmp_path / "plan", num_shards)
+    assert merged_path.read_text(encoding="utf-8") == expected_output(corpus_lines, "heavy")
+
+
+def test_all_modes(corpus_file, corpus_lines, tmp_path):
+    stem_all_shards(corpus_file, tmp_path / "plan", 3, mode=ALL_MODES)
+    for mode, output_path in zip(STEMMER_MODES, mode_output_paths(tmp_path / "plan" / "merged.txt")):
+        assert output_path.read_text(encoding="utf-8") == expected_output(corpus_lines, mode)
+
+
+def test_merge_checks_the_receipts(corpus_file, tmp_path):
+    plan_dir = tmp_path / "plan"
+    plan_path = plan_dir / PLAN_FILE
+    merged_path = plan_dir / "merged.txt"
+    create_plan(corpus_file, plan_dir, 3, mode="heavy")
+    stem_range(plan_path, 0)
+    stem_range(plan_path, 2)
+    with pytest.raises(ValueError, match=r"missing shards \[1\]"):
+        merge_shards(plan_path, merged_path)
+
+    stem_range(plan_path, 1)
+    # A new plan with other ranges makes the receipts of the old one stale
+    create_plan(corpus_file, plan_dir, 2, mode="heavy")
+    with pytest.raises(ValueError, match=r"another plan \[0, 1\]"):
+        merge_shards(plan_path, merged_path)
+
+    stem_range(plan_path, 0)
+    stem_range(plan_path, 1)
+    merge_shards(plan_path, merged_path)
+    merged_path.unlink()
+    with (plan_dir / "shard-00001.txt").open("a", encoding="utf-8") as f_shard:
+        f_shard.write("extra\n")
+    with pytest.raises(ValueError, match="does not match its receipt"):
+        merge_shards(plan_path, merged_path)
+    assert not merged_path.exists() and not merged_path.with_name("merged.txt.partial").exists()
+    with pytest.raises(ValueError, match="has no shard 2"):
+        stem_range(plan_path, 2)
+
+
+def test_changed_input_and_invalid_plans(corpus_file, tmp_path):
+    plan_dir = tmp_path / "plan"
+    plan = create_plan(corpus_file, plan_dir, 2)
+    os.utime(corpus_file, ns=(plan["input_mtime_ns"] + 10 ** 9,) * 2)
+    with pytest.raises(ValueError, match="changed since the shard plan"):
+        stem_range(plan_dir / PLAN_FILE, 0)
+
+    plan["shards"][1]["start"] += 1
+    (plan_dir / PLAN_FILE).write_text(json.dumps(plan), encoding="utf-8")
+    with pytest.raises(ValueError, match="do not cover the input"):
+        load_plan(plan_dir / PLAN_FILE)
+    (plan_dir / PLAN_FILE).write_text('{"format": "other"}', encoding="utf-8")
+    with pytest.raises(ValueError, match="Not a shard plan"):
+        load_plan(plan_dir / PLAN_FILE)
+
+    compressed_path = tmp_path / "corpus.txt.gz"
+    compressed_path.write_bytes(b"")
+    with pytest.raises(ValueError, match="compressed"):
+        create_plan(compressed_path, plan_dir, 2)
+
+
+def test_cli(corpus_file, corpus_lines, tmp_path):
+    def run(*args: str) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [sys.executable, "-m", "src.shard_plan", *args],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            encoding="utf-8"
+        )
+
+    plan_path = tmp_path / "plan" / PLAN_FILE
+    assert run("plan", "-if", str(corpus_file), "-od", str(plan_path.parent), "-n", "2", "-m", "light").returncode == 0
+    assert run("work", "-pf", str(plan_path), "-s", "0").returncode == 0
+    result = run("merge", "-pf", str(plan_path), "-of", str(tmp_path / "merged.txt"))
+    assert result.returncode == 1 and "missing shards [1]" in result.stderr
+    assert run("work", "-pf", str(plan_path), "-s", "1").returncode == 0
+    assert run("merge", "-pf", str(plan_path), "-of", str(tmp_path / "merged.txt")).returncode == 0
+    assert (tmp_path / "merged.txt").read_text(encoding="utf-8") == expected_output(corpus_lines, "light")
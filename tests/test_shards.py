@@ -0,0 +1,215 @@
+import bz2
+import gzip
+import json
+import lzma
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import List
+import pytest
+from config.utils import Utils
+import src.parallel_stemmer as parallel_stemmer
+from src.parallel_stemmer import shard_output_path, stem_shards
+from src.stemmer import LabadainStemmer
+from tests.conftest import REPO_ROOT, run_cli
+
+#!/usr/bin/env python3
+#
+# tests.test_shards.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+
+def expected_output(lines: List[str], mode: str = "heavy") -> str:
+    stemmer = LabadainStemmer(mode=mode)
+    return "".join(stemmer.stem_document(line) + "\n" for line in lines)
+
+
+def write_shards(input_dir: Path, corpus_lines: List[str]) -> List[Path]:
+    """Split the corpus into a plain, a gzip, a bzip2 and an xz shard (two of them in a subdirectory)."""
+    (input_dir / "2024").mkdir(parents=True)
+    input_paths = [
+        input_dir / "part-01.txt",
+        input_dir / "part-02.txt.gz",
+        input_dir / "2024" / "part-03.txt.bz2",
+        input_dir / "2024" / "part-04.txt.xz",
+    ]
+    openers = [open, gzip.open, bz2.open, lzma.open]
+    for index, (input_path, opener) in enumerate(zip(input_paths, openers)):
+        with opener(input_path, "wt", encoding="utf-8") as f_shard:
+            f_shard.write("".join(line + "\n" for line in corpus_lines[index::4]))
+    return input_paths
+
+
+def test_compressed_shards(corpus_lines, tmp_path):
+    input_paths = write_shards(tmp_path / "corpus", corpus_lines)
+    manifest = stem_shards(input_paths, tmp_path / "stems", "heavy", workers=2)
+    assert manifest["num_shards"] == 4 and manifest["lines"] == len(corpus_lines)
+    output_paths = [tmp_path / "stems" / path for path in ["part-01.txt", "part-02.txt", "2024/part-03.txt", "2024/part-04.txt"]]
+    for index, output_path in enumerate(output_paths):
+        assert output_path.read_text(encoding="utf-8") == expected_output(corpus_lines[index::4])
+
+    # The same lines through the corpus readers
+    utils = Utils()
+    assert [line.rstrip("\n") for line in utils.iter_corpora(input_paths)] == [
+        line for index in range(4) for line in corpus_lines[index::4]
+    ]
+
+
+def test_corpus_paths(corpus_lines, tmp_path):
+    input_paths = write_shards(tmp_path / "corpus", corpus_lines)
+    utils = Utils()
+    assert utils.expand_corpus_paths(str(tmp_path / "corpus")) == sorted(input_paths)
+    assert utils.expand_corpus_paths(str(tmp_path / "corpus" / "**" / "*.xz")) == [input_paths[3]]
+    assert utils.expand_corpus_paths(str(tmp_path / "corpus" / "*.txt")) == [input_paths[0]]
+
+
+def test_output_paths(tmp_path):
+    input_root, output_dir = tmp_path / "corpus", tmp_path / "stems"
+    assert shard_output_path(input_root / "a" / "b.txt.gz", input_root, output_dir, "text") == output_dir / "a" / "b.txt"
+    assert shard_output_path(input_root / "b.txt", input_root, output_dir, "jsonl") == output_dir / "b.jsonl"
+    assert shard_output_path(input_root / "b.txt.xz", input_root, output_dir, "stem_ids") == output_dir / "b"
+
+
+def test_cli_matches_stream(corpus_lines, tmp_path):
+    write_shards(tmp_path / "corpus", corpus_lines)
+    output = run_cli("-if", str(tmp_path / "corpus"), "-od", str(tmp_path / "stems"), "-m", "light", "-w", "2")
+    assert output == f"Stemmed 4 of 4 shards ({len(corpus_lines)} lines) into {tmp_path / 'stems'}\n"
+    stemmed = "".join(
+        (tmp_path / "stems" / path).read_text(encoding="utf-8")
+        for path in ["2024/part-03.txt", "2024/part-04.txt", "part-01.txt", "part-02.txt"]
+    )
+    assert stemmed == run_cli("-if", str(tmp_path / "corpus"), "-m", "light", "--stream")
+
+
+def test_output_dir_inside_the_input_dir(corpus_lines, tmp_path):
+    input_paths = write_shards(tmp_path / "corpus", corpus_lines)
+    for _ in range(2):
+        # The outputs and the manifest of the first run are not taken as inputs by the second
+        output = run_cli("-if", str(tmp_path / "corpus"), "-od", str(tmp_path / "corpus" / "stems"), "-m", "heavy")
+        assert output.endswith(f"of 4 shards ({len(corpus_lines)} lines) into {tmp_path / 'corpus' / 'stems'}\n")
+    assert (tmp_path / "corpus" / "stems" / "part-01.txt").read_text(encoding="utf-8") == expected_output(corpus_lines[0::4])
+    with pytest.raises(ValueError, match="inside the output directory"):
+        stem_shards([tmp_path / "corpus" / "stems" / "2024" / "part-03.txt"], tmp_path / "corpus")
+    assert all(input_path.exists() for input_path in input_paths)
+
+
+def test_shards_refuse_to_overwrite_the_inputs(corpus_file):
+    with pytest.raises(ValueError, match="must not be the input directory"):
+        stem_shards([corpus_file], corpus_file.parent)
+
+    # corpus.txt and corpus.txt.gz would both be written to stems/corpus.txt
+    compressed_file = corpus_file.with_name(corpus_file.name + ".gz")
+    with gzip.open(compressed_file, "wt", encoding="utf-8") as f_compressed:
+        f_compressed.write(corpus_file.read_text(encoding="utf-8"))
+    with pytest.raises(ValueError, match="would both be written"):
+        stem_shards([corpus_file, compressed_file], corpus_file.parent / "stems")
+    assert not (corpus_file.parent / "stems").exists()
+
+    with pytest.raises(ValueError, match="no shards"):
+        stem_shards([], corpus_file.parent / "stems")
+
+
+def test_cli_reports_missing_inputs(tmp_path):
+    result = subprocess.run(
+        [sys.executable, "labadain_stemmer.py", "-if", str(tmp_path / "missing.txt"), "-od", str(tmp_path / "stems")],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        encoding="utf-8"
+    )
+    assert result.returncode == 2 and "Input file not found" in result.stderr
+
+
+class Interrupted(Exception):
+    pass
+
+
+def interrupt_after(monkeypatch, num_lines: int) -> None:
+    """Make the (in-process) shard worker fail after stemming num_lines lines."""
+    init_worker = parallel_stemmer.init_worker
+
+    def init_failing_worker(*initargs) -> None:
+        init_worker(*initargs)
+        stem_line = parallel_stemmer.worker_stem
+        stemmed_lines = []
+
+        def stem_or_fail(line: str) -> List[str]:
+            if len(stemmed_lines) == num_lines:
+                raise Interrupted()
+            stemmed_lines.append(line)
+            return stem_line(line)
+
+        parallel_stemmer.worker_stem = stem_or_fail
+
+    monkeypatch.setattr(parallel_stemmer, "init_worker", init_failing_worker)
+
+
+@pytest.mark.parametrize("output_format", ["text", "jsonl"])
+def test_interrupted_shard_resumes(output_format, monkeypatch, corpus_file, corpus_lines, tmp_path):
+    output_dir = tmp_path / "stems"
+    output_name = "corpus.txt" if output_format == "text" else "corpus.jsonl"
+    interrupt_after(monkeypatch, 25)
+    with pytest.raises(Interrupted):
+        stem_shards([corpus_file], output_dir, "heavy", output_format, workers=1, checkpoint_lines=10)
+    checkpoint = json.loads((output_dir / f"{output_name}.checkpoint.json").read_text(encoding="utf-8"))
+    assert checkpoint["lines"] == 20
+    assert (output_dir / f"{output_name}.partial").exists() and not (output_dir / output_name).exists()
+
+    monkeypatch.undo()
+    manifest = stem_shards([corpus_file], output_dir, "heavy", output_format, workers=1, checkpoint_lines=10)
+    assert manifest["shards"][0]["resumed_at_line"] == 20
+    assert manifest["lines"] == len(corpus_lines)
+    assert not (output_dir / f"{output_name}.checkpoint.json").exists()
+    assert not (output_dir / f"{output_name}.partial").exists()
+
+    resumed_output = (output_dir / output_name).read_text(encoding="utf-8")
+    stem_shards([corpus_file], tmp_path / "uninterrupted", "heavy", output_format, workers=1, checkpoint_lines=10)
+    assert resumed_output == (tmp_path / "uninterrupted" / output_name).read_text(encoding="utf-8")
+    if output_format == "text":
+        assert resumed_output == expected_output(corpus_lines)
+
+
+def test_changed_shard_restarts(monkeypatch, corpus_file, corpus_lines, tmp_path):
+    output_dir = tmp_path / "stems"
+    interrupt_after(monkeypatch, 25)
+    with pytest.raises(Interrupted):
+        stem_shards([corpus_file], output_dir, "heavy", workers=1, checkpoint_lines=10)
+    monkeypatch.undo()
+
+    # The input changed: the checkpoint of the old content must not be reused
+    corpus_file.write_text("\n".join(corpus_lines[50:]) + "\n", encoding="utf-8")
+    manifest = stem_shards([corpus_file], output_dir, "heavy", workers=1, checkpoint_lines=10)
+    assert manifest["shards"][0]["resumed_at_line"] == 0
+    assert (output_dir / "corpus.txt").read_text(encoding="utf-8") == expected_output(corpus_lines[50:])
+
+
+def test_changed_configuration_restems(corpus_file, corpus_lines, tmp_path):
+    output_dir = tmp_path / "stems"
+    stem_shards([corpus_file], output_dir, "heavy", workers=1)
+    assert stem_shards([corpus_file], output_dir, "heavy", workers=1)["stemmed_in_last_run"] == 0
+    assert stem_shards([corpus_file], output_dir, "light", workers=1)["stemmed_in_last_run"] == 1
+    assert (output_dir / "corpus.txt").read_text(encoding="utf-8") == expected_output(corpus_lines, "light")
+    assert stem_shards([corpus_file], output_dir, "light", workers=1, force=True)["stemmed_in_last_run"] == 1
+
+
+def test_rerun_with_the_outputs_next_to_the_inputs(corpus_lines, tmp_path):
+    input_paths = write_shards(tmp_path / "corpus", corpus_lines)
+    output_dir = tmp_path / "corpus" / "stems"
+    run_cli("-if", str(tmp_path / "corpus"), "-od", str(output_dir), "-m", "heavy", "-w", "2")
+    outputs = {path: path.stat().st_mtime_ns for path in output_dir.rglob("*.txt")}
+    assert len(outputs) == 4
+
+    # Nothing changed: the second run re-stems nothing and rewrites no output
+    output = run_cli("-if", str(tmp_path / "corpus"), "-od", str(output_dir), "-m", "heavy", "-w", "2")
+    assert output.startswith("Stemmed 0 of 4 shards")
+    assert {path: path.stat().st_mtime_ns for path in output_dir.rglob("*.txt")} == outputs
+
+    # Touched but unchanged (same content hash): still skipped; changed: re-stemmed alone
+    os.utime(input_paths[1])
+    manifest = stem_shards(sorted(input_paths), output_dir, "heavy", workers=1)
+    assert manifest["stemmed_in_last_run"] == 0
+    input_paths[0].write_text("Edukasaun nasionál\n", encoding="utf-8")
+    manifest = stem_shards(sorted(input_paths), output_dir, "heavy", workers=1, verify_inputs=True)
+    assert manifest["stemmed_in_last_run"] == 1 and manifest["num_shards"] == 4
+    assert (output_dir / "part-01.txt").read_text(encoding="utf-8") == "eduk nasionál\n"
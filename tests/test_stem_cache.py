@@ -0,0 +1,95 @@
+import threading
+import pytest
+from src.stem_cache import StemCache
+from src.stemmer import STEMMER_MODES, LabadainStemmer
+from tests.conftest import load_golden_stems
+
+#!/usr/bin/env python3
+#
+# tests.test_stem_cache.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+
+def test_hits_misses_and_stats():
+    cache = StemCache(8)
+    calls = []
+
+    def stemmer(word: str) -> str:
+        calls.append(word)
+        return word[:4]
+
+    assert cache.get_or_stem("light", "nasionál", stemmer) == "nasi"
+    assert cache.get_or_stem("light", "nasionál", stemmer) == "nasi"
+    assert cache.get_or_stem("heavy", "nasionál", stemmer) == "nasi"
+    assert calls == ["nasionál", "nasionál"]
+    assert cache.stats() == {"size": 2, "max_size": 8, "hits": 1, "misses": 2, "evictions": 0, "hit_rate": 1 / 3}
+
+    cache.reset_stats()
+    assert cache.stats()["hits"] == cache.stats()["misses"] == 0 and len(cache) == 2
+    cache.clear()
+    assert len(cache) == 0 and cache.stats()["hit_rate"] == 0.0
+
+
+def test_least_recently_used_entry_is_evicted():
+    # A single shard, so the eviction order is the global LRU order
+    cache = StemCache(2, shards=1)
+    cache.get_or_stem("light", "a", str.upper)
+    cache.get_or_stem("light", "b", str.upper)
+    cache.get_or_stem("light", "a", str.upper)
+    cache.get_or_stem("light", "c", str.upper)
+    assert len(cache) == 2 and cache.stats()["evictions"] == 1
+    assert ("light", "b") not in cache.shards[0].entries
+    assert list(cache.shards[0].entries) == [("light", "a"), ("light", "c")]
+
+
+def test_size_is_bounded_across_shards():
+    cache = StemCache(10, shards=16)
+    assert len(cache.shards) == 10 and sum(shard.max_size for shard in cache.shards) == 10
+    for index in range(1000):
+        cache.get_or_stem("light", str(index), str.upper)
+    assert len(cache) <= 10
+    assert cache.stats()["evictions"] == 1000 - len(cache)
+
+
+@pytest.mark.parametrize("max_size, shards", [(0, 16), (10, 0)])
+def test_invalid_sizes(max_size, shards):
+    with pytest.raises(ValueError):
+        StemCache(max_size, shards)
+
+
+def test_cache_namespaces_separate_the_modes():
+    cache = StemCache(16)
+    stems = {mode: LabadainStemmer(mode=mode, cache=cache).stem_word("hamoris") for mode in STEMMER_MODES}
+    assert stems == {"light": "hamoris", "moderate": "hamoris", "heavy": "moris"}
+    assert LabadainStemmer(cache=cache).stem_word_all("hamoris") == ("hamoris", "hamoris", "moris")
+
+
+@pytest.mark.parametrize("mode", STEMMER_MODES)
+def test_cached_stems_match_the_golden_stems(mode):
+    stemmer = LabadainStemmer(mode=mode, cache=StemCache(64))
+    column = STEMMER_MODES.index(mode) + 1
+    for _ in range(2):
+        for row in load_golden_stems():
+            word = row[0]
+            assert stemmer.stem_word(word) == (row[column] if len(word) > 3 else word), word
+
+
+def test_shared_between_threads():
+    cache = StemCache(100)
+    stemmer = LabadainStemmer(mode="heavy", cache=cache)
+    words = [row[0] for row in load_golden_stems()]
+    expected = [LabadainStemmer(mode="heavy").stem_word(word) for word in words]
+    results = []
+
+    def stem_words() -> None:
+        results.append([stemmer.stem_word(word) for word in words])
+
+    threads = [threading.Thread(target=stem_words) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [expected] * 4
+    stats = cache.stats()
+    assert stats["size"] <= 100 and stats["hits"] + stats["misses"] == 4 * sum(len(word) > 3 for word in words)
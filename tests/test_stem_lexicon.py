@@ -0,0 +1,83 @@
+import pytest
+import src.stemmer
+from src.stem_cache import StemCache
+from src.stem_lexicon import HEADER_SIZE, StemLexicon, build_lexicon, write_lexicon
+from src.stemmer import LabadainStemmer
+from tests.conftest import load_golden_stems
+
+#!/usr/bin/env python3
+#
+# tests.test_stem_lexicon.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+
+def heavy_rules_digest() -> str:
+    return LabadainStemmer().lexicon_rules_digest("heavy")
+
+
+def test_lookups(tmp_path):
+    stems = {word: word[:4] for word in ["nasionál", "edukasaun", "ne’ebé", ""]}
+    stems.update({f"liafuan{index}": f"lia{index}" for index in range(1000)})
+    write_lexicon(tmp_path / "heavy.lex", "heavy", stems, heavy_rules_digest())
+    with StemLexicon(tmp_path / "heavy.lex") as lexicon:
+        assert len(lexicon) == len(stems) and lexicon.mode == "heavy"
+        assert all(lexicon.get(word) == stem for word, stem in stems.items())
+        assert lexicon.get("nasional") is None and lexicon.get("nasionál ") is None
+        assert "" in lexicon and "edukasaun" in lexicon and "eduk" not in lexicon
+
+
+def test_empty_lexicon(tmp_path):
+    write_lexicon(tmp_path / "empty.lex", "light", {}, heavy_rules_digest())
+    with StemLexicon(tmp_path / "empty.lex") as lexicon:
+        assert len(lexicon) == 0 and lexicon.get("nasionál") is None
+
+
+def test_build_lexicon_matches_the_rules(tmp_path):
+    words = [row[0] for row in load_golden_stems()]
+    entries = build_lexicon(words, "heavy", tmp_path / "heavy.lex")
+    assert entries == len({word for word in words if len(word) > 3})
+    stemmer = LabadainStemmer(mode="heavy")
+    with StemLexicon(tmp_path / "heavy.lex") as lexicon:
+        assert all(lexicon.get(word) == stemmer.stem_word(word) for word in words if len(word) > 3)
+
+
+def test_stemmer_consults_the_lexicon_first(tmp_path):
+    write_lexicon(tmp_path / "heavy.lex", "heavy", {"hamoris": "hamoris-x"}, heavy_rules_digest())
+    with StemLexicon(tmp_path / "heavy.lex") as lexicon:
+        stemmer = LabadainStemmer(mode="heavy", lexicon=lexicon, cache=StemCache(16))
+        assert stemmer.stem_tokens(["hamoris", "edukasaun", "ba"]) == ["hamoris-x", "eduk", "ba"]
+        assert stemmer.stem_word_all("hamoris") == ("hamoris", "hamoris", "hamoris-x")
+        # The lexicon only replaces the stems of its own mode
+        assert LabadainStemmer(mode="light", lexicon=lexicon).stem_word("hamoris") == "hamoris"
+
+
+def test_stale_lexicons_are_refused(tmp_path, monkeypatch):
+    write_lexicon(tmp_path / "rules.lex", "heavy", {"hamoris": "moris"}, "00" * 32)
+    with StemLexicon(tmp_path / "rules.lex") as lexicon, pytest.raises(ValueError, match="other heavy rules"):
+        LabadainStemmer(mode="heavy", lexicon=lexicon)
+
+    monkeypatch.setattr(src.stemmer, "STEMMER_VERSION", src.stemmer.STEMMER_VERSION + 1)
+    write_lexicon(tmp_path / "version.lex", "heavy", {"hamoris": "moris"}, heavy_rules_digest())
+    monkeypatch.undo()
+    with StemLexicon(tmp_path / "version.lex") as lexicon, pytest.raises(ValueError, match="stemmer version"):
+        LabadainStemmer(mode="heavy", lexicon=lexicon)
+
+
+def test_invalid_files(tmp_path):
+    write_lexicon(tmp_path / "heavy.lex", "heavy", {"hamoris": "moris"}, heavy_rules_digest())
+    content = (tmp_path / "heavy.lex").read_bytes()
+    for name, data, message in [
+        ("short.lex", content[:HEADER_SIZE - 1], "too short"),
+        ("magic.lex", b"LBDNLEX1" + content[8:], "version 2"),
+        ("truncated.lex", content[:-1], "Truncated"),
+    ]:
+        (tmp_path / name).write_bytes(data)
+        with pytest.raises(ValueError, match=message):
+            StemLexicon(tmp_path / name)
+
+
+@pytest.mark.parametrize("word, stem", [("nasi\0onál", "nasi"), ("nasi\nonál", "nasi"), ("nasionál", "nasi\n")])
+def test_unstorable_entries(tmp_path, word, stem):
+    with pytest.raises(ValueError):
+        write_lexicon(tmp_path / "heavy.lex", "heavy", {word: stem}, heavy_rules_digest())
@@ -0,0 +1,152 @@
+import asyncio
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List
+import pytest
+from src.stem_client import StemClient
+from src.stem_server import StemServer
+from src.stemmer import LabadainStemmer
+
+#!/usr/bin/env python3
+#
+# tests.test_stem_server.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+
+def exchange(socket_path: Path, lines: List[bytes], max_request_size: int = 1024, piece_size: int = 0) -> List[Dict]:
+    """
+    Serve on a Unix socket, send the raw request lines on one connection (in pieces of piece_size
+    bytes, each written separately, if given) and return the responses.
+    """
+
+    async def run() -> List[Dict]:
+        server = StemServer(max_request_size=max_request_size)
+        serve_task = asyncio.create_task(server.serve(unix_socket=str(socket_path)))
+        while not socket_path.exists():
+            await asyncio.sleep(0.01)
+        reader, writer = await asyncio.open_unix_connection(str(socket_path), limit=1 << 20)
+        try:
+            data = b"".join(lines)
+            size = piece_size or len(data) or 1
+            for start in range(0, len(data), size):
+                writer.write(data[start:start + size])
+                await writer.drain()
+                await asyncio.sleep(0)
+            writer.write_eof()
+            responses = [json.loads(line) async for line in reader]
+        finally:
+            writer.close()
+            serve_task.cancel()
+        return responses
+
+    return asyncio.run(run())
+
+
+def request_line(request: Dict) -> bytes:
+    return json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+@pytest.fixture
+def server_socket(tmp_path: Path) -> Iterator[str]:
+    """A server running in a background thread, with requests of up to 1 KiB."""
+    socket_path = tmp_path / "stem.sock"
+    loop = asyncio.new_event_loop()
+    server = StemServer(max_request_size=1024)
+    serve_task = loop.create_task(server.serve(unix_socket=str(socket_path)))
+
+    def serve() -> None:
+        try:
+            loop.run_until_complete(serve_task)
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    while not socket_path.exists():
+        thread.join(0.01)
+    yield str(socket_path)
+    loop.call_soon_threadsafe(serve_task.cancel)
+    thread.join()
+    # Let the connection handlers finish, as asyncio.run does
+    pending = asyncio.all_tasks(loop)
+    for task in pending:
+        task.cancel()
+    if pending:
+        loop.run_until_complete(asyncio.wait(pending))
+    loop.close()
+
+
+def test_requests_are_served_in_order(tmp_path):
+    texts = ["Komemorasaun loron independénsia", "Edukasaun nasionál", ""]
+    lines = [request_line({"id": index, "mode": "heavy", "text": text}) for index, text in enumerate(texts)]
+    lines.append(request_line({"id": "words", "words": ["nasionál", "edukasaun", "ba"]}))
+    lines.append(b'{"id": "metrics", "command": "metrics"}\n')
+    responses = exchange(tmp_path / "stem.sock", lines)
+
+    stemmer = LabadainStemmer(mode="heavy")
+    assert responses[:3] == [{"id": index, "stemmed": stemmer.stem_document(text)} for index, text in enumerate(texts)]
+    assert responses[3] == {"id": "words", "stems": LabadainStemmer().stem_tokens(["nasionál", "edukasaun", "ba"])}
+    assert responses[4]["id"] == "metrics" and responses[4]["metrics"]["requests"] == 4
+
+
+def test_malformed_requests_get_errors(tmp_path):
+    lines = [
+        b"{not json\n",
+        b"[1, 2, 3]\n",
+        b"42\n",
+        b'"text"\n',
+        b"\n",
+        b'{"id": 1, "text": 123}\n',
+        b'{"id": 2, "words": "nasional"}\n',
+        b'{"id": 3, "words": ["nasional", 5]}\n',
+        b'{"id": 4, "mode": "extreme", "text": "nasional"}\n',
+        b'{"id": 5}\n',
+        b'{"id": 6, "text": "' + b"a" * 2000 + b'"}\n',
+        b'{"id": 7, "text": "Edukasaun"}\n',
+    ]
+    responses = exchange(tmp_path / "stem.sock", lines)
+
+    # One response per non-blank line, in order, and the connection keeps serving after every error
+    assert len(responses) == len(lines) - 1
+    assert [response["id"] for response in responses] == [None, None, None, None, 1, 2, 3, 4, 5, None, 7]
+    assert responses[0]["error"].startswith("Invalid JSON")
+    assert all(response["error"] == "The request must be a JSON object." for response in responses[1:4])
+    assert all("error" in response for response in responses[4:10])
+    assert responses[9]["error"] == "The request exceeds 1024 bytes."
+    assert responses[10] == {"id": 7, "stemmed": "eduk"}
+
+
+@pytest.mark.parametrize("piece_size", [0, 1000, 4096])
+def test_oversized_request_gets_one_error(piece_size, tmp_path):
+    lines = [
+        request_line({"id": 1, "text": "Edukasaun"}),
+        request_line({"id": 2, "text": "nasionál " * 25000}),
+        request_line({"id": 3, "text": "Komemorasaun"}),
+        request_line({"id": 4, "text": "a" * 1500}),
+        request_line({"id": 5, "words": ["edukasaun"]}),
+    ]
+    responses = exchange(tmp_path / "stem.sock", lines, piece_size=piece_size)
+    assert responses == [
+        {"id": 1, "stemmed": "eduk"},
+        {"id": None, "error": "The request exceeds 1024 bytes."},
+        {"id": 3, "stemmed": "komemor"},
+        {"id": None, "error": "The request exceeds 1024 bytes."},
+        {"id": 5, "stems": ["eduk"]},
+    ]
+
+
+def test_oversized_last_request_without_newline(tmp_path):
+    lines = [request_line({"id": 1, "text": "Edukasaun"}), b'{"id": 2, "text": "' + b"a" * 200000]
+    responses = exchange(tmp_path / "stem.sock", lines)
+    assert responses == [{"id": 1, "stemmed": "eduk"}, {"id": None, "error": "The request exceeds 1024 bytes."}]
+
+
+def test_pipelined_client_stays_in_step(server_socket):
+    with StemClient(unix_socket=server_socket) as client:
+        with pytest.raises(ValueError, match="exceeds 1024 bytes"):
+            client.stem_texts(["Edukasaun", "nasionál " * 25000, "Komemorasaun"], mode="heavy")
+        assert client.stem_texts(["Edukasaun", "Komemorasaun"], mode="heavy") == ["eduk", "komemor"]
+        assert client.stem_words(["hamoris"], mode="heavy") == ["moris"]
+        assert client.metrics()["requests"] == 5
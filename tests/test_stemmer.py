@@ -0,0 +1,65 @@
+import pytest
+from src.stemmer import ALL_MODES, STEMMER_MODES, LabadainStemmer
+from src.stemmer_pipeline import LighStemmerPipeline, ModerateStemmerPipeline, HeavyStemmerPipeline
+from tests.conftest import load_golden_documents, load_golden_stems
+
+#!/usr/bin/env python3
+#
+# tests.test_stemmer.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+GOLDEN_STEMS = load_golden_stems()
+GOLDEN_DOCUMENTS = load_golden_documents()
+
+
+def test_golden_stems_of_the_pipelines():
+    light = LighStemmerPipeline().light_stemmer
+    moderate = ModerateStemmerPipeline().moderate_stemmer
+    heavy = HeavyStemmerPipeline().heavy_stemmer
+    for word, *stems in GOLDEN_STEMS:
+        assert [light(word), moderate(word), heavy(word)] == stems, word
+
+
+@pytest.mark.parametrize("mode", STEMMER_MODES)
+def test_golden_stems_of_the_stemmer(mode):
+    stemmer = LabadainStemmer(mode=mode)
+    column = STEMMER_MODES.index(mode) + 1
+    for row in GOLDEN_STEMS:
+        word = row[0]
+        assert stemmer.stem_word(word) == (row[column] if len(word) > 3 else word), word
+
+
+@pytest.mark.parametrize("mode", STEMMER_MODES)
+def test_golden_documents(mode):
+    stemmer = LabadainStemmer(mode=mode)
+    for document in GOLDEN_DOCUMENTS:
+        assert stemmer.stem_document(document["text"]) == document[mode]
+        # The original interface, bound to a preprocessed text
+        text = document["text"].lower().replace("'", "’")
+        assert LabadainStemmer(text, mode).stem() == document[mode]
+
+
+def test_invalid_mode():
+    with pytest.raises(ValueError):
+        LabadainStemmer(mode=ALL_MODES)
+
+
+@pytest.mark.parametrize("mode", STEMMER_MODES)
+def test_stemmer_keeps_no_state_between_calls(mode):
+    stemmer = LabadainStemmer(mode=mode)
+    for document in GOLDEN_DOCUMENTS:
+        assert stemmer.stem_document(document["text"]) == stemmer.stem_document(document["text"]) == document[mode]
+        text = document["text"].lower().replace("'", "’")
+        bound_stemmer = LabadainStemmer(text, mode)
+        assert bound_stemmer.stem() == bound_stemmer.stem() == document[mode]
+
+
+def test_word_token_text_and_batch_apis():
+    stemmer = LabadainStemmer(mode="heavy")
+    documents = [document["text"].lower().replace("'", "’") for document in GOLDEN_DOCUMENTS]
+    expected = [document["heavy"] for document in GOLDEN_DOCUMENTS]
+    assert [stemmer.stem_text(document) for document in documents] == expected
+    assert stemmer.stem_batch(documents) == expected
+    assert [" ".join(stemmer.stem_tokens(stemmer.tokenize_text(document))) for document in documents] == expected
+    assert [stemmer.stem_word(word) for word in ["ba", "hamoris", "edukasaun"]] == ["ba", "moris", "eduk"]
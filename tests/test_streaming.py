@@ -0,0 +1,42 @@
+import pytest
+from config.utils import Utils
+from src.stemmer import STEMMER_MODES, LabadainStemmer, iter_stem
+from tests.conftest import run_cli
+
+#!/usr/bin/env python3
+#
+# tests.test_streaming.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+
+@pytest.mark.parametrize("mode", STEMMER_MODES)
+def test_iter_stem_yields_one_line_per_input_line(mode, corpus_lines):
+    stemmer = LabadainStemmer(mode=mode)
+    assert list(iter_stem(corpus_lines, mode)) == [stemmer.stem_document(line) for line in corpus_lines]
+    assert list(iter_stem(corpus_lines, stemmer=stemmer)) == [stemmer.stem_document(line) for line in corpus_lines]
+
+
+@pytest.mark.parametrize("mode", STEMMER_MODES)
+def test_stream_cli(mode, corpus_file, corpus_lines, tmp_path):
+    stemmer = LabadainStemmer(mode=mode)
+    expected = "".join(stemmer.stem_document(line) + "\n" for line in corpus_lines)
+    assert run_cli("-if", str(corpus_file), "-m", mode, "--stream") == expected
+
+    output_file = tmp_path / "stems.txt"
+    run_cli("-if", str(corpus_file), "-m", mode, "--stream", "-of", str(output_file))
+    assert output_file.read_text(encoding="utf-8") == expected
+
+
+def test_stream_cli_of_input_text():
+    text = "Komemorasaun loron independénsia\nEdukasaun nasionál"
+    assert run_cli("-it", text, "-m", "heavy", "--stream") == "komemor loro independente\neduk nasionál\n"
+    # An empty text is one empty line, with or without --stream
+    assert run_cli("-it", "", "--stream") == run_cli("-it", "") == "\n"
+
+
+def test_iter_corpus_yields_whole_lines(tmp_path):
+    file_path = tmp_path / "corpus.txt"
+    long_line = "nasionál " * 100000
+    file_path.write_text(f"{long_line}\n\nlast line without newline", encoding="utf-8")
+    assert list(Utils().iter_corpus(file_path)) == [f"{long_line}\n", "\n", "last line without newline"]
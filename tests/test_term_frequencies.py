@@ -0,0 +1,55 @@
+from collections import Counter
+import pytest
+from src.stemmer import LabadainStemmer
+from src.term_frequencies import TermFrequencies
+
+#!/usr/bin/env python3
+#
+# tests.test_term_frequencies.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+
+def test_counts_match_the_stemmed_text(corpus_lines):
+    stemmer = LabadainStemmer(mode="heavy")
+    term_frequencies = TermFrequencies(stemmer)
+    all_counts = list(term_frequencies.iter_documents(corpus_lines))
+    expected_counts = [Counter(stemmer.stem_document(line).split(" ")) for line in corpus_lines]
+    # An empty document joins to "", which splits to [""]; it has no stems
+    assert all_counts == [counts if counts != Counter([""]) else Counter() for counts in expected_counts]
+
+    document_frequencies: Counter = Counter()
+    for counts in all_counts:
+        document_frequencies.update(counts.keys())
+    stats = term_frequencies.collection_stats()
+    assert len(term_frequencies) == stats["num_documents"] == len(corpus_lines)
+    assert list(term_frequencies.doc_lengths) == [sum(counts.values()) for counts in all_counts]
+    assert stats["num_tokens"] == sum(term_frequencies.doc_lengths)
+    assert stats["average_length"] == pytest.approx(stats["num_tokens"] / len(corpus_lines))
+    assert stats["document_frequencies"] == dict(document_frequencies)
+
+
+def test_count_stems_keeps_the_empty_stem():
+    term_frequencies = TermFrequencies()
+    assert term_frequencies.count_stems(["eduk", "", "eduk"]) == Counter({"eduk": 2, "": 1})
+    assert term_frequencies.count_stems([]) == Counter()
+    assert term_frequencies.collection_stats() == {
+        "num_documents": 2,
+        "num_tokens": 3,
+        "average_length": 1.5,
+        "document_frequencies": {"eduk": 1, "": 1},
+    }
+    assert TermFrequencies().collection_stats()["average_length"] == 0.0
+    with pytest.raises(ValueError, match="stemmer is required"):
+        term_frequencies.add_document("Edukasaun")
+
+
+def test_document_ids():
+    term_frequencies = TermFrequencies(LabadainStemmer(mode="heavy"))
+    stem_ids, counts = term_frequencies.add_document_ids("Edukasaun nasionál, edukasaun")
+    assert term_frequencies.vocabulary == {"eduk": 0, "nasionál": 1}
+    assert stem_ids.tolist() == [0, 1] and counts.tolist() == [2, 1]
+    stem_ids, counts = term_frequencies.add_document_ids("Nasionál")
+    assert stem_ids.tolist() == [1] and counts.tolist() == [1]
+    stem_ids, counts = term_frequencies.add_document_ids("")
+    assert stem_ids.tolist() == [] and counts.tolist() == []
@@ -0,0 +1,42 @@
+import pytest
+from src.stemmer import ALL_MODES, STEMMER_MODES, LabadainStemmer
+from src.threaded_stemmer import gil_enabled, iter_stem_threaded, stem_threaded
+from tests.conftest import run_cli
+
+#!/usr/bin/env python3
+#
+# tests.test_threaded_stemmer.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+
+@pytest.mark.parametrize("mode", STEMMER_MODES + (ALL_MODES,))
+@pytest.mark.parametrize("force", [False, True])
+def test_output_keeps_the_input_order(mode, force, corpus_lines):
+    stemmer = LabadainStemmer(mode="light" if mode == ALL_MODES else mode)
+    stem_line = stemmer.stem_document_all if mode == ALL_MODES else stemmer.stem_document
+    expected = [stem_line(line) for line in corpus_lines]
+    stemmed_lines = iter_stem_threaded(corpus_lines, stem_line, threads=3, chunk_size=5, max_pending=2, force=force)
+    assert list(stemmed_lines) == expected
+    assert stem_threaded(corpus_lines, stem_line, threads=3, chunk_size=7, force=force) == expected
+
+
+def test_stem_batch_threaded(corpus_lines):
+    stemmer = LabadainStemmer(mode="heavy")
+    assert stemmer.stem_batch_threaded(corpus_lines, threads=3) == [stemmer.stem_document(line) for line in corpus_lines]
+    assert stemmer.stem_batch_threaded([], threads=3) == []
+
+
+def test_gil_enabled():
+    assert isinstance(gil_enabled(), bool)
+
+
+def test_invalid_chunk_size():
+    with pytest.raises(ValueError, match="chunk size"):
+        list(iter_stem_threaded(["Edukasaun"], str.lower, threads=2, chunk_size=0))
+
+
+@pytest.mark.parametrize("mode", STEMMER_MODES)
+def test_cli_matches_the_stream(mode, corpus_file):
+    expected = run_cli("-if", str(corpus_file), "-m", mode, "--stream")
+    assert run_cli("-if", str(corpus_file), "-m", mode, "-t", "2", "--chunk_size", "7") == expected
@@ -0,0 +1,132 @@
+import subprocess
+import sys
+from collections import Counter
+from typing import List
+import numpy as np
+import pytest
+from src.corpus_statistics import hash_items
+from src.output_writers import read_vocabulary, write_vocabulary
+from src.stemmer import LabadainStemmer
+from src.vectorizer import CsrWriter, StemVectorizer, concatenate_chunks, read_csr, vectorize_parallel
+from tests.conftest import REPO_ROOT
+
+#!/usr/bin/env python3
+#
+# tests.test_vectorizer.py
+# Gabriel de Jesus (mestregabrieldejesus@gmail.com)
+# 18-10-2026
+
+
+def dense(indptr, indices, data, num_features: int) -> np.ndarray:
+    """Dense matrix of CSR arrays."""
+    matrix = np.zeros((len(indptr) - 1, num_features), dtype=np.int64)
+    for row in range(len(indptr) - 1):
+        start, end = int(indptr[row]), int(indptr[row + 1])
+        assert list(indices[start:end]) == sorted(set(indices[start:end]))
+        matrix[row, indices[start:end]] = data[start:end]
+    return matrix
+
+
+def naive_counts(documents: List[str], column_of, num_features: int, mode: str = "heavy") -> np.ndarray:
+    """Dense matrix of stem counts, stemming every document on its own."""
+    stemmer = LabadainStemmer(mode=mode)
+    matrix = np.zeros((len(documents), num_features), dtype=np.int64)
+    for row, document in enumerate(documents):
+        for stem, count in Counter(stemmer.stem_document_tokens(document)).items():
+            column = column_of(stem)
+            if column is not None:
+                matrix[row, column] += count
+    return matrix
+
+
+def test_hashed_columns_match_naive_counts(corpus_lines):
+    num_features = 1 << 10
+    vectorizer = StemVectorizer(LabadainStemmer(mode="heavy"), num_features=num_features)
+    matrix = dense(*vectorizer.transform(corpus_lines, chunk_size=17), num_features)
+    expected = naive_counts(corpus_lines, lambda stem: hash_items([stem])[0] % num_features, num_features)
+    assert np.array_equal(matrix, expected)
+
+
+def test_frozen_vocabulary_matches_naive_counts(corpus_lines):
+    stemmer = LabadainStemmer(mode="heavy")
+    stems = sorted({stem for line in corpus_lines[:100] for stem in stemmer.stem_document_tokens(line)})
+    vocabulary = {stem: column for column, stem in enumerate(stems)}
+    vectorizer = StemVectorizer(stemmer, vocabulary=stems)
+    assert vectorizer.num_features == len(stems)
+    matrix = dense(*vectorizer.transform(corpus_lines, chunk_size=17), len(stems))
+    assert np.array_equal(matrix, naive_counts(corpus_lines, vocabulary.get, len(stems)))
+
+    with pytest.raises(ValueError, match="duplicate stems"):
+        StemVectorizer(stemmer, vocabulary=["eduk", "eduk"])
+    with pytest.raises(ValueError, match="between 1 and 2\\*\\*32"):
+        StemVectorizer(stemmer, num_features=0)
+
+
+def test_vocabulary_of_the_empty_stem(tmp_path):
+    stemmer = LabadainStemmer(mode="heavy")
+    vectorizer = StemVectorizer(stemmer, vocabulary=[""])
+    with CsrWriter(tmp_path / "matrix", vectorizer.num_features, "heavy", [""]) as writer:
+        writer.write(vectorizer.transform_chunk(["ivamente ivamente edukasaun", "edukasaun"]))
+    assert read_vocabulary(tmp_path / "matrix" / "vocabulary.txt") == [""]
+    indptr, indices, data, shape = read_csr(tmp_path / "matrix")
+    assert shape == (2, 1)
+    assert dense(indptr, indices, data, 1).tolist() == [[2], [0]]
+
+
+def test_parallel_chunks_match_the_whole_transform(corpus_lines, tmp_path):
+    vocabulary_path = tmp_path / "vocabulary.txt"
+    stemmer = LabadainStemmer(mode="heavy")
+    stems = sorted({stem for line in corpus_lines for stem in stemmer.stem_document_tokens(line)})
+    write_vocabulary(vocabulary_path, stems)
+    for vocabulary in (None, stems):
+        num_features = 1 << 12 if vocabulary is None else len(stems)
+        expected = StemVectorizer(stemmer, num_features, vocabulary).transform(corpus_lines)
+        for workers in (1, 2):
+            chunks = vectorize_parallel(
+                corpus_lines,
+                "heavy",
+                num_features,
+                str(vocabulary_path) if vocabulary else None,
+                workers=workers,
+                chunk_size=23,
+                max_pending=2
+            )
+            for array, expected_array in zip(concatenate_chunks(chunks), expected):
+                assert np.array_equal(array, expected_array)
+    with pytest.raises(ValueError, match="chunk size"):
+        list(vectorize_parallel(corpus_lines, chunk_size=0))
+
+
+def test_csr_writer_round_trip(corpus_lines, tmp_path):
+    vectorizer = StemVectorizer(LabadainStemmer(mode="light"), num_features=1 << 10)
+    expected = vectorizer.transform(corpus_lines)
+    with CsrWriter(tmp_path / "matrix", 1 << 10, "light") as writer:
+        for chunk in vectorizer.iter_transform(corpus_lines, chunk_size=50):
+            writer.write(chunk)
+    indptr, indices, data, shape = read_csr(tmp_path / "matrix")
+    assert shape == (len(corpus_lines), 1 << 10)
+    for array, expected_array in zip((indptr, indices, data), expected):
+        assert np.array_equal(array, expected_array)
+    assert not (tmp_path / "matrix" / "vocabulary.txt").exists()
+
+    with CsrWriter(tmp_path / "empty", 8, "light"):
+        pass
+    indptr, indices, data, shape = read_csr(tmp_path / "empty")
+    assert shape == (0, 8) and indptr.tolist() == [0] and len(indices) == len(data) == 0
+
+
+def test_cli(corpus_file, corpus_lines, tmp_path):
+    vocabulary_path = tmp_path / "vocabulary.txt"
+    write_vocabulary(vocabulary_path, ["", "eduk", "komemor"])
+    subprocess.run(
+        [sys.executable, "-m", "src.vectorizer", "-if", str(corpus_file), "-od", str(tmp_path / "matrix"),
+         "-m", "heavy", "-vf", str(vocabulary_path), "-w", "2", "--chunk_size", "40"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        check=True
+    )
+    indptr, indices, data, shape = read_csr(tmp_path / "matrix")
+    assert shape == (len(corpus_lines), 3)
+    assert read_vocabulary(tmp_path / "matrix" / "vocabulary.txt") == ["", "eduk", "komemor"]
+    vocabulary = {"": 0, "eduk": 1, "komemor": 2}
+    assert np.array_equal(dense(indptr, indices, data, 3), naive_counts(corpus_lines, vocabulary.get, 3))